@@ -1,53 +1,86 @@
+import re
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
+
+from agents.registry import AgentRegistry
 
 class DummyAgent:
     """A simple agent that returns predefined responses."""
-    
-    def __init__(self):
+
+    NAME = "dummy"
+    FALLBACK_RESPONSE = "I'm sorry, I don't understand that yet. I'm just a dummy agent for now!"
+    RECALL_PATTERN = r"what did i (?:say|ask) about (?P<topic>.+)"
+    # Least similarity for a past turn to count as being about the topic
+    RECALL_MIN_SCORE = 0.2
+
+    def __init__(self, registry: Optional[AgentRegistry] = None, memory: Optional[Any] = None):
+        """
+        Initialize the agent and register its intents.
+
+        Args:
+            registry: Registry shared with other agents. If None, the agent
+                routes through its own registry with its fallback response.
+            memory: MemoryLogger of past turns; enables "what did I say about ..."
+        """
+        self.memory = memory
         self.responses = {
             "hello": "Hello! I'm your voice assistant.",
             "how are you": "I'm functioning normally, thank you for asking.",
             "time": self._get_time,
             "help": "I'm a simple assistant. Try saying hello or asking for the time.",
         }
+        self.registry = registry if registry is not None else AgentRegistry(fallback=self.FALLBACK_RESPONSE)
+        self.registry.register(self)
+
+    def register_intents(self, registry: AgentRegistry) -> None:
+        """Add this agent's intents to registry (in declaration order, equal priority)."""
+        for key, response in self.responses.items():
+            handler = (lambda text, respond=response: respond()) if callable(response) else response
+            registry.add_intent(key, handler, name=f"{self.NAME}.{key}", agent=self.NAME)
+        if self.memory is not None:
+            registry.add_pattern(self.RECALL_PATTERN, self._recall, priority=1, keyword="what did i",
+                                 name=f"{self.NAME}.recall", agent=self.NAME)
 
     def process(self, text: str) -> str:
         """
         Process input text and return a response.
-        
+
         Args:
             text: Input text from user
-            
+
         Returns:
             Response text
         """
-        text = text.lower().strip()
-        
-        # Check for exact matches first
-        if text in self.responses:
-            response = self.responses[text]
-            if callable(response):
-                return response()
-            return response
-            
-        # Check for partial matches
-        for key in self.responses:
-            if key in text:
-                response = self.responses[key]
-                if callable(response):
-                    return response()
-                return response
-        
-        return "I'm sorry, I don't understand that yet. I'm just a dummy agent for now!"
+        response = self.registry.route(text)
+        return response if response is not None else self.FALLBACK_RESPONSE
 
     def _get_time(self) -> str:
         """Get current time response."""
         return f"The current time is {datetime.now().strftime('%I:%M %p')}"
 
+    def _recall(self, text: str) -> str:
+        """Answer "what did I say about <topic>" with the most related past turn."""
+        topic = re.search(self.RECALL_PATTERN, text, re.IGNORECASE).group("topic").strip(" ?.!")
+        # Earlier recall questions mention the topic too; recall what was said before them
+        turns = self.memory.recall(
+            topic, k=1, min_score=self.RECALL_MIN_SCORE,
+            exclude=lambda turn: re.search(self.RECALL_PATTERN, turn["transcript"], re.IGNORECASE) is not None
+        )
+        if not turns:
+            return f"I don't remember talking about {topic}."
+        when = datetime.fromtimestamp(turns[0]["timestamp"]).strftime("%B %d at %I:%M %p")
+        return f"On {when} you said: {turns[0]['transcript']}"
+
+    def get_static_responses(self) -> List[str]:
+        """Responses that never change, so their audio can be pre-rendered."""
+        static = self.registry.get_static_responses()
+        if self.FALLBACK_RESPONSE not in static:
+            static.append(self.FALLBACK_RESPONSE)
+        return static
+
     def get_state(self) -> Dict[str, Any]:
         """Get agent state for logging/memory."""
         return {
             "agent_type": "dummy",
             "available_commands": list(self.responses.keys())
-        } 
\ No newline at end of file
+        }
@@ -0,0 +1,281 @@
+import re
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+# A response: fixed text, or a function of the (original) input text
+Handler = Union[str, Callable[[str], str]]
+
+_NON_WORD = re.compile(r"[^\w']+")
+
+def normalize(text: str) -> str:
+    """
+    Lowercase text, turn punctuation into spaces and pad it with spaces.
+
+    Phrases and input are normalized the same way, so a padded phrase can
+    only match whole words (" time " does not match inside "sometimes").
+    """
+    words = _NON_WORD.sub(" ", text.lower()).split()
+    return f" {' '.join(words)} " if words else " "
+
+class AhoCorasick:
+    def __init__(self):
+        """
+        Multi-pattern string matcher: finds every added phrase in a text in
+        one pass over the text, independent of the number of phrases.
+
+        Add phrases with add(), then compile() once before searching.
+        """
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Phrases ending at each node; _out adds those of its suffixes at compile()
+        self._own: List[List[Tuple[int, Any]]] = [[]]
+        self._out: List[List[Tuple[int, Any]]] = [[]]
+        self._compiled = False
+
+    @property
+    def compiled(self) -> bool:
+        """Whether find() can be used (no phrases added since compile())."""
+        return self._compiled
+
+    def add(self, phrase: str, value: Any) -> None:
+        """Add phrase, reported with value when found."""
+        node = 0
+        for char in phrase:
+            child = self._goto[node].get(char)
+            if child is None:
+                child = len(self._goto)
+                self._goto[node][char] = child
+                self._goto.append({})
+                self._fail.append(0)
+                self._own.append([])
+            node = child
+        self._own[node].append((len(phrase), value))
+        self._compiled = False
+
+    def compile(self) -> None:
+        """Build failure links breadth-first; each node also reports its suffixes' phrases."""
+        # Rebuilt from scratch, so recompiling after more add() calls never duplicates outputs
+        self._out = [list(own) for own in self._own]
+        queue = deque(self._goto[0].values())
+        for child in queue:
+            self._fail[child] = 0
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+        self._compiled = True
+
+    def find(self, text: str) -> Iterator[Tuple[int, int, Any]]:
+        """
+        Yield (start, end, value) for every occurrence of every phrase in text.
+
+        Raises:
+            RuntimeError: If phrases were added since the last compile()
+        """
+        if not self._compiled:
+            raise RuntimeError("AhoCorasick.compile() must be called after adding phrases")
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for end, char in enumerate(text, 1):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for length, value in out[node]:
+                yield end - length, end, value
+
+class AgentRegistry:
+    def __init__(self, fallback: Optional[Handler] = None):
+        """
+        Route input text to intents registered by any number of agents.
+
+        Intent phrases from all agents are compiled into one Aho-Corasick
+        automaton, so routing costs one pass over the input whatever the
+        number of intents. When several intents match, the highest priority
+        wins, then an intent whose phrase is the whole input, then the
+        longest phrase, then the earliest registered.
+
+        Regex patterns are supported too. A pattern with a keyword is only
+        tried when its keyword occurs in the input; patterns without one are
+        tried on every input, so they should be rare.
+
+        Args:
+            fallback: Response when nothing matches (None: route() returns None)
+        """
+        self.fallback = fallback
+        self._intents: List[Dict[str, Any]] = []
+        self._names: Dict[str, int] = {}
+        self._matcher = AhoCorasick()
+        self._unanchored: List[int] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._intents)
+
+    @staticmethod
+    def _phrase(phrase: str) -> str:
+        normalized = normalize(phrase)
+        if normalized == " ":
+            raise ValueError(f"Phrase {phrase!r} has no words")
+        return normalized
+
+    def _add(self, name: Optional[str], handler: Handler, priority: int, agent: Optional[str],
+             pattern: Optional[str]) -> int:
+        name = name or f"intent_{len(self._intents)}"
+        if name in self._names:
+            raise ValueError(f"Intent {name!r} is already registered")
+        index = len(self._intents)
+        self._intents.append({
+            "name": name,
+            "handler": handler,
+            "priority": priority,
+            "agent": agent,
+            "pattern": re.compile(pattern, re.IGNORECASE) if pattern is not None else None
+        })
+        self._names[name] = index
+        return index
+
+    def add_intent(self,
+                   phrases: Union[str, Iterable[str]],
+                   handler: Handler,
+                   priority: int = 0,
+                   name: Optional[str] = None,
+                   agent: Optional[str] = None) -> str:
+        """
+        Register an intent triggered by any of its phrases (whole words, case-insensitive).
+
+        Args:
+            phrases: Phrase or phrases that trigger the intent
+            handler: Response text, or a function of the input text returning it
+            priority: Higher priorities win when several intents match
+            name: Unique intent name (default: generated)
+            agent: Name of the registering agent, for reporting
+
+        Returns:
+            The intent name
+        """
+        if isinstance(phrases, str):
+            phrases = [phrases]
+        normalized = [self._phrase(phrase) for phrase in phrases]
+        with self._lock:
+            index = self._add(name, handler, priority, agent, None)
+            for phrase in normalized:
+                self._matcher.add(phrase, index)
+        return self._intents[index]["name"]
+
+    def add_pattern(self,
+                    pattern: str,
+                    handler: Handler,
+                    priority: int = 0,
+                    keyword: Optional[str] = None,
+                    name: Optional[str] = None,
+                    agent: Optional[str] = None) -> str:
+        """
+        Register an intent triggered by a regular expression (searched, case-insensitive).
+
+        Args:
+            pattern: Regular expression searched for in the input
+            handler: Response text, or a function of the input text returning it
+            priority: Higher priorities win when several intents match
+            keyword: Word or phrase the pattern cannot match without; the
+                pattern is only tried when it occurs
+            name: Unique intent name (default: generated)
+            agent: Name of the registering agent, for reporting
+
+        Returns:
+            The intent name
+        """
+        keyword = self._phrase(keyword) if keyword is not None else None
+        with self._lock:
+            index = self._add(name, handler, priority, agent, pattern)
+            if keyword is not None:
+                self._matcher.add(keyword, index)
+            else:
+                self._unanchored.append(index)
+        return self._intents[index]["name"]
+
+    def register(self, agent: Any) -> Any:
+        """Let agent add its intents (via agent.register_intents(registry)); returns agent."""
+        agent.register_intents(self)
+        return agent
+
+    def compile(self) -> None:
+        """Rebuild the matcher; done automatically on the first match() after a change."""
+        with self._lock:
+            if not self._matcher.compiled:
+                self._matcher.compile()
+
+    def match(self, text: str) -> Optional[Dict[str, Any]]:
+        """
+        Find the best intent for text.
+
+        Returns:
+            Dict with name, priority, agent, handler and matched (the phrase or
+            pattern text matched), or None if nothing matches
+        """
+        if not self._matcher.compiled:
+            self.compile()
+        normalized = normalize(text)
+
+        candidates = {}
+        pattern_indices = set(self._unanchored)
+        for start, end, index in self._matcher.find(normalized):
+            intent = self._intents[index]
+            if intent["pattern"] is not None:
+                # The pattern's keyword occurred; try the pattern below
+                pattern_indices.add(index)
+                continue
+            exact = end - start == len(normalized)
+            rank = (intent["priority"], exact, end - start, -index)
+            if index not in candidates or rank > candidates[index][0]:
+                candidates[index] = (rank, normalized[start + 1:end - 1])
+
+        for index in pattern_indices:
+            intent = self._intents[index]
+            found = intent["pattern"].search(text)
+            if found is None:
+                continue
+            rank = (intent["priority"], found.group(0).strip() == text.strip(), len(found.group(0)), -index)
+            if index not in candidates or rank > candidates[index][0]:
+                candidates[index] = (rank, found.group(0))
+
+        if not candidates:
+            return None
+        index, (_, matched) = max(candidates.items(), key=lambda item: item[1][0])
+        intent = self._intents[index]
+        return {
+            "name": intent["name"],
+            "priority": intent["priority"],
+            "agent": intent["agent"],
+            "handler": intent["handler"],
+            "matched": matched
+        }
+
+    def route(self, text: str) -> Optional[str]:
+        """
+        Respond to text with the best matching intent, or the fallback.
+
+        Returns:
+            Response text, or None if nothing matches and there is no fallback
+        """
+        match = self.match(text)
+        handler = match["handler"] if match is not None else self.fallback
+        if callable(handler):
+            return handler(text)
+        return handler
+
+    def get_static_responses(self) -> List[str]:
+        """Fixed response texts of all intents and the fallback, for pre-rendering."""
+        static = [intent["handler"] for intent in self._intents if isinstance(intent["handler"], str)]
+        if isinstance(self.fallback, str):
+            static.append(self.fallback)
+        return static
+
+    def get_intents(self, agent: Optional[str] = None) -> List[str]:
+        """Names of the registered intents, optionally only those of one agent."""
+        return [intent["name"] for intent in self._intents if agent is None or intent["agent"] == agent]
@@ -0,0 +1,149 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from benchmarks.compare import compare, format_comparison
+from benchmarks.fixtures import STT_FIXTURES_DIR, speech_fixtures
+from config.settings import STT_BACKEND, TTS_MODEL, WHISPER_MODEL
+
+SUITES = ("stt", "tts", "wake_word", "vad", "intents", "turn")
+
+BENCHMARKS_DIR = Path(__file__).parent
+DEFAULT_BASELINE = BENCHMARKS_DIR / "baseline.json"
+RESULTS_DIR = BENCHMARKS_DIR / "results"
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BENCHMARKS_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def _environment() -> Dict[str, Any]:
+    """Describe the machine and configuration a run was measured on."""
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": _git_commit(),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "stt_backend": STT_BACKEND,
+        "tts_model": TTS_MODEL
+    }
+
+def run_suites(suites: List[str],
+               whisper_models: List[str],
+               fixtures_dir: Path,
+               generate_fixtures: bool,
+               repeats: int) -> Dict[str, Any]:
+    """Run the selected suites and collect their metrics and details."""
+    from benchmarks import suites as bench
+
+    needs_speech = any(suite in ("stt", "turn") for suite in suites)
+    fixtures = speech_fixtures(fixtures_dir, generate=generate_fixtures) if needs_speech else []
+
+    runners = {
+        "stt": lambda: bench.bench_stt(fixtures, whisper_models),
+        "tts": lambda: bench.bench_tts(repeats=repeats),
+        "wake_word": lambda: bench.bench_wake_word(),
+        "vad": lambda: bench.bench_vad(),
+        "intents": lambda: bench.bench_intents(),
+        "turn": lambda: bench.bench_turn(fixtures, repeats=repeats)
+    }
+
+    results = {"environment": _environment(), "metrics": {}, "details": {}}
+    for suite in suites:
+        print(f"\n== {suite} ==")
+        start = time.perf_counter()
+        metrics, details = runners[suite]()
+        results["metrics"].update(metrics)
+        results["details"][suite] = details
+        for name, value in metrics.items():
+            print(f"  {name:<44} {value:.4g}")
+        print(f"  ({time.perf_counter() - start:.1f}s)")
+    return results
+
+def _parse_overrides(values: List[str]) -> Dict[str, float]:
+    overrides = {}
+    for value in values:
+        pattern, _, threshold = value.partition("=")
+        if not threshold:
+            raise ValueError(f"Expected PATTERN=THRESHOLD, got {value!r}")
+        overrides[pattern] = float(threshold)
+    return overrides
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Benchmark STT, TTS, wake word, VAD, intent routing and end-to-end turns (headless)"
+    )
+    parser.add_argument("--suites", nargs="+", choices=SUITES, default=list(SUITES),
+                        help="Suites to run (default: all)")
+    parser.add_argument("--whisper-models", nargs="+", default=[WHISPER_MODEL],
+                        help="WHISPER_MODEL sizes measured by the stt suite")
+    parser.add_argument("--fixtures", type=Path, default=STT_FIXTURES_DIR,
+                        help="Directory of <name>.wav clips with <name>.txt references")
+    parser.add_argument("--no-generate", action="store_true",
+                        help="Fail instead of rendering missing speech fixtures with TTS")
+    parser.add_argument("--repeats", type=int, default=3, help="Passes for the tts and turn suites")
+    parser.add_argument("--output", type=Path, help="Results JSON (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="Baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Allowed relative regression per metric (default: 0.10)")
+    parser.add_argument("--metric-threshold", action="append", default=[], metavar="PATTERN=THRESHOLD",
+                        help="Per-metric threshold by glob, e.g. 'stt.*.rtf=0.2' (repeatable)")
+    parser.add_argument("--zero-tolerance", type=float, default=0.0,
+                        help="Allowed absolute regression for metrics whose baseline is 0 (default: 0)")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="Store this run as the new baseline instead of comparing")
+    args = parser.parse_args()
+
+    results = run_suites(args.suites, args.whisper_models, args.fixtures, not args.no_generate, args.repeats)
+
+    output = args.output or RESULTS_DIR / f"results_{time.strftime('%Y%m%d_%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; run with --update-baseline to create one")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    # Thresholds stored with the baseline apply unless overridden on the command line
+    overrides = dict(baseline.get("thresholds", {}))
+    overrides.update(_parse_overrides(args.metric_threshold))
+    # Baseline metrics of suites not run this time are not expected
+    expected = {
+        metric: value for metric, value in baseline["metrics"].items()
+        if metric.split(".", 1)[0] in args.suites
+    }
+    rows = compare(results["metrics"], expected, args.threshold, overrides, args.zero_tolerance)
+
+    print(f"\nCompared with baseline {args.baseline} ({baseline['environment'].get('commit')})")
+    print(format_comparison(rows))
+    regressions = [row for row in rows if row["regressed"]]
+    if regressions:
+        print(f"\n{len(regressions)} metric(s) regressed beyond threshold")
+        return 1
+    print("\nNo regressions")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+from fnmatch import fnmatch
+from typing import Any, Dict, List, Optional
+
+# Metrics where a larger value is an improvement; everything else (latency,
+# real-time factor, cost, error rate) is better when smaller
+HIGHER_IS_BETTER = ("*.chars_per_second", "*.frames_skipped")
+
+def higher_is_better(metric: str) -> bool:
+    return any(fnmatch(metric, pattern) for pattern in HIGHER_IS_BETTER)
+
+def threshold_for(metric: str, default: float, overrides: Optional[Dict[str, float]] = None) -> float:
+    """Relative threshold for metric: the last matching override pattern wins."""
+    threshold = default
+    for pattern, value in (overrides or {}).items():
+        if fnmatch(metric, pattern):
+            threshold = value
+    return threshold
+
+def compare(current: Dict[str, float],
+            baseline: Dict[str, float],
+            threshold: float = 0.1,
+            overrides: Optional[Dict[str, float]] = None,
+            zero_tolerance: float = 0.0) -> List[Dict[str, Any]]:
+    """
+    Compare metrics against a baseline.
+
+    Args:
+        current: Metrics from this run
+        baseline: Metrics from the stored baseline
+        threshold: Default allowed relative change in the bad direction (0.1 = 10%)
+        overrides: Per-metric thresholds keyed by glob pattern, e.g. {"stt.*.rtf": 0.2}
+        zero_tolerance: Allowed absolute change in the bad direction for
+            metrics whose baseline is 0, where no relative change exists
+
+    Returns:
+        One row per baseline metric with baseline, current, change (relative,
+        or absolute for a zero baseline), threshold and whether it regressed.
+        A metric missing from this run has current None and counts as regressed.
+    """
+    rows = []
+    for metric in sorted(baseline):
+        base = baseline[metric]
+        if metric not in current:
+            rows.append({
+                "metric": metric,
+                "baseline": base,
+                "current": None,
+                "change": None,
+                "threshold": None,
+                "regressed": True
+            })
+            continue
+        value = current[metric]
+        if base:
+            change = (value - base) / abs(base)
+            limit = threshold_for(metric, threshold, overrides)
+        else:
+            change = value - base
+            limit = zero_tolerance
+        worse = -change if higher_is_better(metric) else change
+        rows.append({
+            "metric": metric,
+            "baseline": base,
+            "current": value,
+            "change": change,
+            "threshold": limit,
+            "regressed": worse > limit
+        })
+    return rows
+
+def format_comparison(rows: List[Dict[str, Any]]) -> str:
+    """Format comparison rows as a table, regressions marked."""
+    lines = [f"{'metric':<44} {'baseline':>12} {'current':>12} {'change':>8}"]
+    for row in rows:
+        if row["current"] is None:
+            lines.append(f"{row['metric']:<44} {row['baseline']:>12.4g} {'missing':>12} {'':>8}  REGRESSION")
+            continue
+        flag = "  REGRESSION" if row["regressed"] else ""
+        if not row["baseline"]:
+            # Absolute change from a zero baseline
+            lines.append(
+                f"{row['metric']:<44} {row['baseline']:>12.4g} {row['current']:>12.4g} "
+                f"{row['change']:>+8.3g}{flag}"
+            )
+            continue
+        lines.append(
+            f"{row['metric']:<44} {row['baseline']:>12.4g} {row['current']:>12.4g} "
+            f"{row['change'] * 100:>+7.1f}%{flag}"
+        )
+    return "\n".join(lines)
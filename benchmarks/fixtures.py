@@ -0,0 +1,121 @@
+import wave
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+# Directory of <name>.wav clips with reference transcripts in <name>.txt
+STT_FIXTURES_DIR = FIXTURES_DIR / "stt"
+
+# Commands rendered with the configured TTS voice when no recorded fixtures exist
+FIXTURE_SENTENCES = [
+    "What's the weather like today?",
+    "Set a timer for ten minutes.",
+    "Turn off the lights in the living room.",
+    "Remind me to call my mother tomorrow at six in the evening.",
+    "Play some relaxing music.",
+]
+
+def load_wav(path: Path) -> Tuple[np.ndarray, int]:
+    """Read a 16-bit PCM WAV file as int16 samples (first channel)."""
+    with wave.open(str(path), "rb") as wf:
+        if wf.getsampwidth() != 2:
+            raise ValueError(f"{path} is not 16-bit PCM")
+        frames = wf.readframes(wf.getnframes())
+        audio = np.frombuffer(frames, dtype=np.int16).reshape(-1, wf.getnchannels())[:, 0]
+        return audio, wf.getframerate()
+
+def save_wav(path: Path, audio: np.ndarray, sample_rate: int) -> None:
+    """Write int16 mono samples to a WAV file."""
+    with wave.open(str(path), "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        wf.writeframes(np.asarray(audio, dtype=np.int16).tobytes())
+
+def load_fixtures(fixtures_dir: Path = STT_FIXTURES_DIR) -> List[Dict[str, Any]]:
+    """Load every clip in fixtures_dir that has a matching reference transcript."""
+    fixtures = []
+    for wav_path in sorted(Path(fixtures_dir).glob("*.wav")):
+        reference_path = wav_path.with_suffix(".txt")
+        if not reference_path.exists():
+            continue
+        audio, sample_rate = load_wav(wav_path)
+        fixtures.append({
+            "name": wav_path.stem,
+            "audio": audio,
+            "sample_rate": sample_rate,
+            "reference": reference_path.read_text().strip()
+        })
+    return fixtures
+
+def generate_speech_fixtures(fixtures_dir: Path = STT_FIXTURES_DIR, sample_rate: int = 16000) -> None:
+    """
+    Render FIXTURE_SENTENCES with the configured TTS voice into fixtures_dir.
+
+    The clips are written once and reused, so every later run measures
+    exactly the same audio.
+    """
+    from utils.tts import create_tts_backend
+
+    fixtures_dir = Path(fixtures_dir)
+    fixtures_dir.mkdir(parents=True, exist_ok=True)
+    tts = create_tts_backend()
+    for i, sentence in enumerate(FIXTURE_SENTENCES):
+        wav, tts_rate = tts.synthesize_to_array(sentence)
+        if tts_rate != sample_rate and len(wav) > 0:
+            n_out = int(round(len(wav) * sample_rate / tts_rate))
+            wav = np.interp(np.linspace(0, len(wav) - 1, n_out), np.arange(len(wav)), wav)
+        # Half a second of silence either side, like a real endpointed command
+        pad = np.zeros(sample_rate // 2, dtype=np.float32)
+        audio = (np.clip(np.concatenate([pad, wav, pad]), -1.0, 1.0) * 32767).astype(np.int16)
+        save_wav(fixtures_dir / f"command_{i:02d}.wav", audio, sample_rate)
+        (fixtures_dir / f"command_{i:02d}.txt").write_text(sentence + "\n")
+
+def speech_fixtures(fixtures_dir: Path = STT_FIXTURES_DIR, generate: bool = True) -> List[Dict[str, Any]]:
+    """
+    Load speech fixtures, generating them with TTS on first use if allowed.
+
+    Raises:
+        FileNotFoundError: No fixtures exist and generate is False
+    """
+    fixtures = load_fixtures(fixtures_dir)
+    if not fixtures and generate:
+        print(f"No speech fixtures in {fixtures_dir}; generating them with TTS...")
+        generate_speech_fixtures(fixtures_dir)
+        fixtures = load_fixtures(fixtures_dir)
+    if not fixtures:
+        raise FileNotFoundError(f"No <name>.wav + <name>.txt fixtures in {fixtures_dir}")
+    return fixtures
+
+def synthetic_audio(duration: float = 10.0, sample_rate: int = 16000, seed: int = 0) -> np.ndarray:
+    """
+    Deterministic int16 test signal alternating speech-like bursts and quiet noise.
+
+    Bursts are harmonic tones with a wobbling pitch and syllable-rate envelope,
+    which webrtcvad classifies as speech, so gated pipelines exercise both
+    their speech and silence paths.
+
+    Args:
+        duration: Length in seconds
+        sample_rate: Sample rate
+        seed: RNG seed for the noise floor
+
+    Returns:
+        int16 mono samples
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(duration * sample_rate)) / sample_rate
+    audio = rng.standard_normal(len(t)) * 0.003
+
+    # One second on, one second off
+    voiced = (t % 2.0) < 1.0
+    pitch = 140 + 30 * np.sin(2 * np.pi * 3 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / sample_rate
+    harmonics = sum(np.sin(k * phase) / k for k in range(1, 6))
+    envelope = 0.5 * (1 - np.cos(2 * np.pi * 4 * t))
+    audio += voiced * harmonics * envelope * 0.2
+
+    return (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16)
@@ -0,0 +1,116 @@
+import argparse
+import json
+import random
+import statistics
+import time
+from typing import Any, Dict, List, Tuple
+
+from agents.registry import AgentRegistry
+
+# Words intents and queries are built from; a small vocabulary makes phrases
+# share prefixes and overlap, which is the hard case for the automaton
+VOCABULARY = [
+    "turn", "on", "off", "the", "lights", "in", "kitchen", "bedroom", "living", "room",
+    "play", "some", "music", "jazz", "rock", "set", "a", "timer", "for", "minutes",
+    "what", "is", "weather", "today", "tomorrow", "remind", "me", "to", "call", "mom",
+    "open", "garage", "door", "lock", "front", "temperature", "raise", "lower", "volume",
+    "next", "song", "stop", "pause", "resume", "add", "milk", "shopping", "list", "news",
+    "read", "my", "messages", "email", "calendar", "meeting", "at", "noon", "dim", "blue"
+]
+
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+def make_intents(n_intents: int, seed: int = 0) -> List[Tuple[str, int]]:
+    """Unique phrases of 1-4 words with priorities 0-3."""
+    rng = random.Random(seed)
+    phrases = set()
+    intents = []
+    while len(intents) < n_intents:
+        phrase = " ".join(rng.choice(VOCABULARY) for _ in range(rng.randint(1, 4)))
+        if phrase in phrases:
+            continue
+        phrases.add(phrase)
+        intents.append((phrase, rng.randint(0, 3)))
+    return intents
+
+def make_queries(n_queries: int, seed: int = 1) -> List[str]:
+    """Utterances of 4-12 words from the same vocabulary."""
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(VOCABULARY) for _ in range(rng.randint(4, 12))) for _ in range(n_queries)]
+
+def linear_route(intents: List[Tuple[str, int]], text: str) -> int:
+    """The old DummyAgent strategy (substring scan over every intent), for comparison."""
+    text = text.lower().strip()
+    best, best_priority = -1, -1
+    for index, (phrase, priority) in enumerate(intents):
+        if priority > best_priority and phrase in text:
+            best, best_priority = index, priority
+    return best
+
+def run(n_intents: int = 10000, n_queries: int = 2000, linear_queries: int = 200) -> Dict[str, Any]:
+    """
+    Build a registry with n_intents phrases and time routing against it.
+
+    Returns:
+        Dict with compile time, per-query routing latency (microseconds) for
+        the registry and for a linear substring scan, and the match rate
+    """
+    intents = make_intents(n_intents)
+    queries = make_queries(n_queries)
+
+    registry = AgentRegistry()
+    start = time.perf_counter()
+    for index, (phrase, priority) in enumerate(intents):
+        registry.add_intent(phrase, f"response {index}", priority=priority)
+    registry.compile()
+    build_ms = (time.perf_counter() - start) * 1000
+
+    timings = []
+    matched = 0
+    for query in queries:
+        start = time.perf_counter()
+        response = registry.route(query)
+        timings.append((time.perf_counter() - start) * 1e6)
+        matched += response is not None
+
+    linear_timings = []
+    for query in queries[:linear_queries]:
+        start = time.perf_counter()
+        linear_route(intents, query)
+        linear_timings.append((time.perf_counter() - start) * 1e6)
+
+    return {
+        "intents": n_intents,
+        "queries": n_queries,
+        "build_ms": build_ms,
+        "match_rate": matched / n_queries,
+        "route_us_mean": statistics.mean(timings),
+        "route_us_p50": _percentile(timings, 50),
+        "route_us_p95": _percentile(timings, 95),
+        "route_us_max": max(timings),
+        "linear_us_mean": statistics.mean(linear_timings),
+        "linear_us_p95": _percentile(linear_timings, 95)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark intent routing through the agent registry")
+    parser.add_argument("--intents", type=int, default=10000, help="Number of registered intents")
+    parser.add_argument("--queries", type=int, default=2000, help="Number of routed utterances")
+    parser.add_argument("--output", help="Optional path to write JSON results")
+    args = parser.parse_args()
+
+    results = run(args.intents, args.queries)
+
+    print(f"{results['intents']} intents compiled in {results['build_ms']:.0f} ms")
+    print(f"Registry route: mean {results['route_us_mean']:.1f} us, p50 {results['route_us_p50']:.1f} us, "
+          f"p95 {results['route_us_p95']:.1f} us ({results['match_rate']:.0%} matched)")
+    print(f"Linear scan:    mean {results['linear_us_mean']:.1f} us, p95 {results['linear_us_p95']:.1f} us")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
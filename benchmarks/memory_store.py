@@ -0,0 +1,136 @@
+import argparse
+import json
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from memory.memory_logger import MEMORY_BACKENDS, MemoryLogger
+
+# Words transcripts and responses are built from; "rare" words are each
+# used by about one turn in 10k so text queries have selective terms
+COMMON_WORDS = [
+    "what", "is", "the", "weather", "time", "set", "a", "timer", "for", "minutes",
+    "play", "music", "turn", "on", "off", "lights", "remind", "me", "to", "call",
+    "it", "is", "currently", "degrees", "and", "cloudy", "okay", "done", "sure", "playing"
+]
+
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+def make_turn(rng: random.Random, index: int) -> Dict[str, Any]:
+    """Synthetic turn with a realistic record size (segments and timings included)."""
+    transcript = " ".join(rng.choice(COMMON_WORDS) for _ in range(rng.randint(4, 12)))
+    transcript += f" rare{rng.randrange(max(1, index // 10000 + 1) * 100)}"
+    response = " ".join(rng.choice(COMMON_WORDS) for _ in range(rng.randint(6, 20)))
+    return {
+        "transcript": transcript,
+        "response": response,
+        "segments": [{"start": 0.0, "end": 2.1, "text": transcript}],
+        "timings": {"turn": rng.uniform(0.8, 2.5), "response_latency": rng.uniform(0.3, 1.2)}
+    }
+
+def _time_queries(query: Callable[[], Any], repeats: int) -> Dict[str, float]:
+    timings = []
+    n_results = 0
+    for _ in range(repeats):
+        start = time.perf_counter()
+        n_results = len(query())
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        "ms_mean": statistics.mean(timings),
+        "ms_p50": _percentile(timings, 50),
+        "ms_p95": _percentile(timings, 95),
+        "results": n_results
+    }
+
+def run_backend(memory_format: str,
+                n_turns: int,
+                directory: Path,
+                batch_size: int = 1000,
+                turns_per_second: float = 1.0,
+                repeats: int = 20) -> Dict[str, Any]:
+    """
+    Ingest n_turns through a MemoryLogger and time queries on the result.
+
+    Turns are spaced 1/turns_per_second apart so the data spans a realistic
+    time range (and, for JSON lines, many daily files).
+
+    Returns:
+        Dict with the enqueue rate seen by the caller, the end-to-end write
+        rate, on-disk size and query latencies
+    """
+    rng = random.Random(0)
+    turns = [make_turn(rng, i) for i in range(n_turns)]
+    t0 = time.time() - n_turns / turns_per_second
+
+    logger = MemoryLogger(MEMORY_BACKENDS[memory_format](directory),
+                          batch_size=batch_size, max_pending=n_turns + 1)
+    start = time.perf_counter()
+    for i, turn in enumerate(turns):
+        logger.log_turn(timestamp=t0 + i / turns_per_second, **turn)
+    enqueued = time.perf_counter() - start
+    logger.flush()
+    written = time.perf_counter() - start
+
+    mid = t0 + n_turns / turns_per_second / 2
+    queries = {
+        "time_range_1h": lambda: logger.query(start=mid, end=mid + 3600),
+        "text_rare": lambda: logger.query(text="rare42"),
+        "text_common": lambda: logger.query(text="weather degrees"),
+        "text_in_range_1d": lambda: logger.query(start=mid, end=mid + 86400, text="timer")
+    }
+    query_results = {name: _time_queries(query, repeats) for name, query in queries.items()}
+    stats = dict(logger.stats)
+    logger.close()
+
+    size = sum(path.stat().st_size for path in directory.rglob("*") if path.is_file())
+    return {
+        "turns": n_turns,
+        "enqueue_per_second": n_turns / enqueued,
+        "write_per_second": n_turns / written,
+        "bytes_per_turn": size / n_turns,
+        "queries": query_results,
+        "logger_stats": stats
+    }
+
+def run(formats: List[str], n_turns: int, directory: Optional[Path] = None, **kwargs: Any) -> Dict[str, Any]:
+    """Benchmark each memory backend in a fresh directory (a temporary one by default)."""
+    results = {}
+    for memory_format in formats:
+        root = Path(tempfile.mkdtemp(prefix="memory_bench_", dir=directory))
+        try:
+            print(f"Ingesting {n_turns} turns into {memory_format}...")
+            results[memory_format] = run_backend(memory_format, n_turns, root, **kwargs)
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark memory ingest rate and query latency")
+    parser.add_argument("--formats", nargs="+", choices=sorted(MEMORY_BACKENDS), default=sorted(MEMORY_BACKENDS))
+    parser.add_argument("--turns", type=int, default=1_000_000, help="Turns to ingest")
+    parser.add_argument("--batch-size", type=int, default=1000, help="MemoryLogger batch size")
+    parser.add_argument("--dir", type=Path, help="Where to create the scratch stores (default: system temp)")
+    parser.add_argument("--output", help="Optional path to write JSON results")
+    args = parser.parse_args()
+
+    results = run(args.formats, args.turns, args.dir, batch_size=args.batch_size)
+
+    for memory_format, result in results.items():
+        print(f"\n{memory_format}: enqueue {result['enqueue_per_second']:,.0f}/s, "
+              f"written {result['write_per_second']:,.0f}/s, {result['bytes_per_turn']:.0f} B/turn")
+        for name, timing in result["queries"].items():
+            print(f"  {name:<18} p50 {timing['ms_p50']:8.2f} ms  p95 {timing['ms_p95']:8.2f} ms  "
+                  f"({timing['results']} results)")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
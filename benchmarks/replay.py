@@ -0,0 +1,121 @@
+import argparse
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from utils.audio_device import ReplayDevice
+
+def _summary(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {"count": 0}
+    return {
+        "count": len(values),
+        "mean": float(np.mean(values)),
+        "p50": float(np.percentile(values, 50)),
+        "p95": float(np.percentile(values, 95)),
+        "max": float(np.max(values))
+    }
+
+def run(sessions: Sequence[Path],
+        speed: float = 1.0,
+        max_turns: Optional[int] = None,
+        env: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Replay recorded sessions through the full assistant and time each turn.
+
+    The recordings play into a ReplayDevice in place of the microphone and
+    everything the assistant plays is captured, so no audio hardware is
+    needed. Wake-to-response latency is measured from the end of the wake
+    word audio to the first sample of the spoken response (the detection
+    beep is not counted as a response); endpoint delay is from the end of
+    the command's speech to the recording returning.
+
+    Args:
+        sessions: WAV recordings replayed back to back
+        speed: Replay clock speed-up (1.0 = real time)
+        max_turns: Stop after this many turns (default: until the recordings end)
+        env: Settings environment
+
+    Returns:
+        Dict with per-turn timings and summaries; turns whose pipeline
+        failed are listed under failed_turns and left out of the timings
+    """
+    from main import VoiceAssistant
+
+    device = ReplayDevice(sessions, speed=speed)
+    assistant = VoiceAssistant(env=env, audio_device=device)
+    beep_samples = len(assistant.wake_word.beep_sound)
+
+    turns = []
+    failed = []
+    try:
+        while not device.exhausted.is_set() and (max_turns is None or len(turns) + len(failed) < max_turns):
+            n_played = len(device.playback)
+            result = assistant.run_once()
+            detection = assistant.wake_word.last_detection
+            endpoint = assistant.audio_io.last_endpoint or {}
+            if result is None or detection is None:
+                continue
+            if not result["success"]:
+                failed.append({
+                    "wake_word_at_s": (detection["audio_time"] - device.started_at) * speed,
+                    "error": result["error"]
+                })
+                print(f"Turn {len(turns) + len(failed)} failed: {result['error']}")
+                continue
+
+            responses = [
+                piece for piece in device.playback[n_played:]
+                if len(piece["audio"]) != beep_samples and piece["started_at"] >= detection["detected_at"]
+            ]
+            turns.append({
+                "wake_word_at_s": (detection["audio_time"] - device.started_at) * speed,
+                "wake_word_latency_s": detection["latency"],
+                "endpoint_delay_s": endpoint.get("speech_end_delay"),
+                "wake_to_response_s": responses[0]["started_at"] - detection["audio_time"] if responses else None,
+                "text": result["transcription"]["text"],
+                "response": result["response"]
+            })
+            latency = turns[-1]["wake_to_response_s"]
+            print(f"Turn {len(turns) + len(failed)}: wake-to-response "
+                  f"{'n/a' if latency is None else f'{latency:.3f}s'}")
+    finally:
+        assistant.close()
+
+    return {
+        "sessions": [str(path) for path in sessions],
+        "speed": speed,
+        "audio_s": device.duration,
+        "turns": turns,
+        "failed_turns": failed,
+        "wake_to_response_s": _summary([t["wake_to_response_s"] for t in turns if t["wake_to_response_s"] is not None]),
+        "wake_word_latency_s": _summary([t["wake_word_latency_s"] for t in turns]),
+        "endpoint_delay_s": _summary([t["endpoint_delay_s"] for t in turns if t["endpoint_delay_s"] is not None])
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded sessions and measure wake-to-response latency")
+    parser.add_argument("sessions", nargs="+", type=Path, help="16-bit PCM WAV recordings")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay clock speed-up (1.0 = real time)")
+    parser.add_argument("--max-turns", type=int, help="Stop after this many turns")
+    parser.add_argument("--env", help="Settings environment (development/production)")
+    parser.add_argument("--output", help="Optional path to write JSON results")
+    args = parser.parse_args()
+
+    results = run(args.sessions, args.speed, args.max_turns, args.env)
+
+    print(f"\n{len(results['turns'])} turns ({len(results['failed_turns'])} failed) "
+          f"from {results['audio_s']:.1f}s of audio at {args.speed}x")
+    for name in ("wake_to_response_s", "wake_word_latency_s", "endpoint_delay_s"):
+        summary = results[name]
+        if summary["count"]:
+            print(f"{name:<22} mean {summary['mean']:.3f}  p95 {summary['p95']:.3f}  max {summary['max']:.3f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
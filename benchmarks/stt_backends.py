@@ -0,0 +1,122 @@
+import argparse
+import json
+import re
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+
+from benchmarks.fixtures import STT_FIXTURES_DIR, speech_fixtures
+from config.settings import WHISPER_MODEL, WHISPER_LANGUAGE, WHISPER_TASK
+
+def normalize_text(text: str) -> List[str]:
+    """Lowercase, drop punctuation and split into words for WER scoring."""
+    return re.sub(r"[^\w\s']", " ", text.lower()).split()
+
+def word_errors(reference: Sequence[str], hypothesis: Sequence[str]) -> int:
+    """Word-level Levenshtein distance (substitutions + deletions + insertions)."""
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref_word in enumerate(reference, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hypothesis, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_word != hyp_word)
+            ))
+        previous = current
+    return previous[-1]
+
+def run_backend(backend: str,
+                fixtures: List[Dict[str, Any]],
+                model_name: str = WHISPER_MODEL) -> Dict[str, Any]:
+    """
+    Transcribe every fixture with one backend and score it.
+
+    Returns:
+        Dict with load time, corpus WER, real-time factor (wall / audio
+        seconds) and per-clip results
+    """
+    from utils.stt import create_stt_backend
+
+    start = time.perf_counter()
+    stt = create_stt_backend(backend, model_name=model_name, language=WHISPER_LANGUAGE, task=WHISPER_TASK)
+    load_seconds = time.perf_counter() - start
+    stt.warmup()
+
+    clips = []
+    total_errors = total_words = 0
+    total_wall = total_audio = 0.0
+    for fixture in fixtures:
+        start = time.perf_counter()
+        result = stt.transcribe(fixture["audio"], fixture["sample_rate"])
+        wall = time.perf_counter() - start
+        audio_seconds = len(fixture["audio"]) / fixture["sample_rate"]
+
+        reference = normalize_text(fixture["reference"])
+        errors = word_errors(reference, normalize_text(result["text"]))
+        total_errors += errors
+        total_words += len(reference)
+        total_wall += wall
+        total_audio += audio_seconds
+        clips.append({
+            "name": fixture["name"],
+            "audio_s": audio_seconds,
+            "wall_s": wall,
+            "rtf": wall / audio_seconds if audio_seconds else 0.0,
+            "wer": errors / len(reference) if reference else float(errors > 0),
+            "text": result["text"]
+        })
+
+    return {
+        "backend": backend,
+        "model": model_name,
+        "load_s": load_seconds,
+        "wer": total_errors / total_words if total_words else 0.0,
+        "rtf": total_wall / total_audio if total_audio else 0.0,
+        "audio_s": total_audio,
+        "clips": clips
+    }
+
+def run(backends: Sequence[str],
+        fixtures_dir: Path = STT_FIXTURES_DIR,
+        model_name: str = WHISPER_MODEL) -> Dict[str, Any]:
+    """
+    Compare STT backends on the same fixtures.
+
+    Args:
+        backends: STT_BACKEND names to compare
+        fixtures_dir: Directory of <name>.wav + <name>.txt pairs
+        model_name: Whisper model size used for every backend
+
+    Returns:
+        Dict with the fixture count and one result per backend
+    """
+    fixtures = speech_fixtures(fixtures_dir)
+    return {
+        "fixtures": len(fixtures),
+        "backends": {backend: run_backend(backend, fixtures, model_name) for backend in backends}
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare WER and real-time factor across STT backends")
+    parser.add_argument("--backends", nargs="+", default=["whisper", "faster-whisper"],
+                        help="STT backends to compare")
+    parser.add_argument("--model", default=WHISPER_MODEL, help="Whisper model size")
+    parser.add_argument("--fixtures", type=Path, default=STT_FIXTURES_DIR,
+                        help="Directory of <name>.wav clips with <name>.txt references")
+    parser.add_argument("--output", help="Optional path to write JSON results")
+    args = parser.parse_args()
+
+    results = run(args.backends, args.fixtures, args.model)
+
+    print(f"{results['fixtures']} clips, model {args.model}")
+    print(f"{'backend':<16} {'WER':>8} {'RTF':>8} {'load s':>8}")
+    for name, r in results["backends"].items():
+        print(f"{name:<16} {r['wer']:>8.3f} {r['rtf']:>8.3f} {r['load_s']:>8.1f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
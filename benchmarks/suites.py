@@ -0,0 +1,188 @@
+import time
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from benchmarks.fixtures import synthetic_audio
+from config.settings import SAMPLE_RATE, STT_BACKEND, WHISPER_MODEL
+
+# A suite returns flat metrics (compared against the baseline) and free-form details
+SuiteResult = Tuple[Dict[str, float], Dict[str, Any]]
+
+# Multi-sentence replies, so time to first audio differs from total synthesis time
+TTS_RESPONSES = [
+    "Sure. I've set a timer for ten minutes.",
+    "It's currently eighteen degrees and cloudy. Expect light rain this afternoon, clearing by the evening.",
+    "Here's what I found. The museum opens at nine, closes at five, and is free on the first Sunday of each month.",
+]
+
+def _percentile(values: Sequence[float], q: float) -> float:
+    return float(np.percentile(values, q)) if len(values) else 0.0
+
+def bench_stt(fixtures: List[Dict[str, Any]], models: Sequence[str] = (WHISPER_MODEL,)) -> SuiteResult:
+    """Real-time factor, WER and load time of the configured STT backend for each Whisper model."""
+    from benchmarks.stt_backends import run_backend
+
+    metrics, details = {}, {}
+    for model in models:
+        result = run_backend(STT_BACKEND, fixtures, model)
+        metrics[f"stt.{model}.rtf"] = result["rtf"]
+        metrics[f"stt.{model}.wer"] = result["wer"]
+        metrics[f"stt.{model}.load_s"] = result["load_s"]
+        details[model] = result
+    return metrics, details
+
+def bench_tts(responses: Sequence[str] = TTS_RESPONSES, repeats: int = 3) -> SuiteResult:
+    """Chars/sec, real-time factor and time to first audio of the configured TTS voice."""
+    from utils.tts import create_tts_backend
+
+    start = time.perf_counter()
+    tts = create_tts_backend()
+    load_seconds = time.perf_counter() - start
+    tts.warmup()
+
+    first_audio: List[float] = []
+    total_chars = 0
+    total_wall = total_audio = 0.0
+    for _ in range(repeats):
+        for response in responses:
+            start = time.perf_counter()
+            for i, (wav, sample_rate) in enumerate(tts.synthesize_stream(response)):
+                if i == 0:
+                    first_audio.append(time.perf_counter() - start)
+                total_audio += len(wav) / sample_rate
+            total_wall += time.perf_counter() - start
+            total_chars += len(response)
+
+    metrics = {
+        "tts.chars_per_second": total_chars / total_wall if total_wall else 0.0,
+        "tts.rtf": total_wall / total_audio if total_audio else 0.0,
+        "tts.time_to_first_audio_s": float(np.mean(first_audio)),
+        "tts.time_to_first_audio_p95_s": _percentile(first_audio, 95),
+        "tts.load_s": load_seconds
+    }
+    return metrics, {"backend": type(tts).__name__, "model": tts.model_name, "sample_rate": tts.sample_rate}
+
+def _feed(process: Callable[[np.ndarray], Any], audio: np.ndarray, chunk_size: int) -> None:
+    for start in range(0, len(audio), chunk_size):
+        process(audio[start:start + chunk_size])
+
+def bench_wake_word(duration: float = 20.0) -> SuiteResult:
+    """Per-frame cost of the wake word model and VAD gate, with and without gating."""
+    from utils.wake_word import WakeWordStream, load_wake_word_model
+
+    model = load_wake_word_model()
+    audio = synthetic_audio(duration, SAMPLE_RATE)
+    metrics, details = {}, {}
+    for label, vad_gate in (("ungated", False), ("gated", True)):
+        model.reset()
+        stream = WakeWordStream(lambda: model, sample_rate=SAMPLE_RATE, vad_gate=vad_gate)
+        # Same 30 ms blocks the capture callback delivers
+        _feed(stream.process, audio, SAMPLE_RATE * 30 // 1000)
+        report = stream.get_frame_cost_report()
+        details[label] = report
+        metrics[f"wake_word.{label}.cpu_ms_per_audio_second"] = report["cpu_ms_per_audio_second"]
+        if report["model"]["frames"]:
+            metrics[f"wake_word.{label}.model_ms_per_frame"] = report["model"]["wall_ms_mean"]
+            metrics[f"wake_word.{label}.model_ms_per_frame_p95"] = report["model"]["wall_ms_p95"]
+    metrics["wake_word.gated.frames_skipped"] = details["gated"]["model_frames_skipped"]
+    return metrics, details
+
+def bench_vad(duration: float = 20.0, frame_ms: int = 30, mode: int = 3) -> SuiteResult:
+    """Cost of one webrtcvad decision per frame."""
+    import webrtcvad
+
+    vad = webrtcvad.Vad(mode)
+    audio = synthetic_audio(duration, SAMPLE_RATE)
+    frame_size = SAMPLE_RATE * frame_ms // 1000
+    frames = [audio[i:i + frame_size].tobytes() for i in range(0, len(audio) - frame_size + 1, frame_size)]
+
+    timings = []
+    speech = 0
+    for frame in frames:
+        start = time.perf_counter()
+        speech += vad.is_speech(frame, SAMPLE_RATE)
+        timings.append((time.perf_counter() - start) * 1e6)
+
+    metrics = {
+        "vad.us_per_frame": float(np.mean(timings)),
+        "vad.us_per_frame_p95": _percentile(timings, 95)
+    }
+    return metrics, {"frames": len(frames), "frame_ms": frame_ms, "mode": mode, "speech_fraction": speech / len(frames)}
+
+def bench_intents(n_intents: int = 10000, n_queries: int = 2000) -> SuiteResult:
+    """Routing latency of the agent registry with many registered intents."""
+    from benchmarks.intent_router import run
+
+    result = run(n_intents, n_queries)
+    metrics = {
+        "intents.route_us_p50": result["route_us_p50"],
+        "intents.route_us_p95": result["route_us_p95"],
+        "intents.build_ms": result["build_ms"]
+    }
+    return metrics, result
+
+class HeadlessOutput:
+    def __init__(self, sample_rate: int = SAMPLE_RATE):
+        """
+        Stand-in for AudioIO's playback that consumes audio without a sound device.
+
+        play_stream() returns the same timing dict as AudioIO.play_stream, with
+        time to first audio measured when the first chunk is ready to play.
+        """
+        self.sample_rate = sample_rate
+
+    def play_stream(self, chunks: Iterable[Tuple[np.ndarray, int]]) -> Dict[str, Any]:
+        start_time = time.perf_counter()
+        time_to_first_audio = None
+        n_chunks = 0
+        for _ in chunks:
+            if time_to_first_audio is None:
+                time_to_first_audio = time.perf_counter() - start_time
+            n_chunks += 1
+        return {
+            "time_to_first_audio": time_to_first_audio,
+            "total_time": time.perf_counter() - start_time,
+            "chunks": n_chunks
+        }
+
+def bench_turn(fixtures: List[Dict[str, Any]], repeats: int = 1) -> SuiteResult:
+    """
+    Full VoiceAssistant.process_audio turn latency on recorded commands.
+
+    Runs the real pipeline code (STT, agent, sentence-streamed TTS) with
+    playback replaced by HeadlessOutput. TTS is uncached so every turn pays
+    full synthesis.
+    """
+    from main import VoiceAssistant
+    from utils.stt import create_stt_backend
+    from utils.tts import create_tts_backend
+    from agents.dummy_agent import DummyAgent
+
+    pipeline = SimpleNamespace(
+        stt=create_stt_backend(),
+        tts=create_tts_backend(),
+        agent=DummyAgent(),
+        audio_io=HeadlessOutput()
+    )
+    pipeline.stt.warmup()
+    pipeline.tts.warmup()
+
+    first_audio, totals = [], []
+    for _ in range(repeats):
+        for fixture in fixtures:
+            pipeline.audio_io.sample_rate = fixture["sample_rate"]
+            start = time.perf_counter()
+            result = VoiceAssistant.process_audio(pipeline, fixture["audio"])
+            totals.append(time.perf_counter() - start)
+            if not result["success"]:
+                raise RuntimeError(f"Turn failed on {fixture['name']}: {result['error']}")
+            first_audio.append(result["time_to_first_audio"])
+
+    metrics = {
+        "turn.time_to_first_audio_s": float(np.mean(first_audio)),
+        "turn.time_to_first_audio_p95_s": _percentile(first_audio, 95),
+        "turn.total_s": float(np.mean(totals))
+    }
+    return metrics, {"turns": len(totals)}
@@ -0,0 +1,96 @@
+import argparse
+import json
+import time
+from typing import Any, Callable, Dict
+
+import numpy as np
+
+from utils.pcm import encode_pcm, decode_pcm
+
+def _time_call(fn: Callable[[], Any], repeats: int) -> float:
+    """Return the median wall time of fn in milliseconds."""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings))
+
+def run(duration: float = 10.0, sample_rate: int = 16000, repeats: int = 20) -> Dict[str, Any]:
+    """
+    Compare the JSON sample-list transport against raw PCM for one clip.
+    
+    Args:
+        duration: Clip length in seconds
+        sample_rate: Clip sample rate
+        repeats: Number of timed repetitions per measurement
+        
+    Returns:
+        Dict of payload sizes and median encode/decode times per transport
+    """
+    rng = np.random.default_rng(0)
+    audio = (rng.standard_normal(int(duration * sample_rate)) * 3000).astype(np.int16)
+
+    try:
+        from services.audio_transport import AudioRequest
+    except ImportError:
+        AudioRequest = None
+
+    def json_encode():
+        return json.dumps({"audio_data": audio.tolist(), "sample_rate": sample_rate})
+
+    json_payload = json_encode()
+
+    def json_decode():
+        body = json.loads(json_payload)
+        if AudioRequest is not None:
+            # Include the per-element pydantic validation the service pays
+            return np.array(AudioRequest(**body).audio_data, dtype=np.int16)
+        return np.array(body["audio_data"], dtype=np.int16)
+
+    pcm_payload = encode_pcm(audio)
+
+    results = {
+        "duration_s": duration,
+        "sample_rate": sample_rate,
+        "json": {
+            "payload_bytes": len(json_payload.encode()),
+            "encode_ms": _time_call(json_encode, repeats),
+            "decode_ms": _time_call(json_decode, repeats),
+            "pydantic_validation": AudioRequest is not None,
+        },
+        "pcm_int16": {
+            "payload_bytes": len(pcm_payload),
+            "encode_ms": _time_call(lambda: encode_pcm(audio), repeats),
+            "decode_ms": _time_call(lambda: decode_pcm(pcm_payload), repeats),
+        },
+    }
+    float_payload = encode_pcm(audio.astype(np.float32) / 32768.0, "float32")
+    results["pcm_float32"] = {
+        "payload_bytes": len(float_payload),
+        "encode_ms": _time_call(lambda: encode_pcm(audio.astype(np.float32) / 32768.0, "float32"), repeats),
+        "decode_ms": _time_call(lambda: decode_pcm(float_payload, "float32"), repeats),
+    }
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark JSON vs PCM audio transport")
+    parser.add_argument("--duration", type=float, default=10.0, help="Clip length in seconds")
+    parser.add_argument("--sample-rate", type=int, default=16000, help="Clip sample rate")
+    parser.add_argument("--repeats", type=int, default=20, help="Timed repetitions")
+    parser.add_argument("--output", help="Optional path to write JSON results")
+    args = parser.parse_args()
+
+    results = run(args.duration, args.sample_rate, args.repeats)
+
+    print(f"{'transport':<12} {'bytes':>12} {'encode ms':>10} {'decode ms':>10}")
+    for name in ("json", "pcm_int16", "pcm_float32"):
+        r = results[name]
+        print(f"{name:<12} {r['payload_bytes']:>12,} {r['encode_ms']:>10.2f} {r['decode_ms']:>10.2f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+import argparse
+import json
+import multiprocessing
+import resource
+import sys
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+from config.settings import TTS_MODEL, TTS_SPEAKER
+
+# Mix of short replies and a longer multi-clause sentence
+DEFAULT_SENTENCES = [
+    "Hello! How can I help you today?",
+    "The weather tomorrow looks sunny with a high of twenty two degrees.",
+    "I've set a timer for ten minutes.",
+    "Sorry, I didn't catch that; could you say it again, a little more slowly, please?",
+]
+
+def _rss_mb() -> float:
+    """Current resident set size of this process in MiB."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * resource.getpagesize() / 2**20
+    except OSError:
+        return _peak_rss_mb()
+
+def _peak_rss_mb() -> float:
+    """Peak resident set size of this process in MiB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+def _measure(model_name: str, speaker_id: Optional[str], sentences: Sequence[str], repeats: int) -> Dict[str, Any]:
+    """Load one backend and time it; runs in a fresh process so memory is its own."""
+    from utils.tts import create_tts_backend
+
+    baseline_mb = _rss_mb()
+    start = time.perf_counter()
+    tts = create_tts_backend(model_name=model_name, speaker_id=speaker_id)
+    load_seconds = time.perf_counter() - start
+    loaded_mb = _rss_mb()
+    tts.warmup()
+
+    total_wall = total_audio = 0.0
+    first_sentence_ms: List[float] = []
+    for _ in range(repeats):
+        for i, sentence in enumerate(sentences):
+            start = time.perf_counter()
+            wav, sample_rate = tts.synthesize_to_array(sentence)
+            wall = time.perf_counter() - start
+            total_wall += wall
+            total_audio += len(wav) / sample_rate
+            if i == 0:
+                first_sentence_ms.append(wall * 1000)
+
+    return {
+        "backend": type(tts).__name__,
+        "model": model_name,
+        "sample_rate": tts.sample_rate,
+        "load_s": load_seconds,
+        "model_rss_mb": loaded_mb - baseline_mb,
+        "peak_rss_mb": _peak_rss_mb(),
+        "rtf": total_wall / total_audio if total_audio else 0.0,
+        "first_sentence_ms": min(first_sentence_ms) if first_sentence_ms else 0.0,
+        "audio_s": total_audio
+    }
+
+def run(models: Sequence[str],
+        speaker_id: Optional[str] = TTS_SPEAKER,
+        sentences: Sequence[str] = DEFAULT_SENTENCES,
+        repeats: int = 3) -> Dict[str, Any]:
+    """
+    Compare memory footprint and real-time factor of TTS backends.
+
+    Args:
+        models: TTS_MODEL values (Coqui model names or Piper .onnx paths)
+        speaker_id: Speaker passed to every backend
+        sentences: Texts synthesized per repeat
+        repeats: Passes over sentences
+
+    Returns:
+        Dict keyed by model with load time, RSS added by the model, peak RSS,
+        real-time factor (wall / audio seconds) and fastest first-sentence time
+    """
+    # Spawn so no backend inherits another's loaded libraries
+    context = multiprocessing.get_context("spawn")
+    results = {}
+    with context.Pool(1, maxtasksperchild=1) as pool:
+        for model_name in models:
+            results[model_name] = pool.apply(_measure, (model_name, speaker_id, list(sentences), repeats))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare memory and real-time factor across TTS backends")
+    parser.add_argument("--models", nargs="+", default=[TTS_MODEL],
+                        help="Coqui model names and/or Piper .onnx voice paths")
+    parser.add_argument("--speaker", default=TTS_SPEAKER, help="Speaker for multi-speaker models")
+    parser.add_argument("--repeats", type=int, default=3, help="Passes over the test sentences")
+    parser.add_argument("--output", help="Optional path to write JSON results")
+    args = parser.parse_args()
+
+    results = run(args.models, args.speaker, repeats=args.repeats)
+
+    print(f"{'model':<40} {'backend':<10} {'RSS MiB':>8} {'peak MiB':>9} {'RTF':>7} {'first ms':>9}")
+    for name, r in results.items():
+        print(f"{name[-40:]:<40} {r['backend']:<10} {r['model_rss_mb']:>8.0f} {r['peak_rss_mb']:>9.0f} "
+              f"{r['rtf']:>7.3f} {r['first_sentence_ms']:>9.0f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
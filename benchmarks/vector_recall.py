@@ -0,0 +1,117 @@
+import argparse
+import json
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from benchmarks.memory_store import make_turn
+from config.settings import MEMORY_IVF_PROBES
+from memory.vector_store import VectorMemory
+
+# A year of continuous use at one turn a minute
+TURNS_PER_YEAR = 365 * 24 * 60
+
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+def _time_recall(memory: VectorMemory, queries: List[str], k: int, **kwargs: Any) -> Dict[str, Any]:
+    timings = []
+    results = []
+    for query in queries:
+        start = time.perf_counter()
+        records = memory.recall(query, k=k, **kwargs)
+        timings.append((time.perf_counter() - start) * 1000)
+        results.append([record["id"] for record in records])
+    return {
+        "ms_mean": statistics.mean(timings),
+        "ms_p50": _percentile(timings, 50),
+        "ms_p95": _percentile(timings, 95),
+        "results": results
+    }
+
+def run_memory(n_turns: int,
+               directory: Path,
+               n_queries: int = 200,
+               k: int = 5,
+               batch_size: int = 1000,
+               **kwargs: Any) -> Dict[str, Any]:
+    """
+    Append n_turns to a VectorMemory, one minute apart, and time recall on it.
+
+    Returns:
+        Dict with the append rate, on-disk size, IVF list count, recall
+        latency through the index and exhaustively, and the fraction of the
+        exhaustive top-k the index also returned
+    """
+    rng = random.Random(0)
+    memory = VectorMemory(directory, **kwargs)
+    t0 = time.time() - n_turns * 60
+
+    start = time.perf_counter()
+    for first in range(0, n_turns, batch_size):
+        records = []
+        for i in range(first, min(n_turns, first + batch_size)):
+            turn = make_turn(rng, i)
+            turn.update(id=str(i), timestamp=t0 + i * 60)
+            records.append(turn)
+        memory.write_batch(records)
+    ingest = time.perf_counter() - start
+
+    query_rng = random.Random(1)
+    queries = [make_turn(query_rng, n_turns)["transcript"] for _ in range(n_queries)]
+    indexed = _time_recall(memory, queries, k)
+    exact = _time_recall(memory, queries, k, exact=True)
+    last_week = _time_recall(memory, queries, k, start=t0 + (n_turns - 7 * 24 * 60) * 60)
+    overlap = [len(set(a) & set(b)) / max(1, len(b)) for a, b in zip(indexed["results"], exact["results"])]
+
+    size = sum(path.stat().st_size for path in directory.rglob("*") if path.is_file())
+    return {
+        "turns": n_turns,
+        "append_per_second": n_turns / ingest,
+        "bytes_per_turn": size / n_turns,
+        "ivf_lists": memory.index.lists,
+        "recall_at_k": statistics.mean(overlap),
+        "queries": {
+            name: {key: value for key, value in timing.items() if key != "results"}
+            for name, timing in (("indexed", indexed), ("exact", exact), ("last_week", last_week))
+        }
+    }
+
+def run(n_turns: int = TURNS_PER_YEAR, directory: Optional[Path] = None, **kwargs: Any) -> Dict[str, Any]:
+    """Benchmark a fresh VectorMemory in a scratch directory (a temporary one by default)."""
+    root = Path(tempfile.mkdtemp(prefix="vector_bench_", dir=directory))
+    try:
+        return run_memory(n_turns, root, **kwargs)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark vector memory appends and recall latency")
+    parser.add_argument("--turns", type=int, default=TURNS_PER_YEAR, help="Turns to append (default: a year at one a minute)")
+    parser.add_argument("--queries", type=int, default=200, help="Recall queries to time")
+    parser.add_argument("-k", type=int, default=5, help="Turns recalled per query")
+    parser.add_argument("--probes", type=int, default=MEMORY_IVF_PROBES, help="IVF lists scored per query")
+    parser.add_argument("--dir", type=Path, help="Where to create the scratch store (default: system temp)")
+    parser.add_argument("--output", help="Optional path to write JSON results")
+    args = parser.parse_args()
+
+    print(f"Appending {args.turns} turns...")
+    results = run(args.turns, args.dir, n_queries=args.queries, k=args.k, probes=args.probes)
+
+    print(f"Appended {results['append_per_second']:,.0f} turns/s, {results['bytes_per_turn']:.0f} B/turn, "
+          f"{results['ivf_lists']} IVF lists")
+    for name, timing in results["queries"].items():
+        print(f"  {name:<10} p50 {timing['ms_p50']:7.2f} ms  p95 {timing['ms_p95']:7.2f} ms")
+    print(f"Indexed top-{args.k} agrees with exact on {results['recall_at_k']:.0%}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -25,7 +25,18 @@ def get_settings(env: Optional[str] = None) -> Dict[str, Any]:
     print("Importing base settings...")
     from .base import (
         ROOT_DIR, SAMPLE_RATE, CHANNELS, CHUNK_SIZE, RECORD_SECONDS,
-        MEMORY_DIR, MEMORY_FORMAT
+        STT_BACKEND, STT_COMPUTE_TYPE, STT_CPU_THREADS, TTS_CPU_THREADS,
+        STREAMING_STT, STREAMING_STEP_SECONDS, SPECULATIVE_STT, SPECULATIVE_RESPONSE,
+        AUDIO_BACKEND, AUDIO_REPLAY_SPEED,
+        SHARED_CAPTURE, CAPTURE_BUFFER_SECONDS, PREROLL_SECONDS,
+        ENDPOINT_SILENCE_SECONDS, ENDPOINT_MIN_SILENCE_SECONDS,
+        LAZY_MODEL_LOADING, WARMUP_MODELS,
+        TTS_CACHE_DIR, TTS_CACHE_MEMORY_MB, METRICS_DIR,
+        STT_BATCH_MAX_SIZE, STT_BATCH_WAIT_MS,
+        STT_WORKERS, TTS_WORKERS, STT_MAX_QUEUE, TTS_MAX_QUEUE, REQUEST_TIMEOUT_SECONDS,
+        WAKE_WORD_MAX_MODELS,
+        MEMORY_DIR, MEMORY_FORMAT, MEMORY_BATCH_SIZE, MEMORY_FLUSH_SECONDS,
+        MEMORY_VECTOR_DIM, MEMORY_IVF_MIN_TURNS, MEMORY_IVF_PROBES
     )
     print("Base settings imported successfully")
     
@@ -37,8 +48,41 @@ def get_settings(env: Optional[str] = None) -> Dict[str, Any]:
         'CHANNELS': CHANNELS,
         'CHUNK_SIZE': CHUNK_SIZE,
         'RECORD_SECONDS': RECORD_SECONDS,
+        'STT_BACKEND': STT_BACKEND,
+        'STT_COMPUTE_TYPE': STT_COMPUTE_TYPE,
+        'STT_CPU_THREADS': STT_CPU_THREADS,
+        'TTS_CPU_THREADS': TTS_CPU_THREADS,
+        'STREAMING_STT': STREAMING_STT,
+        'STREAMING_STEP_SECONDS': STREAMING_STEP_SECONDS,
+        'SPECULATIVE_STT': SPECULATIVE_STT,
+        'SPECULATIVE_RESPONSE': SPECULATIVE_RESPONSE,
+        'AUDIO_BACKEND': AUDIO_BACKEND,
+        'AUDIO_REPLAY_SPEED': AUDIO_REPLAY_SPEED,
+        'SHARED_CAPTURE': SHARED_CAPTURE,
+        'CAPTURE_BUFFER_SECONDS': CAPTURE_BUFFER_SECONDS,
+        'PREROLL_SECONDS': PREROLL_SECONDS,
+        'ENDPOINT_SILENCE_SECONDS': ENDPOINT_SILENCE_SECONDS,
+        'ENDPOINT_MIN_SILENCE_SECONDS': ENDPOINT_MIN_SILENCE_SECONDS,
+        'LAZY_MODEL_LOADING': LAZY_MODEL_LOADING,
+        'WARMUP_MODELS': WARMUP_MODELS,
+        'TTS_CACHE_DIR': TTS_CACHE_DIR,
+        'TTS_CACHE_MEMORY_MB': TTS_CACHE_MEMORY_MB,
+        'METRICS_DIR': METRICS_DIR,
+        'STT_BATCH_MAX_SIZE': STT_BATCH_MAX_SIZE,
+        'STT_BATCH_WAIT_MS': STT_BATCH_WAIT_MS,
+        'STT_WORKERS': STT_WORKERS,
+        'TTS_WORKERS': TTS_WORKERS,
+        'STT_MAX_QUEUE': STT_MAX_QUEUE,
+        'TTS_MAX_QUEUE': TTS_MAX_QUEUE,
+        'REQUEST_TIMEOUT_SECONDS': REQUEST_TIMEOUT_SECONDS,
+        'WAKE_WORD_MAX_MODELS': WAKE_WORD_MAX_MODELS,
         'MEMORY_DIR': MEMORY_DIR,
-        'MEMORY_FORMAT': MEMORY_FORMAT
+        'MEMORY_FORMAT': MEMORY_FORMAT,
+        'MEMORY_BATCH_SIZE': MEMORY_BATCH_SIZE,
+        'MEMORY_FLUSH_SECONDS': MEMORY_FLUSH_SECONDS,
+        'MEMORY_VECTOR_DIM': MEMORY_VECTOR_DIM,
+        'MEMORY_IVF_MIN_TURNS': MEMORY_IVF_MIN_TURNS,
+        'MEMORY_IVF_PROBES': MEMORY_IVF_PROBES
     }
     print("Base settings initialized")
     
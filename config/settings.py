@@ -10,6 +10,23 @@ CHANNELS = 1         # Number of audio channels (1 for mono)
 CHUNK_SIZE = 1024   # Size of audio chunks for processing
 RECORD_SECONDS = 5  # Default recording duration
 
+# Streaming STT settings
+STREAMING_STT = True          # Decode partial transcripts while the user is speaking
+STREAMING_STEP_SECONDS = 1.0  # New audio required before each partial decode
+SPECULATIVE_STT = True        # Transcribe when speech pauses, before the endpoint is confirmed
+SPECULATIVE_RESPONSE = False  # Also run the agent and pre-render the first TTS sentence
+
+# Audio backend settings
+AUDIO_BACKEND = "sounddevice"  # "sounddevice", or "replay:<wav>[,<wav>...]" to run from recordings
+AUDIO_REPLAY_SPEED = 1.0       # Replay clock speed-up (1.0 = real time)
+
+# Capture settings
+SHARED_CAPTURE = True          # One always-on input stream shared by wake word and recording
+CAPTURE_BUFFER_SECONDS = 30.0  # Audio history kept in the capture ring buffer
+PREROLL_SECONDS = 0.3          # Audio from before the wake word detection kept in commands
+ENDPOINT_SILENCE_SECONDS = 0.8      # Silence that ends a command
+ENDPOINT_MIN_SILENCE_SECONDS = 0.3  # Shorter timeout once the command sounds complete
+
 # Audio device settings
 # Set to None to use system default, or specify a device name to use that device
 # Example: "MacBook Pro Microphone" or "Arman's iPhone Microphone"
@@ -22,18 +39,55 @@ WHISPER_MODEL = "base"  # Options: "tiny", "base", "small", "medium", "large"
 WHISPER_LANGUAGE = "en"  # Language code for transcription
 WHISPER_TASK = "transcribe"  # "transcribe" or "translate"
 
+# STT backend settings
+STT_BACKEND = "whisper"   # "whisper" (openai-whisper, fp32) or "faster-whisper" (CTranslate2)
+STT_COMPUTE_TYPE = "int8" # faster-whisper weight/compute type: "int8", "int8_float32", "float32"
+STT_CPU_THREADS = 0       # faster-whisper intra-op threads (0 lets CTranslate2 decide)
+
 # TTS settings
 TTS_MODEL = "tts_models/en/vctk/vits"  # Higher quality multi-speaker model
 TTS_VOCODER = "vocoder_models/en/ljspeech/multiband-melgan"  # Better voice quality
 TTS_SPEAKER = "p335"  # VCTK speaker ID for more natural voice
 TTS_LANGUAGE = "en"  # Language code for TTS
 
+# TTS backend settings
+# TTS_MODEL may also be a path to a Piper .onnx voice, which runs on ONNX Runtime
+TTS_CPU_THREADS = 0  # ONNX Runtime intra-op threads for Piper voices (0 lets it decide)
+
 # Output device settings
 OUTPUT_DEVICE = None  # None uses default audio device
 
+# Startup settings
+LAZY_MODEL_LOADING = False  # Start listening before STT/TTS finish loading
+WARMUP_MODELS = True        # Run a dummy inference on each model before reporting ready
+
+# TTS cache settings
+TTS_CACHE_DIR = ROOT_DIR / "cache" / "tts"  # On-disk tier; survives restarts
+TTS_CACHE_MEMORY_MB = 64                    # Byte budget of the in-memory LRU tier
+
+# STT service batching settings
+STT_BATCH_MAX_SIZE = 8    # Maximum /transcribe requests decoded together
+STT_BATCH_WAIT_MS = 20.0  # How long the first request waits for others to join
+
+# Service worker settings
+STT_WORKERS = 1                # STT worker processes, each with its own model replica
+TTS_WORKERS = 1                # TTS worker processes, each with its own model replica
+STT_MAX_QUEUE = 16             # Requests allowed to wait for an STT worker before 429
+TTS_MAX_QUEUE = 16             # Requests allowed to wait for a TTS worker before 429
+REQUEST_TIMEOUT_SECONDS = 30.0  # Per-request deadline for queued and running work
+WAKE_WORD_MAX_MODELS = 4       # Wake word models shared by all streaming sessions
+
+# Metrics settings
+METRICS_DIR = ROOT_DIR / "metrics"  # Where the assistant dumps metrics snapshots
+
 # Memory settings
 MEMORY_DIR = ROOT_DIR / "memory" / "logs"
 MEMORY_FORMAT = "json"  # Options: json, sqlite, vector
+MEMORY_BATCH_SIZE = 64      # Turns written per batch by the background writer
+MEMORY_FLUSH_SECONDS = 1.0  # Longest a logged turn waits before being written
+MEMORY_VECTOR_DIM = 256         # Embedding size of the vector memory
+MEMORY_IVF_MIN_TURNS = 50000    # Turns before vector recall switches from exact to IVF search
+MEMORY_IVF_PROBES = 16          # IVF lists scored per recall (top-5 matches exact search ~86% of the time; 8 probes: ~73%)
 
 # Create necessary directories
 MEMORY_DIR.mkdir(parents=True, exist_ok=True)
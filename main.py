@@ -1,11 +1,11 @@
+import atexit
 import sys
 import os
 from pathlib import Path
-import tempfile
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable, Union
+import time
+from concurrent.futures import ThreadPoolExecutor, Future
 import numpy as np
-from datetime import datetime
-import wave
 
 print("Starting main.py...")
 
@@ -15,19 +15,30 @@ sys.path.append(str(project_root))
 print(f"Project root: {project_root}")
 
 from utils.audio_io import AudioIO
-from utils.stt import WhisperSTT
-from utils.tts import CoquiTTS
+from utils.audio_device import AudioDevice, create_audio_device
+from utils.capture import CaptureService
+from utils.endpointer import Endpointer
+from utils.speculation import Speculator
+from utils.stt import STTBackend, create_stt_backend
+from utils.streaming_stt import StreamingTranscriber
+from utils.tts import create_tts_backend
+from utils.tts_cache import TTSCache, CachedTTS
 from utils.wake_word import WakeWordDetector
+from utils.timeline import StartupTimeline
+from utils.metrics import metrics
 from agents.dummy_agent import DummyAgent
+from memory.memory_logger import create_memory_logger
 from config import get_settings
 
 class VoiceAssistant:
-    def __init__(self, env: Optional[str] = None):
+    def __init__(self, env: Optional[str] = None, audio_device: Optional[AudioDevice] = None):
         """
         Initialize the voice assistant with all necessary components.
         
         Args:
             env: Environment name ('development' or 'production'). If None, uses ENV environment variable.
+            audio_device: Microphone/speaker backend. If None, built from the
+                AUDIO_BACKEND setting.
         """
         print("\nInitializing Voice Assistant...")
         print(f"Environment: {env}")
@@ -39,88 +50,221 @@ class VoiceAssistant:
         
         # Initialize components
         print("Initializing audio I/O...")
-        self.audio_io = AudioIO(device_name=self.settings['AUDIO_INPUT_DEVICE'])
+        if audio_device is None:
+            audio_device = create_audio_device(
+                self.settings['AUDIO_BACKEND'],
+                speed=self.settings['AUDIO_REPLAY_SPEED']
+            )
+        self.audio_device = audio_device
+        self.audio_io = AudioIO(device_name=self.settings['AUDIO_INPUT_DEVICE'], audio_device=audio_device)
         print("Audio I/O initialized")
         
-        print("Initializing wake word detector...")
-        self.wake_word = WakeWordDetector()
-        print("Wake word detector initialized")
-        
-        print("Initializing STT...")
-        self.stt = WhisperSTT(
-            model_name=self.settings['WHISPER_MODEL'],
-            language=self.settings['WHISPER_LANGUAGE'],
-            task=self.settings['WHISPER_TASK']
-        )
-        print("STT initialized")
+        # One always-on input stream shared by wake word detection and recording
+        self.capture = None
+        if self.settings['SHARED_CAPTURE']:
+            print("Initializing shared audio capture...")
+            self.capture = CaptureService(
+                sample_rate=self.audio_io.sample_rate,
+                device=self.audio_io.device_id,
+                buffer_seconds=self.settings['CAPTURE_BUFFER_SECONDS'],
+                audio_device=audio_device
+            )
+            print("Shared audio capture initialized")
         
-        print("Initializing TTS...")
-        self.tts = CoquiTTS(
-            model_name=self.settings['TTS_MODEL'],
-            speaker_id=self.settings['TTS_SPEAKER']
+        # Turns are written by a background thread, never on the turn's critical path
+        print("Initializing memory...")
+        self.memory = create_memory_logger(
+            memory_format=self.settings['MEMORY_FORMAT'],
+            directory=self.settings['MEMORY_DIR'],
+            batch_size=self.settings['MEMORY_BATCH_SIZE'],
+            flush_interval=self.settings['MEMORY_FLUSH_SECONDS']
         )
-        print("TTS initialized")
+        # The writer is a daemon thread; queued turns are flushed however the process ends
+        self._closed = False
+        atexit.register(self.close)
+        print("Memory initialized")
         
         print("Initializing agent...")
-        self.agent = DummyAgent()
+        self.agent = DummyAgent(memory=self.memory)
         print("Agent initialized")
         
-        # Create temp directory for audio files
-        print("Creating temporary directory...")
-        self.temp_dir = tempfile.mkdtemp()
-        print(f"Temporary directory created at: {self.temp_dir}")
+        # Load the independent models concurrently, each followed by a warm-up
+        # inference. With lazy loading only the wake word model is awaited here;
+        # STT and TTS keep loading while the wake word listener already runs.
+        self.startup_timeline = StartupTimeline()
+        self._executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix="model-loader")
+        self._components: Dict[str, Future] = {
+            'wake_word': self._executor.submit(self._load_wake_word),
+            'stt': self._executor.submit(self._load_stt),
+            'tts': self._executor.submit(self._load_tts)
+        }
+        self._executor.shutdown(wait=False)
+        
+        if self.settings['LAZY_MODEL_LOADING']:
+            # Listening needs the wake word model right away
+            self._components['wake_word'].result()
+            print("Wake word ready; STT and TTS are loading in the background")
+            for future in self._components.values():
+                future.add_done_callback(self._on_component_loaded)
+        else:
+            for future in self._components.values():
+                future.result()
+            print("\nStartup timeline:")
+            print(self.startup_timeline.format())
+        print("Voice Assistant ready")
+
+    def _load_component(self, name: str, loader: Callable[[], Any]) -> Any:
+        """Load a component, then warm it up if enabled, recording both on the timeline."""
+        with self.startup_timeline.phase(name, "load"):
+            component = loader()
+        if self.settings['WARMUP_MODELS']:
+            with self.startup_timeline.phase(name, "warmup"):
+                component.warmup()
+        print(f"{name} initialized")
+        return component
+
+    def _load_wake_word(self) -> WakeWordDetector:
+        return self._load_component('wake_word', lambda: WakeWordDetector(
+            capture=self.capture,
+            audio_device=self.audio_device
+        ))
+
+    def _load_stt(self) -> STTBackend:
+        return self._load_component('stt', lambda: create_stt_backend(
+            backend=self.settings['STT_BACKEND'],
+            model_name=self.settings['WHISPER_MODEL'],
+            language=self.settings['WHISPER_LANGUAGE'],
+            task=self.settings['WHISPER_TASK']
+        ))
+
+    def _load_tts(self) -> CachedTTS:
+        # Serve repeated sentences from cache; pre-render the agent's static responses
+        tts = self._load_component('tts', lambda: CachedTTS(
+            create_tts_backend(
+                model_name=self.settings['TTS_MODEL'],
+                speaker_id=self.settings['TTS_SPEAKER']
+            ),
+            TTSCache(
+                cache_dir=self.settings['TTS_CACHE_DIR'],
+                max_memory_bytes=self.settings['TTS_CACHE_MEMORY_MB'] * 1024 * 1024
+            )
+        ))
+        with self.startup_timeline.phase('tts', "precompute"):
+            synthesized = tts.precompute(self.agent.get_static_responses())
+        print(f"Static responses ready ({synthesized} newly synthesized)")
+        return tts
+
+    def _on_component_loaded(self, future: Future) -> None:
+        """Print the startup timeline once every lazily loaded component is ready."""
+        if all(f.done() for f in self._components.values()):
+            print("\nStartup timeline:")
+            print(self.startup_timeline.format())
+
+    @property
+    def wake_word(self) -> WakeWordDetector:
+        """Wake word detector; blocks until loaded."""
+        return self._components['wake_word'].result()
+
+    @property
+    def stt(self) -> STTBackend:
+        """Speech-to-text engine; blocks until loaded when loading lazily."""
+        return self._components['stt'].result()
+
+    @property
+    def tts(self) -> CachedTTS:
+        """Text-to-speech engine; blocks until loaded when loading lazily."""
+        return self._components['tts'].result()
 
-    def process_audio(self, audio_data: np.ndarray) -> Dict[str, Any]:
-        """Process audio data through the entire pipeline."""
+    def process_audio(self,
+                      audio_data: np.ndarray,
+                      transcription: Optional[Dict[str, Any]] = None,
+                      response: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Process audio data through the entire pipeline.
+        
+        Args:
+            audio_data: Recorded command audio
+            transcription: Transcription already produced while recording
+                (streaming or speculative mode). If None, the audio is transcribed here.
+            response: Agent response already produced speculatively. If None,
+                the agent is run here.
+        """
         try:
-            # 1. Save audio to temporary file
-            print("\n2. Saving audio to temporary file...")
-            temp_audio_path = Path(self.temp_dir) / f"temp_audio_{datetime.now().strftime('%Y%m%d_%H%M%S')}.wav"
-            self.audio_io.save_audio(audio_data, temp_audio_path)
-            print(f"   Saved to: {temp_audio_path}")
-
-            # 2. Transcribe audio
-            print("3. Transcribing audio...")
-            transcription = self.stt.transcribe(str(temp_audio_path))
+            # 1. Transcribe audio straight from the capture buffer
+            if transcription is None:
+                print("\n2. Transcribing audio...")
+                with metrics.span("stage_latency", stage="stt"):
+                    transcription = self.stt.transcribe(audio_data, sample_rate=self.audio_io.sample_rate)
             print(f"   You said: {transcription['text']}")
 
-            # 3. Process with agent
-            print("4. Processing with agent...")
-            response = self.agent.process(transcription['text'])
+            # 2. Process with agent
+            if response is None:
+                print("3. Processing with agent...")
+                with metrics.span("stage_latency", stage="agent"):
+                    response = self.agent.process(transcription['text'])
             print(f"   Assistant response: {response}")
 
-            # 4. Convert response to speech
-            print("5. Converting response to speech...")
-            temp_tts_path = Path(self.temp_dir) / f"temp_tts_{datetime.now().strftime('%Y%m%d_%H%M%S')}.wav"
-            self.tts.synthesize(response, str(temp_tts_path))
-            print(f"   Generated audio at: {temp_tts_path}")
-
-            # 5. Play response
-            print("6. Playing response...")
-            with wave.open(str(temp_tts_path), 'rb') as wf:
-                audio_data = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
-                self.audio_io.play_audio(audio_data, wf.getframerate())
-
-            # 6. Clean up
-            print("7. Cleaning up temporary files...")
-            temp_audio_path.unlink()
-            temp_tts_path.unlink()
+            # 3. Synthesize and play the response sentence by sentence
+            print("4. Speaking response...")
+            speak_start = time.perf_counter()
+            with metrics.span("stage_latency", stage="speak"):
+                playback = self.audio_io.play_stream(self.tts.synthesize_stream(response))
+            first_audio_at = None
+            if playback["time_to_first_audio"] is not None:
+                first_audio_at = speak_start + playback["time_to_first_audio"]
+                metrics.observe("tts_time_to_first_audio", playback["time_to_first_audio"])
+                print(f"   Time to first audio: {playback['time_to_first_audio']:.3f}s")
 
             return {
                 "transcription": transcription,
                 "response": response,
+                "time_to_first_audio": playback["time_to_first_audio"],
+                "first_audio_at": first_audio_at,
                 "success": True
             }
 
         except Exception as e:
             print(f"Error in processing pipeline: {e}")
             return {
+                "transcription": transcription,
+                "response": response,
                 "success": False,
                 "error": str(e)
             }
 
-    def run_once(self):
-        """Run a single iteration of the voice assistant."""
+    def _speculate(self,
+                   audio_data: np.ndarray,
+                   streamer: Optional[StreamingTranscriber]) -> Dict[str, Any]:
+        """
+        Transcribe (and optionally answer) a command before its endpoint is confirmed.
+        
+        Runs on the speculation thread; the result is discarded if speech resumes.
+        
+        Args:
+            audio_data: Recording up to the pause
+            streamer: Streaming transcriber holding the same audio, if streaming
+        """
+        if streamer is not None:
+            # Reuses the committed partial segments and never overlaps a partial decode
+            transcription = streamer.transcribe_buffered()
+        else:
+            transcription = self.stt.transcribe(audio_data, sample_rate=self.audio_io.sample_rate,
+                                                kind="speculative")
+        result = {"transcription": transcription}
+        if self.settings['SPECULATIVE_RESPONSE']:
+            result["response"] = self.agent.process(transcription['text'])
+            # Render the first sentence into the TTS cache so playback starts from it
+            next(self.tts.synthesize_stream(result["response"]), None)
+        return result
+
+    def run_once(self) -> Optional[Dict[str, Any]]:
+        """
+        Run a single iteration of the voice assistant.
+        
+        Returns:
+            process_audio() result (with success False if the pipeline failed),
+            or None if no wake word was heard or recording failed
+        """
         print("\nRunning single test iteration...")
         
         try:
@@ -137,24 +281,117 @@ class VoiceAssistant:
             
             # Stop wake word detection
             print("Wake word detected, stopping detection...")
+            turn_start = time.perf_counter()
             self.wake_word.stop_listening()
             
-            # Record command with VAD
+            # Record command with VAD, decoding partial transcripts as it arrives
             print("\n1. Recording command...")
-            audio_data = self.audio_io.record_audio(
-                max_duration=10.0,
-                silence_duration=0.8
+            endpointer = Endpointer(
+                sample_rate=self.capture.sample_rate if self.capture is not None else self.audio_io.sample_rate,
+                silence_duration=self.settings['ENDPOINT_SILENCE_SECONDS'],
+                min_silence_duration=self.settings['ENDPOINT_MIN_SILENCE_SECONDS']
             )
+            
+            def on_partial(text: str):
+                print(f"   ... {text}")
+                # A complete-sounding partial lets the endpointer stop sooner
+                if streamer.partial_position is not None:
+                    endpointer.hint_transcript(text, streamer.partial_position)
+            
+            streamer = None
+            if self.settings['STREAMING_STT']:
+                streamer = StreamingTranscriber(
+                    self.stt,
+                    sample_rate=self.audio_io.sample_rate,
+                    step_seconds=self.settings['STREAMING_STEP_SECONDS'],
+                    on_partial=on_partial
+                )
+                streamer.start()
+            # Transcribe at each pause so STT overlaps the silence timeout
+            speculator = None
+            if self.settings['SPECULATIVE_STT']:
+                speculator = Speculator(lambda audio: self._speculate(audio, streamer))
+            # Include pre-roll from just before the detection point
+            start_position = None
+            detection = self.wake_word.last_detection
+            if self.capture is not None and detection and detection["position"] is not None:
+                preroll = int(self.settings['PREROLL_SECONDS'] * self.capture.sample_rate)
+                start_position = detection["position"] - preroll
+            try:
+                with metrics.span("stage_latency", stage="record"):
+                    audio_data = self.audio_io.record_audio(
+                        max_duration=10.0,
+                        # Tag audio with the endpointer position so partials can be matched to it
+                        on_audio=(lambda chunk: streamer.add_audio(chunk, endpointer.samples_processed))
+                            if streamer is not None else None,
+                        capture=self.capture,
+                        start_position=start_position,
+                        endpointer=endpointer,
+                        on_pause=speculator.on_pause if speculator is not None else None,
+                        on_resume=speculator.on_resume if speculator is not None else None
+                    )
+            except Exception:
+                if streamer is not None:
+                    streamer.stop()
+                if speculator is not None:
+                    speculator.close()
+                raise
+            recorded_at = time.perf_counter()
             print("Command recorded successfully")
             
+            transcription = None
+            response = None
+            speculative = None
+            if speculator is not None:
+                with metrics.span("stage_latency", stage="speculation"):
+                    speculative = speculator.commit()
+                speculator.close()
+            if speculative is not None:
+                print("\n2. Using the transcript decoded during the pause")
+                transcription = speculative["transcription"]
+                response = speculative.get("response")
+                if streamer is not None:
+                    streamer.stop()
+            elif streamer is not None:
+                print("\n2. Finalizing transcript...")
+                with metrics.span("stage_latency", stage="stt"):
+                    transcription = streamer.finish()
+                print(f"   Re-decoded {transcription['tail_seconds']:.2f}s tail "
+                      f"in {transcription['final_decode_time']:.2f}s")
+            
             # Process the audio through the pipeline
             print("Processing audio...")
-            result = self.process_audio(audio_data)
+            result = self.process_audio(audio_data, transcription, response)
+            turn_latency = time.perf_counter() - turn_start
+            metrics.observe("turn_latency", turn_latency)
+            response_latency = None
+            if result.get("first_audio_at") is not None:
+                # End of recording to first audible response
+                response_latency = result["first_audio_at"] - recorded_at
+                metrics.observe("response_latency", response_latency)
             
+            # Failed turns are logged too, with whatever was heard and the error
+            heard = result.get("transcription") or {}
+            self.memory.log_turn(
+                transcript=heard.get("text", ""),
+                response=result.get("response") or "",
+                segments=heard.get("segments"),
+                timings={
+                    "turn": turn_latency,
+                    "response_latency": response_latency,
+                    "time_to_first_audio": result.get("time_to_first_audio"),
+                    "endpoint": self.audio_io.last_endpoint
+                },
+                language=heard.get("language"),
+                speculative=speculative is not None,
+                agent=self.agent.get_state(),
+                error=result.get("error")
+            )
             if result["success"]:
                 print("\nCommand processed successfully!")
             else:
                 print("\nCommand processing failed. Check the error message above.")
+            return result
 
         except Exception as e:
             print(f"\nError during test: {e}")
@@ -169,7 +406,43 @@ class VoiceAssistant:
                 self.run_once()
         except KeyboardInterrupt:
             print("\nStopping voice assistant...")
-            self.wake_word.stop_listening()
+            self.close()
+            self.dump_metrics(self.settings['METRICS_DIR'] / f"metrics_{time.strftime('%Y%m%d_%H%M%S')}.json")
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """
+        Stop listening and write every queued memory turn to disk.
+        
+        Safe to call more than once; also registered to run at interpreter exit.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        wake_word = getattr(self, "_components", {}).get('wake_word')
+        if wake_word is not None and wake_word.done() and wake_word.exception() is None:
+            wake_word.result().stop_listening()
+        if self.capture is not None:
+            self.capture.stop()
+        self.memory.close()
+
+    def dump_metrics(self, path: Optional[Union[str, Path]] = None) -> Dict[str, Any]:
+        """
+        Print per-stage latency and throughput metrics and optionally save them.
+        
+        Args:
+            path: Optional JSON file to write the snapshot to
+            
+        Returns:
+            Metrics snapshot (same format as the services' /metrics endpoint)
+        """
+        print("\nMetrics:")
+        print(metrics.format())
+        if path is not None:
+            metrics.dump(path)
+            print(f"Metrics written to {path}")
+        return metrics.snapshot()
 
 if __name__ == "__main__":
     print("Starting voice assistant...")
@@ -0,0 +1,515 @@
+import json
+import queue
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, Union
+
+from config.settings import MEMORY_DIR, MEMORY_FORMAT
+
+# Word tokens for text queries, close to SQLite FTS5's default tokenizer
+_WORD = re.compile(r"\w+")
+
+def _dumps(record: Dict[str, Any]) -> str:
+    # STT segments can hold NumPy scalars and arrays; store their plain values
+    return json.dumps(record, default=lambda value: value.tolist() if hasattr(value, "tolist") else str(value))
+
+class MemoryBackend(ABC):
+    """Durable store of conversation turns; written from one thread, queried from any."""
+
+    @abstractmethod
+    def write_batch(self, records: List[Dict[str, Any]]) -> None:
+        """Persist records (dicts with at least timestamp, transcript and response)."""
+
+    @abstractmethod
+    def query(self,
+              start: Optional[float] = None,
+              end: Optional[float] = None,
+              text: Optional[str] = None,
+              limit: Optional[int] = 100,
+              newest_first: bool = False) -> List[Dict[str, Any]]:
+        """
+        Find turns in a time range and/or containing text.
+
+        Args:
+            start: Earliest timestamp (time.time() seconds), inclusive
+            end: Latest timestamp, exclusive
+            text: Words that must all appear (as whole words) in the
+                transcript or response
+            limit: Maximum number of turns returned (None: all)
+            newest_first: Return the most recent matches, newest first
+
+        Returns:
+            Matching records, oldest first unless newest_first
+        """
+
+    @abstractmethod
+    def count(self) -> int:
+        """Number of stored turns."""
+
+    def close(self) -> None:
+        """Release files and connections."""
+
+class JsonlMemory(MemoryBackend):
+    def __init__(self, directory: Union[str, Path] = MEMORY_DIR):
+        """
+        Append-only JSON-lines store with one file per day.
+
+        Time-range queries only open the files of the days in the range.
+        Within a file turns are in write order, so the first file is
+        binary-searched for the start of the range and the scan stops at the
+        first turn past its end. Text queries scan every candidate line; use
+        SQLiteMemory for indexed text search.
+
+        Args:
+            directory: Directory holding the turns-YYYYMMDD.jsonl files
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, day: str) -> Path:
+        return self.directory / f"turns-{day}.jsonl"
+
+    @staticmethod
+    def _day(timestamp: float) -> str:
+        return datetime.fromtimestamp(timestamp).strftime("%Y%m%d")
+
+    def write_batch(self, records: List[Dict[str, Any]]) -> None:
+        by_day: Dict[str, List[str]] = {}
+        for record in records:
+            by_day.setdefault(self._day(record["timestamp"]), []).append(_dumps(record))
+        for day, lines in by_day.items():
+            with open(self._path(day), "a", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+
+    def _files(self, start: Optional[float], end: Optional[float]) -> List[Path]:
+        first = self._day(start) if start is not None else None
+        last = self._day(end) if end is not None else None
+        files = []
+        for path in sorted(self.directory.glob("turns-*.jsonl")):
+            day = path.stem.split("-", 1)[1]
+            if (first is None or day >= first) and (last is None or day <= last):
+                files.append(path)
+        return files
+
+    @staticmethod
+    def _seek(f: BinaryIO, start: float) -> None:
+        """Binary-search f (lines in time order) to a line boundary before the first turn at or after start."""
+        f.seek(0, 2)
+        low, high = 0, f.tell()
+        while low < high:
+            middle = (low + high) // 2
+            f.seek(middle)
+            if middle:
+                f.readline()  # Skip to the next line boundary
+            line = f.readline()
+            if line.strip() and json.loads(line)["timestamp"] < start:
+                low = f.tell()
+            else:
+                high = middle
+        f.seek(low)
+
+    def _scan_backward(self, start: Optional[float], end: Optional[float]) -> Iterator[Dict[str, Any]]:
+        for path in reversed(self._files(start, end)):
+            with open(path, "rb") as f:
+                lines = f.readlines()
+            for line in reversed(lines):
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if end is not None and record["timestamp"] >= end:
+                    continue
+                if start is not None and record["timestamp"] < start:
+                    return
+                yield record
+
+    def _scan(self, start: Optional[float], end: Optional[float]) -> Iterator[Dict[str, Any]]:
+        for index, path in enumerate(self._files(start, end)):
+            with open(path, "rb") as f:
+                if index == 0 and start is not None:
+                    self._seek(f, start)
+                for line in f:
+                    if not line.strip():
+                        continue
+                    record = json.loads(line)
+                    if start is not None and record["timestamp"] < start:
+                        continue
+                    if end is not None and record["timestamp"] >= end:
+                        break
+                    yield record
+
+    def query(self,
+              start: Optional[float] = None,
+              end: Optional[float] = None,
+              text: Optional[str] = None,
+              limit: Optional[int] = 100,
+              newest_first: bool = False) -> List[Dict[str, Any]]:
+        words = set(_WORD.findall(text.lower())) if text else set()
+        results = []
+        records = self._scan_backward(start, end) if newest_first else self._scan(start, end)
+        for record in records:
+            if words:
+                haystack = f"{record.get('transcript', '')} {record.get('response', '')}".lower()
+                if not words.issubset(_WORD.findall(haystack)):
+                    continue
+            results.append(record)
+            if limit is not None and len(results) >= limit:
+                break
+        return results
+
+    def count(self) -> int:
+        total = 0
+        for path in self._files(None, None):
+            with open(path, "rb") as f:
+                total += sum(1 for line in f if line.strip())
+        return total
+
+class SQLiteMemory(MemoryBackend):
+    def __init__(self, directory: Union[str, Path] = MEMORY_DIR, filename: str = "memory.db"):
+        """
+        SQLite store in WAL mode with a timestamp index and full-text search.
+
+        WAL lets queries run while the writer thread commits. Transcripts and
+        responses are indexed with FTS5 when the SQLite build has it;
+        otherwise text queries fall back to a LIKE scan. Text queries return
+        turns in logging order, which is time order as long as turns are
+        logged as they happen.
+
+        Args:
+            directory: Directory holding the database
+            filename: Database file name
+        """
+        Path(directory).mkdir(parents=True, exist_ok=True)
+        self.path = Path(directory) / filename
+        # Connections are per thread: the writer thread writes, callers read
+        self._local = threading.local()
+        connection = self._connection()
+        connection.executescript("""
+            CREATE TABLE IF NOT EXISTS turns (
+                id INTEGER PRIMARY KEY,
+                turn_id TEXT NOT NULL,
+                timestamp REAL NOT NULL,
+                session TEXT,
+                transcript TEXT,
+                response TEXT,
+                data TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS turns_timestamp ON turns (timestamp);
+            CREATE INDEX IF NOT EXISTS turns_session ON turns (session, timestamp);
+        """)
+        try:
+            connection.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS turns_fts USING fts5("
+                "transcript, response, content='turns', content_rowid='id')"
+            )
+            self.full_text = True
+        except sqlite3.OperationalError:
+            print("SQLite has no FTS5; text queries will scan")
+            self.full_text = False
+        connection.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(str(self.path))
+            connection.execute("PRAGMA journal_mode=WAL")
+            # Durable at checkpoints; a crash can lose only the last commits
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def write_batch(self, records: List[Dict[str, Any]]) -> None:
+        connection = self._connection()
+        with connection:
+            for record in records:
+                cursor = connection.execute(
+                    "INSERT INTO turns (turn_id, timestamp, session, transcript, response, data) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (record["id"], record["timestamp"], record.get("session"),
+                     record.get("transcript", ""), record.get("response", ""), _dumps(record))
+                )
+                if self.full_text:
+                    connection.execute(
+                        "INSERT INTO turns_fts (rowid, transcript, response) VALUES (?, ?, ?)",
+                        (cursor.lastrowid, record.get("transcript", ""), record.get("response", ""))
+                    )
+
+    def query(self,
+              start: Optional[float] = None,
+              end: Optional[float] = None,
+              text: Optional[str] = None,
+              limit: Optional[int] = 100,
+              newest_first: bool = False) -> List[Dict[str, Any]]:
+        connection = self._connection()
+        conditions, params = [], []
+        if start is not None:
+            conditions.append("turns.timestamp >= ?")
+            params.append(start)
+        if end is not None:
+            conditions.append("turns.timestamp < ?")
+            params.append(end)
+        words = _WORD.findall(text) if text else []
+        if words and self.full_text:
+            # Walk the full-text matches in rowid (logging) order, which avoids
+            # sorting every match by timestamp; the time range becomes a rowid
+            # range FTS5 can skip to, and the timestamp conditions stay exact
+            source = "turns_fts JOIN turns ON turns.id = turns_fts.rowid"
+            order = "turns_fts.rowid"
+            conditions.append("turns_fts MATCH ?")
+            # Quoted so words like OR and NOT are never parsed as FTS syntax
+            params.append(" ".join(f'"{word}"' for word in words))
+            bounds = [("turns_fts.rowid >= ?", "timestamp >= ? ORDER BY timestamp", start),
+                      ("turns_fts.rowid <= ?", "timestamp < ? ORDER BY timestamp DESC", end)]
+            for condition, search, timestamp in bounds:
+                if timestamp is None:
+                    continue
+                row_id = self._first_id(connection, search, timestamp)
+                if row_id is None:
+                    return []
+                conditions.append(condition)
+                params.append(row_id)
+        else:
+            source = "turns"
+            order = "turns.timestamp"
+            for word in words:
+                conditions.append("(turns.transcript LIKE ? OR turns.response LIKE ?)")
+                params.extend([f"%{word}%"] * 2)
+
+        sql = f"SELECT turns.data FROM {source}"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += f" ORDER BY {order} DESC" if newest_first else f" ORDER BY {order}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [json.loads(row[0]) for row in connection.execute(sql, params)]
+
+    @staticmethod
+    def _first_id(connection: sqlite3.Connection, search: str, timestamp: float) -> Optional[int]:
+        """Row id of the first turn found by search (via the timestamp index), or None."""
+        row = connection.execute(f"SELECT id FROM turns WHERE {search} LIMIT 1", (timestamp,)).fetchone()
+        return row[0] if row is not None else None
+
+    def count(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM turns").fetchone()[0]
+
+    def close(self) -> None:
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+def _vector_memory(directory: Union[str, Path] = MEMORY_DIR, **kwargs: Any) -> MemoryBackend:
+    # Imported on use: the vector store needs NumPy and builds on this module
+    from memory.vector_store import VectorMemory
+    return VectorMemory(directory, **kwargs)
+
+MEMORY_BACKENDS = {
+    "json": JsonlMemory,
+    "sqlite": SQLiteMemory,
+    "vector": _vector_memory
+}
+
+class _Flush:
+    """Queue marker: the writer sets done once everything before it is written."""
+
+    def __init__(self):
+        self.done = threading.Event()
+
+class MemoryLogger:
+    def __init__(self,
+                 backend: MemoryBackend,
+                 batch_size: int = 256,
+                 flush_interval: float = 1.0,
+                 max_pending: int = 100000,
+                 session: Optional[str] = None):
+        """
+        Record conversation turns without blocking the caller on disk.
+
+        log_turn() only enqueues the record. A background thread collects
+        records into batches of up to batch_size (or whatever arrived within
+        flush_interval) and writes each batch in one backend call, e.g. one
+        SQLite transaction.
+
+        Args:
+            backend: Store the batches are written to
+            batch_size: Maximum records per write
+            flush_interval: Longest a record waits before being written, in seconds
+            max_pending: Records queued before log_turn() starts dropping them
+            session: Session identifier stored with every turn (default: random)
+        """
+        self.backend = backend
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.session = session or uuid.uuid4().hex[:12]
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self.stats = {"logged": 0, "written": 0, "dropped": 0, "batches": 0, "failed": 0}
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="memory-writer", daemon=True)
+        self._thread.start()
+
+    def log_turn(self,
+                 transcript: str,
+                 response: str,
+                 segments: Optional[List[Dict[str, Any]]] = None,
+                 timings: Optional[Dict[str, Any]] = None,
+                 timestamp: Optional[float] = None,
+                 **extra: Any) -> Optional[Dict[str, Any]]:
+        """
+        Queue one turn for writing; never blocks.
+
+        Args:
+            transcript: What the user said
+            response: What the assistant answered
+            segments: STT segments of the transcript
+            timings: Latencies of the turn, in seconds
+            timestamp: time.time() of the turn (default: now)
+            **extra: Additional JSON-serializable fields (e.g. language, agent)
+
+        Returns:
+            The queued record, or None if it was dropped because the writer
+            is too far behind
+        """
+        record = {
+            "id": uuid.uuid4().hex,
+            "timestamp": time.time() if timestamp is None else timestamp,
+            "session": self.session,
+            "transcript": transcript,
+            "response": response,
+            "segments": segments or [],
+            "timings": timings or {},
+            **extra
+        }
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.stats["dropped"] += 1
+            return None
+        self.stats["logged"] += 1
+        return record
+
+    def _run(self) -> None:
+        while self._running or not self._queue.empty():
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            batch, flushes = [], []
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if isinstance(item, _Flush):
+                    flushes.append(item)
+                    # Write now instead of waiting for a full batch
+                    deadline = 0
+                elif item is None:
+                    # Closing: write what is here without waiting
+                    deadline = 0
+                else:
+                    batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+            if batch:
+                self._write(batch)
+            for flush in flushes:
+                flush.done.set()
+        # Connections are per thread; release the writer's
+        self.backend.close()
+
+    def _write(self, batch: List[Dict[str, Any]]) -> None:
+        try:
+            self.backend.write_batch(batch)
+        except Exception as e:
+            print(f"Error writing {len(batch)} memory records: {e}")
+            self.stats["failed"] += len(batch)
+            return
+        self.stats["written"] += len(batch)
+        self.stats["batches"] += 1
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every turn logged so far has been written.
+
+        Returns:
+            True if flushed within timeout
+        """
+        marker = _Flush()
+        self._queue.put(marker)
+        return marker.done.wait(timeout)
+
+    def query(self,
+              start: Optional[float] = None,
+              end: Optional[float] = None,
+              text: Optional[str] = None,
+              limit: Optional[int] = 100,
+              newest_first: bool = False) -> List[Dict[str, Any]]:
+        """Query written turns (see MemoryBackend.query); queued turns are not visible yet."""
+        return self.backend.query(start=start, end=end, text=text, limit=limit, newest_first=newest_first)
+
+    def recall(self,
+               text: str,
+               k: int = 5,
+               start: Optional[float] = None,
+               end: Optional[float] = None,
+               min_score: float = 0.0,
+               exclude: Optional[Callable[[Dict[str, Any]], bool]] = None) -> List[Dict[str, Any]]:
+        """
+        Find past turns related to text.
+
+        Ranked by similarity with the vector backend (records get a score,
+        and min_score applies). Other backends return the most recent turns
+        containing all of text's words, newest first.
+
+        Args:
+            text: What the turns should be about
+            k: Maximum number of turns
+            start: Earliest timestamp, inclusive
+            end: Latest timestamp, exclusive
+            min_score: Minimum similarity (vector backend only)
+            exclude: Returns True for records to leave out; more candidates
+                are fetched until k remain or none are left
+        """
+        recall = getattr(self.backend, "recall", None)
+        fetch = k
+        while True:
+            if recall is not None:
+                found = recall(text, k=fetch, start=start, end=end, min_score=min_score)
+            else:
+                found = self.backend.query(start=start, end=end, text=text, limit=fetch, newest_first=True)
+            kept = [record for record in found if exclude is None or not exclude(record)]
+            if len(kept) >= k or len(found) < fetch:
+                return kept[:k]
+            fetch *= 4
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Write everything still queued, stop the writer and close the backend."""
+        self._running = False
+        self._queue.put(None)  # Wake the writer
+        self._thread.join(timeout)
+        self.backend.close()
+
+def create_memory_logger(memory_format: str = MEMORY_FORMAT,
+                         directory: Union[str, Path] = MEMORY_DIR,
+                         **kwargs: Any) -> MemoryLogger:
+    """
+    Create a MemoryLogger with the backend named by memory_format.
+
+    Args:
+        memory_format: One of MEMORY_BACKENDS ("json", "sqlite", "vector")
+        directory: Directory the backend stores its files in
+        **kwargs: Passed to MemoryLogger (batch_size, flush_interval, ...)
+
+    Returns:
+        Running MemoryLogger
+    """
+    if memory_format not in MEMORY_BACKENDS:
+        raise ValueError(f"Unknown memory format {memory_format!r}; expected one of {sorted(MEMORY_BACKENDS)}")
+    return MemoryLogger(MEMORY_BACKENDS[memory_format](directory), **kwargs)
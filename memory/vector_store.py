@@ -0,0 +1,437 @@
+import json
+import threading
+import zlib
+import numpy as np
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from config.settings import MEMORY_DIR, MEMORY_VECTOR_DIM, MEMORY_IVF_MIN_TURNS, MEMORY_IVF_PROBES
+from memory.memory_logger import MemoryBackend, _WORD, _dumps
+
+class HashingEmbedder:
+    # Feature weights: whole words dominate, bigrams add word order,
+    # character trigrams let word forms match ("timer" and "timers")
+    WORD_WEIGHT = 1.0
+    BIGRAM_WEIGHT = 0.7
+    TRIGRAM_WEIGHT = 0.25
+
+    def __init__(self, dim: int = MEMORY_VECTOR_DIM):
+        """
+        Offline text embedder based on the hashing trick.
+
+        Words, word bigrams and character trigrams are hashed into dim
+        signed buckets and the result is L2-normalized, so the inner product
+        of two vectors is their cosine similarity. It needs no model or
+        vocabulary, and a text's vector never changes, so stored vectors
+        stay valid however long the history grows.
+
+        Args:
+            dim: Vector size
+        """
+        self.dim = dim
+        self._features: Dict[str, Tuple[int, float]] = {}
+
+    def _feature(self, feature: str, weight: float) -> Tuple[int, float]:
+        cached = self._features.get(feature)
+        if cached is None:
+            digest = zlib.crc32(feature.encode("utf-8"))
+            cached = (digest % self.dim, -weight if digest & 0x80000000 else weight)
+            # Bounded: a long-running assistant keeps seeing new words
+            if len(self._features) < 1_000_000:
+                self._features[feature] = cached
+        return cached
+
+    def _text_features(self, text: str) -> Iterable[Tuple[int, float]]:
+        words = _WORD.findall(text.lower())
+        for i, word in enumerate(words):
+            yield self._feature(f"w:{word}", self.WORD_WEIGHT)
+            if i:
+                yield self._feature(f"b:{words[i - 1]} {word}", self.BIGRAM_WEIGHT)
+            padded = f"#{word}#"
+            for j in range(len(padded) - 2):
+                yield self._feature(f"c:{padded[j:j + 3]}", self.TRIGRAM_WEIGHT)
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts.
+
+        Returns:
+            (len(texts), dim) float32 array of unit vectors (all zeros for a
+            text without words)
+        """
+        indices, weights = [], []
+        for row, text in enumerate(texts):
+            offset = row * self.dim
+            for index, weight in self._text_features(text):
+                indices.append(offset + index)
+                weights.append(weight)
+        vectors = np.bincount(np.asarray(indices, dtype=np.int64), weights=weights,
+                              minlength=len(texts) * self.dim)
+        vectors = vectors.reshape(len(texts), self.dim).astype(np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.divide(vectors, norms, out=vectors, where=norms > 0)
+        return vectors
+
+class _AppendOnlyArray:
+    def __init__(self, path: Path, dtype: Any, width: int = 1):
+        """
+        Array stored as raw rows in a file, grown by appending and read
+        through a memory map (remapped only when rows were added).
+
+        Args:
+            path: File holding the rows
+            dtype: Element type
+            width: Elements per row (1: a flat array)
+        """
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.width = width
+        self._row_bytes = self.dtype.itemsize * width
+        self.path.touch(exist_ok=True)
+        # Drop a partial row left by an interrupted append
+        self.truncate(self.path.stat().st_size // self._row_bytes)
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def _shape(self, rows: int) -> Tuple[int, ...]:
+        return (rows, self.width) if self.width > 1 else (rows,)
+
+    def append(self, values: np.ndarray) -> None:
+        values = np.ascontiguousarray(values, dtype=self.dtype)
+        with open(self.path, "ab") as f:
+            f.write(values.tobytes())
+        self._rows += values.size // self.width
+
+    def replace(self, values: np.ndarray) -> None:
+        """Overwrite every row with values."""
+        values = np.ascontiguousarray(values, dtype=self.dtype)
+        with open(self.path, "wb") as f:
+            f.write(values.tobytes())
+        self._rows = values.size // self.width
+        self._view = None
+
+    def truncate(self, rows: int) -> None:
+        with open(self.path, "r+b") as f:
+            f.truncate(rows * self._row_bytes)
+        self._rows = rows
+        self._view: Optional[np.ndarray] = None
+
+    def view(self) -> np.ndarray:
+        """Read-only array of the current rows; rows appended later are not included."""
+        rows = self._rows
+        view = self._view
+        if view is None or len(view) != rows:
+            if rows:
+                view = np.memmap(self.path, dtype=self.dtype, mode="r", shape=self._shape(rows))
+            else:
+                view = np.empty(self._shape(0), dtype=self.dtype)
+            self._view = view
+        return view
+
+class VectorIndex:
+    # Rows per chunk when scoring a whole matrix against the centroids
+    ASSIGN_CHUNK = 16384
+    KMEANS_ITERATIONS = 10
+    KMEANS_SAMPLES_PER_LIST = 64
+
+    def __init__(self,
+                 directory: Union[str, Path],
+                 dim: int = MEMORY_VECTOR_DIM,
+                 ivf_min_rows: int = MEMORY_IVF_MIN_TURNS,
+                 probes: int = MEMORY_IVF_PROBES):
+        """
+        Inner-product top-k index over a memory-mapped float32 matrix.
+
+        Below ivf_min_rows every search is exact: one matrix-vector product
+        over the memory map. From then on an inverted-file (IVF) index
+        partitions the rows into about sqrt(rows) lists around k-means
+        centroids, and a search only scores the rows of the probes lists
+        whose centroids are closest to the query. Appended rows are assigned
+        to their nearest centroid, so appends never rebuild the index; the
+        centroids are retrained only each time the number of rows has
+        quadrupled.
+
+        Args:
+            directory: Directory holding the index files
+            dim: Vector size
+            ivf_min_rows: Rows before the IVF index is trained
+            probes: Lists scored per IVF search
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.dim = dim
+        self.ivf_min_rows = ivf_min_rows
+        self.probes = probes
+        self._vectors = _AppendOnlyArray(self.directory / "vectors.f32", np.float32, dim)
+        self._assignments = _AppendOnlyArray(self.directory / "assignments.i32", np.int32)
+        self._centroids_path = self.directory / "centroids.npy"
+        self._centroids: Optional[np.ndarray] = None
+        self._lists: List[np.ndarray] = []
+        # Guards swapping the IVF structures; searches work on a snapshot
+        self._lock = threading.Lock()
+        if self._centroids_path.exists():
+            centroids = np.load(self._centroids_path)
+            if centroids.shape[1] != dim:
+                raise ValueError(f"Index in {self.directory} has dimension {centroids.shape[1]}, not {dim}")
+            self._load_ivf(centroids)
+
+    def __len__(self) -> int:
+        return len(self._vectors)
+
+    @property
+    def lists(self) -> int:
+        """Number of IVF lists (0 while searches are exact)."""
+        return 0 if self._centroids is None else len(self._centroids)
+
+    def _assign(self, vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+        assignments = np.empty(len(vectors), dtype=np.int32)
+        for start in range(0, len(vectors), self.ASSIGN_CHUNK):
+            chunk = vectors[start:start + self.ASSIGN_CHUNK]
+            assignments[start:start + len(chunk)] = np.argmax(chunk @ centroids.T, axis=1)
+        return assignments
+
+    @staticmethod
+    def _group(assignments: np.ndarray, n_lists: int) -> List[np.ndarray]:
+        # Stable sort keeps each list's rows ascending
+        order = np.argsort(assignments, kind="stable")
+        bounds = np.searchsorted(assignments[order], np.arange(n_lists + 1))
+        return [order[bounds[i]:bounds[i + 1]] for i in range(n_lists)]
+
+    def _load_ivf(self, centroids: np.ndarray) -> None:
+        rows = len(self._vectors)
+        if len(self._assignments) > rows:
+            self._assignments.truncate(rows)
+        elif len(self._assignments) < rows:
+            # Rows appended before an interrupted assignment
+            tail = self._vectors.view()[len(self._assignments):]
+            self._assignments.append(self._assign(tail, centroids))
+        self._lists = self._group(self._assignments.view(), len(centroids))
+        self._centroids = centroids
+
+    def truncate(self, rows: int) -> None:
+        """Drop rows past the first rows (used to recover from an interrupted write)."""
+        with self._lock:
+            self._vectors.truncate(rows)
+            if self._centroids is not None:
+                self._assignments.truncate(min(rows, len(self._assignments)))
+                self._load_ivf(self._centroids)
+
+    def append(self, vectors: np.ndarray) -> None:
+        """
+        Add rows (unit vectors), assigning them to IVF lists if trained.
+
+        Must be called from one thread at a time; searches may run concurrently.
+        """
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        first = len(self._vectors)
+        self._vectors.append(vectors)
+        centroids = self._centroids
+        if centroids is not None:
+            assignments = self._assign(vectors, centroids)
+            self._assignments.append(assignments)
+            rows = np.arange(first, first + len(vectors))
+            with self._lock:
+                for list_id in np.unique(assignments):
+                    self._lists[list_id] = np.concatenate([self._lists[list_id], rows[assignments == list_id]])
+
+        rows = len(self._vectors)
+        if rows >= self.ivf_min_rows and (centroids is None or rows >= 4 * len(centroids) ** 2):
+            self.train()
+
+    def train(self) -> None:
+        """(Re)build the IVF index with about sqrt(rows) lists from spherical k-means."""
+        matrix = self._vectors.view()
+        n_lists = int(np.clip(np.sqrt(len(matrix)), 1, 4096))
+        rng = np.random.default_rng(0)
+        n_samples = min(len(matrix), n_lists * self.KMEANS_SAMPLES_PER_LIST)
+        sample = np.asarray(matrix[np.sort(rng.choice(len(matrix), n_samples, replace=False))])
+        centroids = sample[rng.choice(n_samples, n_lists, replace=False)].copy()
+        for _ in range(self.KMEANS_ITERATIONS):
+            assignments = self._assign(sample, centroids)
+            order = np.argsort(assignments, kind="stable")
+            used, starts = np.unique(assignments[order], return_index=True)
+            # Empty lists keep their previous centroid
+            centroids[used] = np.add.reduceat(sample[order], starts, axis=0)
+            norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+            np.divide(centroids, norms, out=centroids, where=norms > 0)
+
+        assignments = self._assign(matrix, centroids)
+        lists = self._group(assignments, n_lists)
+        with self._lock:
+            self._assignments.replace(assignments)
+            np.save(self._centroids_path, centroids)
+            self._centroids = centroids
+            self._lists = lists
+        print(f"Vector memory: indexed {len(matrix)} turns in {n_lists} lists")
+
+    def search(self,
+               query: np.ndarray,
+               k: Optional[int],
+               start: int = 0,
+               end: Optional[int] = None,
+               exact: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the rows with the highest inner product with query.
+
+        Args:
+            query: Unit vector of size dim
+            k: Number of rows returned (None: every candidate)
+            start: First row considered
+            end: Row after the last one considered (default: all rows)
+            exact: Score every row in range even when the IVF index exists
+
+        Returns:
+            (rows, scores), best first
+        """
+        matrix = self._vectors.view()
+        end = len(matrix) if end is None else min(end, len(matrix))
+        if end <= start:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        with self._lock:
+            centroids, lists = self._centroids, list(self._lists)
+
+        if exact or centroids is None or end - start <= self.ivf_min_rows:
+            # Exact: a small range costs less to score whole than to probe
+            rows = None
+            scores = matrix[start:end] @ query
+        else:
+            probed = np.argpartition(-(centroids @ query), min(self.probes, len(centroids)) - 1)[:self.probes]
+            rows = np.sort(np.concatenate([lists[list_id] for list_id in probed]))
+            rows = rows[(rows >= start) & (rows < end)]
+            scores = matrix[rows] @ query
+
+        if k is not None and k < len(scores):
+            best = np.argpartition(-scores, k - 1)[:k]
+        else:
+            best = np.arange(len(scores))
+        best = best[np.argsort(-scores[best], kind="stable")]
+        found = best + start if rows is None else rows[best]
+        return found.astype(np.int64), scores[best]
+
+class VectorMemory(MemoryBackend):
+    def __init__(self,
+                 directory: Union[str, Path] = MEMORY_DIR,
+                 dim: int = MEMORY_VECTOR_DIM,
+                 ivf_min_turns: int = MEMORY_IVF_MIN_TURNS,
+                 probes: int = MEMORY_IVF_PROBES,
+                 embedder: Optional[Callable[[List[str]], np.ndarray]] = None):
+        """
+        Local vector store for semantic recall over past turns.
+
+        Each turn's transcript and response are embedded into one row of a
+        VectorIndex; the turn itself is appended to a JSON-lines file and
+        found again through a byte offset per row. Timestamps are kept per
+        row too, and since turns are logged as they happen they are sorted,
+        so a time range maps to a row range by binary search.
+
+        Unlike the other backends, query() with text ranks turns by
+        similarity (most similar first, ignoring newest_first) instead of
+        requiring its words.
+
+        Args:
+            directory: Parent directory; files go in its "vector" subdirectory
+            dim: Vector size
+            ivf_min_turns: Turns before searches go through the IVF index
+            probes: IVF lists scored per search
+            embedder: Function mapping texts to (n, dim) unit vectors
+                (default: HashingEmbedder)
+        """
+        self.directory = Path(directory) / "vector"
+        self.index = VectorIndex(self.directory, dim=dim, ivf_min_rows=ivf_min_turns, probes=probes)
+        self.embed = embedder or HashingEmbedder(dim).embed
+        self._turns_path = self.directory / "turns.jsonl"
+        self._turns_path.touch(exist_ok=True)
+        self._timestamps = _AppendOnlyArray(self.directory / "timestamps.f64", np.float64)
+        # Written last: a row exists once its offset does
+        self._offsets = _AppendOnlyArray(self.directory / "offsets.i64", np.int64)
+
+        rows = min(len(self.index), len(self._timestamps), len(self._offsets))
+        if not rows == len(self.index) == len(self._timestamps) == len(self._offsets):
+            print(f"Vector memory: recovering from an interrupted write ({rows} turns kept)")
+            self.index.truncate(rows)
+            self._timestamps.truncate(rows)
+            self._offsets.truncate(rows)
+
+    @staticmethod
+    def _text(record: Dict[str, Any]) -> str:
+        return f"{record.get('transcript', '')} {record.get('response', '')}"
+
+    def write_batch(self, records: List[Dict[str, Any]]) -> None:
+        vectors = self.embed([self._text(record) for record in records])
+        lines = [(_dumps(record) + "\n").encode("utf-8") for record in records]
+        offsets = np.empty(len(lines), dtype=np.int64)
+        with open(self._turns_path, "ab") as f:
+            offset = f.tell()
+            for i, line in enumerate(lines):
+                offsets[i] = offset
+                offset += len(line)
+            f.write(b"".join(lines))
+        self._timestamps.append(np.array([record["timestamp"] for record in records], dtype=np.float64))
+        self.index.append(vectors)
+        self._offsets.append(offsets)
+
+    def _rows(self, start: Optional[float], end: Optional[float]) -> Tuple[int, int]:
+        rows = len(self._offsets)
+        timestamps = self._timestamps.view()[:rows]
+        first = 0 if start is None else int(np.searchsorted(timestamps, start, side="left"))
+        last = rows if end is None else int(np.searchsorted(timestamps, end, side="left"))
+        return first, last
+
+    def _read(self, rows: Iterable[int]) -> List[Dict[str, Any]]:
+        offsets = self._offsets.view()
+        records = []
+        with open(self._turns_path, "rb") as f:
+            for row in rows:
+                f.seek(int(offsets[row]))
+                records.append(json.loads(f.readline()))
+        return records
+
+    def recall(self,
+               text: str,
+               k: Optional[int] = 5,
+               start: Optional[float] = None,
+               end: Optional[float] = None,
+               min_score: float = 0.0,
+               exact: bool = False) -> List[Dict[str, Any]]:
+        """
+        Find the past turns most similar to text.
+
+        Args:
+            text: Query text
+            k: Maximum number of turns (None: all in range)
+            start: Earliest timestamp, inclusive
+            end: Latest timestamp, exclusive
+            min_score: Minimum cosine similarity
+            exact: Score every turn in range instead of probing the IVF index
+
+        Returns:
+            Records, most similar first, each with an added score
+        """
+        first, last = self._rows(start, end)
+        rows, scores = self.index.search(self.embed([text])[0], k, first, last, exact=exact)
+        keep = scores > min_score
+        records = self._read(rows[keep])
+        for record, score in zip(records, scores[keep]):
+            record["score"] = float(score)
+        return records
+
+    def query(self,
+              start: Optional[float] = None,
+              end: Optional[float] = None,
+              text: Optional[str] = None,
+              limit: Optional[int] = 100,
+              newest_first: bool = False) -> List[Dict[str, Any]]:
+        if text:
+            return self.recall(text, k=limit, start=start, end=end)
+        first, last = self._rows(start, end)
+        if newest_first:
+            if limit is not None:
+                first = max(first, last - limit)
+            return self._read(range(last - 1, first - 1, -1))
+        if limit is not None:
+            last = min(last, first + limit)
+        return self._read(range(first, last))
+
+    def count(self) -> int:
+        return len(self._offsets)
@@ -1,13 +1,15 @@
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Union
 from pathlib import Path
-from utils.stt import WhisperSTT
-from config.settings import WHISPER_MODEL, WHISPER_LANGUAGE, WHISPER_TASK
+import numpy as np
+from utils.stt import create_stt_backend
+from config.settings import STT_BACKEND, WHISPER_MODEL, WHISPER_LANGUAGE, WHISPER_TASK, SAMPLE_RATE
 
 class SpeechToText:
     def __init__(self,
                  model_name: str = WHISPER_MODEL,
                  language: str = WHISPER_LANGUAGE,
-                 task: str = WHISPER_TASK):
+                 task: str = WHISPER_TASK,
+                 backend: str = STT_BACKEND):
         """
         Initialize the Speech-to-Text module.
         
@@ -15,19 +17,24 @@ class SpeechToText:
             model_name: Name of the Whisper model to use
             language: Language code for transcription
             task: Task type (transcribe/translate)
+            backend: STT engine, "whisper" or "faster-whisper"
         """
-        self.stt_engine = WhisperSTT(
+        self.stt_engine = create_stt_backend(
+            backend=backend,
             model_name=model_name,
             language=language,
             task=task
         )
 
-    def transcribe(self, audio_path: str) -> Dict[str, Any]:
+    def transcribe(self,
+                   audio: Union[str, np.ndarray],
+                   sample_rate: int = SAMPLE_RATE) -> Dict[str, Any]:
         """
-        Transcribe audio file to text.
+        Transcribe an audio file or an in-memory audio buffer to text.
         
         Args:
-            audio_path: Path to the audio file
+            audio: Path to the audio file, or an int16/float32 NumPy buffer
+            sample_rate: Sample rate of the buffer (ignored for file paths)
             
         Returns:
             Dict containing transcription results with keys:
@@ -35,10 +42,10 @@ class SpeechToText:
             - language: Detected language
             - segments: List of transcription segments
         """
-        if not Path(audio_path).exists():
-            raise FileNotFoundError(f"Audio file not found: {audio_path}")
+        if isinstance(audio, (str, Path)) and not Path(audio).exists():
+            raise FileNotFoundError(f"Audio file not found: {audio}")
             
-        return self.stt_engine.transcribe(audio_path)
+        return self.stt_engine.transcribe(audio, sample_rate=sample_rate)
 
     def get_model_info(self) -> Dict[str, str]:
         """
@@ -48,6 +55,7 @@ class SpeechToText:
             Dict containing model configuration information
         """
         return {
+            "backend": type(self.stt_engine).__name__,
             "model_name": self.stt_engine.model_name,
             "language": self.stt_engine.language,
             "task": self.stt_engine.task
@@ -0,0 +1,44 @@
+import json
+import numpy as np
+from typing import Tuple
+from fastapi import HTTPException, Request
+from fastapi.responses import Response
+from pydantic import BaseModel, ValidationError
+
+from utils.pcm import (
+    PCM_MEDIA_TYPE,
+    JSON_MEDIA_TYPE,
+    decode_pcm,
+    encode_pcm,
+    pcm_headers,
+    parse_pcm_headers
+)
+
+class AudioRequest(BaseModel):
+    audio_data: list
+    sample_rate: int
+
+async def read_audio_request(request: Request) -> Tuple[np.ndarray, int]:
+    """
+    Read audio from either a PCM body or the legacy JSON body.
+    
+    Returns:
+        Tuple of (audio_data, sample_rate)
+    """
+    content_type = request.headers.get("content-type", JSON_MEDIA_TYPE).split(";")[0].strip().lower()
+    try:
+        if content_type == PCM_MEDIA_TYPE:
+            sample_rate, dtype = parse_pcm_headers(request.headers)
+            return decode_pcm(await request.body(), dtype), sample_rate
+        if content_type == JSON_MEDIA_TYPE:
+            body = AudioRequest(**json.loads(await request.body()))
+            return np.array(body.audio_data, dtype=np.int16), body.sample_rate
+    except (ValueError, TypeError, ValidationError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    raise HTTPException(status_code=415, detail=f"Unsupported content type: {content_type}")
+
+def pcm_response(audio_data: np.ndarray, sample_rate: int, dtype: str = "int16") -> Response:
+    """Build a PCM response carrying its sample rate and dtype in headers."""
+    headers = pcm_headers(sample_rate, dtype)
+    media_type = headers.pop("Content-Type")
+    return Response(content=encode_pcm(audio_data, dtype), media_type=media_type, headers=headers)
@@ -0,0 +1,120 @@
+import asyncio
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Union, Awaitable
+
+from utils.metrics import metrics
+
+class MicroBatcher:
+    def __init__(self,
+                 process_batch: Callable[[List[Any]], Union[List[Any], Awaitable[List[Any]]]],
+                 max_batch_size: int = 8,
+                 max_wait_ms: float = 20.0,
+                 executor: Optional[Executor] = None,
+                 max_concurrency: int = 1,
+                 name: str = "batch"):
+        """
+        Group concurrent requests into batches for a model.
+        
+        The first request of a batch waits at most max_wait_ms for others to
+        arrive, or until max_batch_size requests are queued, then the whole
+        batch runs in one process_batch call and each caller gets its own
+        result back. Larger windows trade tail latency for throughput.
+        
+        Args:
+            process_batch: Maps a list of items to a list of results in order.
+                Coroutine functions are awaited directly; plain functions run
+                in executor.
+            max_batch_size: Maximum items per batch
+            max_wait_ms: Maximum time the oldest item waits for the batch to fill
+            executor: Where plain process_batch functions run (default: one
+                dedicated thread, so the event loop never blocks on inference)
+            max_concurrency: Batches allowed in flight at once (e.g. one per
+                worker process)
+            name: Metric label for this batcher
+        """
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        if executor is None and not asyncio.iscoroutinefunction(process_batch):
+            executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"{name}-batcher")
+        self.executor = executor
+        self.max_concurrency = max_concurrency
+        self.name = name
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._in_flight: Optional[asyncio.Semaphore] = None
+
+    def _ensure_started(self) -> None:
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._in_flight = asyncio.Semaphore(self.max_concurrency)
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def submit(self, item: Any) -> Any:
+        """
+        Queue an item and wait for its result.
+        
+        Raises:
+            Exception: Whatever process_batch raised for the batch
+        """
+        self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future, time.perf_counter()))
+        return await future
+
+    async def _collect(self) -> List[tuple]:
+        """Wait for one item, then gather more until the batch is full or the window closes."""
+        batch = [await self._queue.get()]
+        deadline = batch[0][2] + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            # Only start collecting once the batch can actually be dispatched,
+            # so requests keep joining while every worker is busy
+            await self._in_flight.acquire()
+            batch = await self._collect()
+            # Callers that gave up don't need a slot in the batch
+            batch = [entry for entry in batch if not entry[1].cancelled()]
+            if not batch:
+                self._in_flight.release()
+                continue
+            loop.create_task(self._dispatch(batch))
+
+    async def _dispatch(self, batch: List[tuple]) -> None:
+        """Run one batch and scatter its results back to the callers."""
+        start = time.perf_counter()
+        for _, _, enqueued in batch:
+            metrics.observe("batch_queue_wait", start - enqueued, batcher=self.name)
+        metrics.observe("batch_size", len(batch), batcher=self.name)
+
+        items = [item for item, _, _ in batch]
+        try:
+            if asyncio.iscoroutinefunction(self.process_batch):
+                results = await self.process_batch(items)
+            else:
+                results = await asyncio.get_running_loop().run_in_executor(
+                    self.executor, self.process_batch, items
+                )
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            metrics.observe("batch_latency", time.perf_counter() - start, batcher=self.name)
+            self._in_flight.release()
+
+        for (_, future, _), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
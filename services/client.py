@@ -1,92 +1,292 @@
 import requests
+from requests.adapters import HTTPAdapter
 import numpy as np
-import sounddevice as sd
-from pathlib import Path
-import tempfile
-import wave
-from datetime import datetime
+import webrtcvad
+import json
+import queue
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Iterator, Optional
+
+from utils.pcm import (
+    PCM_MEDIA_TYPE,
+    encode_pcm,
+    decode_pcm,
+    pcm_headers,
+    parse_pcm_headers
+)
+from utils.framing import vad_frame_size
+from utils.tts import split_sentences
+from utils.audio_device import AudioDevice, SoundDevice
 
 class VoiceAssistantClient:
-    def __init__(self):
+    def __init__(self,
+                 use_pcm: bool = True,
+                 max_connections: int = 4,
+                 vad_mode: int = 3,
+                 audio_device: Optional[AudioDevice] = None):
+        """
+        Initialize the client.
+        
+        Args:
+            use_pcm: Send and receive raw PCM instead of JSON sample lists
+            max_connections: Keep-alive connections pooled per service, and
+                requests that may be in flight at once
+            vad_mode: Local VAD aggressiveness mode, 0-3
+            audio_device: Microphone/speaker backend (default: sounddevice)
+        """
+        self.audio_device = audio_device or SoundDevice()
         self.stt_url = "http://localhost:8001"
         self.tts_url = "http://localhost:8000"
         self.sample_rate = 16000
+        self.use_pcm = use_pcm
+        self.vad = webrtcvad.Vad(vad_mode)
+        
+        # One pooled keep-alive session for every call to both services
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=max_connections)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        
+        # STT and TTS calls can run concurrently through the *_async methods
+        self.executor = ThreadPoolExecutor(max_workers=max_connections)
+        
+        # How much captured audio local VAD kept off the network
+        self.stats = {
+            "audio_seconds_captured": 0.0,
+            "audio_seconds_sent": 0.0,
+            "bytes_sent": 0
+        }
+
+    def close(self) -> None:
+        """Release pooled connections and worker threads."""
+        self.executor.shutdown(wait=False)
+        self.session.close()
+
+    def _post_audio(self, url: str, audio_data: np.ndarray) -> requests.Response:
+        """Post audio to a service using the configured transport."""
+        self.stats["audio_seconds_sent"] += len(audio_data) / self.sample_rate
+        if self.use_pcm:
+            payload = encode_pcm(audio_data)
+            self.stats["bytes_sent"] += len(payload)
+            return self.session.post(
+                url,
+                data=payload,
+                headers=pcm_headers(self.sample_rate)
+            )
+        payload = json.dumps({
+            "audio_data": audio_data.reshape(-1).tolist(),
+            "sample_rate": self.sample_rate
+        })
+        self.stats["bytes_sent"] += len(payload)
+        return self.session.post(
+            url,
+            data=payload,
+            headers={"Content-Type": "application/json"}
+        )
+
+    def speech_segments(self,
+                        silence_duration: float = 0.5,
+                        preroll_seconds: float = 0.3,
+                        max_segment_seconds: float = 5.0) -> Iterator[np.ndarray]:
+        """
+        Capture from the microphone and yield only the stretches that contain speech.
+        
+        The input stream stays open while the caller handles a segment, so
+        audio spoken meanwhile is queued rather than lost.
+        
+        Args:
+            silence_duration: Non-speech that ends a segment, in seconds
+            preroll_seconds: Audio kept from before the first speech frame
+            max_segment_seconds: Longest segment before it is cut and yielded
+            
+        Yields:
+            int16 mono segments, each starting with its pre-roll
+        """
+        frame_size = vad_frame_size(self.sample_rate, 30)
+        silence_frames = int(silence_duration * self.sample_rate / frame_size)
+        max_frames = int(max_segment_seconds * self.sample_rate / frame_size)
+        frames = queue.Queue()
+        
+        def callback(indata, frame_count, time_info, status):
+            if status:
+                print(f"Audio callback status: {status}")
+            frames.put(indata[:, 0].copy())
+        
+        with self.audio_device.input_stream(
+            samplerate=self.sample_rate,
+            callback=callback,
+            channels=1,
+            dtype=np.int16,
+            blocksize=frame_size
+        ):
+            preroll = deque(maxlen=max(1, int(preroll_seconds * self.sample_rate / frame_size)))
+            segment = []
+            silence_counter = 0
+            while True:
+                frame = frames.get()
+                self.stats["audio_seconds_captured"] += len(frame) / self.sample_rate
+                is_speech = self.vad.is_speech(frame.tobytes(), self.sample_rate)
+                
+                if not segment:
+                    preroll.append(frame)
+                    if is_speech:
+                        segment = list(preroll)
+                        preroll.clear()
+                        silence_counter = 0
+                    continue
+                
+                segment.append(frame)
+                silence_counter = 0 if is_speech else silence_counter + 1
+                if silence_counter >= silence_frames or len(segment) >= max_frames:
+                    yield np.concatenate(segment)
+                    segment = []
 
     def record_audio(self, duration: float = 5.0):
         """Record audio from microphone."""
         print(f"Recording for {duration} seconds...")
-        audio_data = sd.rec(
+        return self.audio_device.record(
             int(duration * self.sample_rate),
             samplerate=self.sample_rate,
             channels=1,
             dtype=np.int16
         )
-        sd.wait()
-        return audio_data
 
     def play_audio(self, audio_data: np.ndarray, sample_rate: int):
         """Play audio through speakers."""
-        sd.play(audio_data, sample_rate)
-        sd.wait()
+        self.audio_device.play(audio_data, sample_rate)
 
     def detect_wake_word(self, audio_data: np.ndarray) -> bool:
         """Check if wake word is present in audio."""
-        response = requests.post(
-            f"{self.stt_url}/detect_wake_word",
-            json={
-                "audio_data": audio_data.tolist(),
-                "sample_rate": self.sample_rate
-            }
-        )
+        response = self._post_audio(f"{self.stt_url}/detect_wake_word", audio_data)
+        response.raise_for_status()
         result = response.json()
         return result["detected"]
 
     def transcribe(self, audio_data: np.ndarray) -> str:
         """Convert audio to text."""
-        response = requests.post(
-            f"{self.stt_url}/transcribe",
-            json={
-                "audio_data": audio_data.tolist(),
-                "sample_rate": self.sample_rate
-            }
-        )
+        response = self._post_audio(f"{self.stt_url}/transcribe", audio_data)
+        response.raise_for_status()
         result = response.json()
         return result["text"]
 
+    def transcribe_async(self, audio_data: np.ndarray) -> Future:
+        """Start transcribing in the background; the future resolves to the text."""
+        return self.executor.submit(self.transcribe, audio_data)
+
+    def transcribe_stream(self, max_duration: float = 10.0) -> str:
+        """
+        Stream microphone audio to the STT service and return the final transcript.
+        
+        The server endpoints the utterance, so this returns shortly after the
+        user stops speaking rather than after a fixed recording window.
+        
+        Args:
+            max_duration: Give up on the utterance after this many seconds
+            
+        Returns:
+            Final transcript (empty if no speech was heard)
+        """
+        from websockets.sync.client import connect
+        
+        url = self.stt_url.replace("http", "ws", 1) + f"/ws/transcribe?sample_rate={self.sample_rate}"
+        frames = queue.Queue()
+        
+        def callback(indata, frame_count, time_info, status):
+            if status:
+                print(f"Audio callback status: {status}")
+            frames.put(indata.copy())
+        
+        with connect(url) as ws, self.audio_device.input_stream(
+            samplerate=self.sample_rate,
+            callback=callback,
+            channels=1,
+            dtype=np.int16,
+            blocksize=int(0.03 * self.sample_rate)
+        ):
+            print("Listening...")
+            deadline = time.monotonic() + max_duration
+            while time.monotonic() < deadline:
+                try:
+                    ws.send(encode_pcm(frames.get(timeout=0.1)))
+                except queue.Empty:
+                    pass
+                
+                # Handle whatever the server has pushed back so far
+                while True:
+                    try:
+                        event = json.loads(ws.recv(timeout=0))
+                    except TimeoutError:
+                        break
+                    if event["type"] == "partial":
+                        print(f"... {event['text']}")
+                    elif event["type"] == "final":
+                        return event["text"]
+            
+            # Out of time: take whatever has been said so far
+            ws.send(json.dumps({"type": "end"}))
+            while True:
+                event = json.loads(ws.recv())
+                if event["type"] == "final":
+                    return event["text"]
+
     def synthesize(self, text: str) -> tuple[np.ndarray, int]:
         """Convert text to speech."""
-        response = requests.post(
+        headers = {"Accept": PCM_MEDIA_TYPE} if self.use_pcm else {}
+        response = self.session.post(
             f"{self.tts_url}/synthesize",
-            json={"text": text}
+            json={"text": text},
+            headers=headers
         )
+        response.raise_for_status()
+        if response.headers.get("content-type", "").startswith(PCM_MEDIA_TYPE):
+            sample_rate, dtype = parse_pcm_headers(response.headers)
+            return decode_pcm(response.content, dtype), sample_rate
         result = response.json()
         return np.array(result["audio_data"], dtype=np.int16), result["sample_rate"]
 
+    def synthesize_async(self, text: str) -> Future:
+        """Start synthesizing in the background; the future resolves to (audio, sample_rate)."""
+        return self.executor.submit(self.synthesize, text)
+
+    def speak(self, text: str) -> None:
+        """
+        Synthesize and play text sentence by sentence.
+        
+        Every sentence is requested up front, so later sentences are
+        synthesized while earlier ones play.
+        """
+        # Same chunking as the TTS service's streaming endpoint
+        futures = [self.synthesize_async(piece) for piece in split_sentences(text)]
+        for future in futures:
+            audio_data, sample_rate = future.result()
+            self.play_audio(audio_data, sample_rate)
+
     def run_once(self):
         """Run a single interaction."""
         print("\nWaiting for wake word...")
         
-        # Record and check for wake word
-        audio_data = self.record_audio()
-        if not self.detect_wake_word(audio_data):
-            print("No wake word detected. Try again.")
-            return
+        # Only segments that local VAD thinks contain speech go to the server
+        segments = self.speech_segments()
+        try:
+            for audio_data in segments:
+                if self.detect_wake_word(audio_data):
+                    break
+        finally:
+            segments.close()
         
         print("Wake word detected! Recording command...")
         
-        # Record command
-        audio_data = self.record_audio(duration=10.0)
-        
-        # Transcribe
-        text = self.transcribe(audio_data)
+        # Stream the command; transcription ends when the user stops speaking
+        text = self.transcribe_stream(max_duration=10.0)
         print(f"You said: {text}")
         
         # Generate response (using a simple echo for now)
         response = f"I heard you say: {text}"
         
         # Convert to speech and play
-        audio_data, sample_rate = self.synthesize(response)
-        self.play_audio(audio_data, sample_rate)
+        self.speak(response)
 
     def run_continuous(self):
         """Run continuously until interrupted."""
@@ -98,6 +298,12 @@ class VoiceAssistantClient:
                 self.run_once()
         except KeyboardInterrupt:
             print("\nStopping voice assistant...")
+            captured = self.stats["audio_seconds_captured"]
+            if captured:
+                print(f"Sent {self.stats['audio_seconds_sent']:.1f} s of {captured:.1f} s captured "
+                      f"({self.stats['bytes_sent'] / 1024:.0f} KiB)")
+        finally:
+            self.close()
 
 if __name__ == "__main__":
     client = VoiceAssistantClient()
@@ -0,0 +1,32 @@
+import time
+from fastapi import FastAPI, Request
+
+from utils.metrics import metrics, MetricsRegistry
+
+def install_metrics(app: FastAPI, registry: MetricsRegistry = metrics) -> None:
+    """
+    Record per-endpoint request latency and expose GET /metrics.
+    
+    Args:
+        app: Service application
+        registry: Registry to record into and serve (default: process-wide registry)
+    """
+    @app.middleware("http")
+    async def record_request_latency(request: Request, call_next):
+        start = time.perf_counter()
+        response = await call_next(request)
+        # Label by route path only, so unknown URLs can't grow the label set
+        path = request.url.path
+        if not any(getattr(route, "path", None) == path for route in app.routes):
+            path = "other"
+        registry.observe(
+            "http_request_latency",
+            time.perf_counter() - start,
+            path=path,
+            status=response.status_code
+        )
+        return response
+
+    @app.get("/metrics")
+    async def get_metrics():
+        return registry.snapshot()
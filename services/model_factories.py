@@ -0,0 +1,30 @@
+# Module-level replica factories for WorkerPool. They live apart from the
+# service modules so that importing them in a worker process doesn't load
+# models or start another pool as a side effect.
+
+def create_stt():
+    """Build and warm up an STT replica for the configured backend."""
+    from utils.stt import create_stt_backend
+    from config.settings import STT_BACKEND, WHISPER_MODEL, WHISPER_LANGUAGE, WHISPER_TASK
+
+    stt = create_stt_backend(
+        backend=STT_BACKEND,
+        model_name=WHISPER_MODEL,
+        language=WHISPER_LANGUAGE,
+        task=WHISPER_TASK
+    )
+    stt.warmup()
+    return stt
+
+def create_tts():
+    """Build and warm up a cached TTS replica from settings."""
+    from utils.tts import create_tts_backend
+    from utils.tts_cache import TTSCache, CachedTTS
+    from config.settings import TTS_MODEL, TTS_SPEAKER, TTS_CACHE_DIR, TTS_CACHE_MEMORY_MB
+
+    tts = CachedTTS(
+        create_tts_backend(model_name=TTS_MODEL, speaker_id=TTS_SPEAKER),
+        TTSCache(cache_dir=TTS_CACHE_DIR, max_memory_bytes=TTS_CACHE_MEMORY_MB * 1024 * 1024)
+    )
+    tts.warmup()
+    return tts
@@ -1,79 +1,273 @@
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
+from starlette.concurrency import run_in_threadpool
 import uvicorn
-from pathlib import Path
-import tempfile
+import asyncio
+import json
 import numpy as np
-import sounddevice as sd
-import wave
 
-from utils.stt import WhisperSTT
-from utils.wake_word import WakeWordDetector
+from utils.wake_word import WakeWordStream, WakeWordModelPool
+from services.metrics_endpoint import install_metrics
+from services.batching import MicroBatcher
+from services.worker_pool import WorkerPool, run_with_deadline
+from services.model_factories import create_stt
+from services.audio_transport import read_audio_request
+from services.stt_streaming import PooledSTT, UtteranceStream
+from utils.pcm import WIRE_DTYPES, decode_pcm, to_int16
 from config.settings import (
-    WHISPER_MODEL,
-    WHISPER_LANGUAGE,
-    WHISPER_TASK,
-    SAMPLE_RATE
+    SAMPLE_RATE,
+    STT_BATCH_MAX_SIZE,
+    STT_BATCH_WAIT_MS,
+    STT_WORKERS,
+    STT_MAX_QUEUE,
+    STREAMING_STEP_SECONDS,
+    REQUEST_TIMEOUT_SECONDS,
+    WAKE_WORD_MAX_MODELS
 )
 
 app = FastAPI()
-stt = WhisperSTT(
-    model_name=WHISPER_MODEL,
-    language=WHISPER_LANGUAGE,
-    task=WHISPER_TASK
+install_metrics(app)
+
+# openWakeWord keeps streaming state in the model, so every session gets its
+# own WakeWordStream and borrows a model only while it hears speech
+wake_word_models = WakeWordModelPool(max_models=WAKE_WORD_MAX_MODELS)
+
+# Whisper runs in worker processes so the event loop stays responsive
+stt_pool = WorkerPool(create_stt, workers=STT_WORKERS, max_queue=STT_MAX_QUEUE, name="stt")
+
+async def transcribe_batch(items):
+    return await stt_pool.run(
+        "transcribe_batch",
+        [audio for audio, _ in items],
+        [sr for _, sr in items]
+    )
+
+# Concurrent /transcribe requests are decoded together in micro-batches,
+# one batch in flight per worker
+stt_batcher = MicroBatcher(
+    transcribe_batch,
+    max_batch_size=STT_BATCH_MAX_SIZE,
+    max_wait_ms=STT_BATCH_WAIT_MS,
+    max_concurrency=STT_WORKERS,
+    name="stt"
 )
-wake_word = WakeWordDetector()
 
-class AudioRequest(BaseModel):
-    audio_data: list
-    sample_rate: int
+@app.on_event("startup")
+async def start_workers():
+    await stt_pool.start()
+
+@app.on_event("shutdown")
+def stop_workers():
+    stt_pool.shutdown()
+
+@app.get("/health")
+async def health():
+    return {"status": "ok"}
 
 @app.post("/transcribe")
-async def transcribe(request: AudioRequest):
-    try:
-        # Convert audio data to numpy array
-        audio_data = np.array(request.audio_data, dtype=np.int16)
-        
-        # Save to temp file
-        temp_dir = tempfile.mkdtemp()
-        temp_path = Path(temp_dir) / "input.wav"
-        
-        with wave.open(str(temp_path), 'wb') as wf:
-            wf.setnchannels(1)
-            wf.setsampwidth(2)
-            wf.setframerate(request.sample_rate)
-            wf.writeframes(audio_data.tobytes())
-        
-        # Transcribe
-        result = stt.transcribe(str(temp_path))
-        
-        # Clean up
-        temp_path.unlink()
-        
-        return {
-            "success": True,
-            "text": result["text"]
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+async def transcribe(request: Request):
+    # Accepts raw PCM (application/octet-stream) or the JSON AudioRequest body
+    audio_data, sample_rate = await read_audio_request(request)
+    with stt_pool.admit():
+        try:
+            # Transcribe straight from memory, batched with concurrent requests;
+            # dropped from the batch queue if the client leaves or the deadline passes
+            result = await run_with_deadline(
+                stt_batcher.submit((audio_data, sample_rate)),
+                request,
+                REQUEST_TIMEOUT_SECONDS
+            )
+            
+            return {
+                "success": True,
+                "text": result["text"]
+            }
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/detect_wake_word")
-async def detect_wake_word(request: AudioRequest):
+async def detect_wake_word(request: Request):
+    audio_data, sample_rate = await read_audio_request(request)
+    if sample_rate != SAMPLE_RATE:
+        raise HTTPException(status_code=400, detail=f"Wake word detection requires {SAMPLE_RATE} Hz audio")
+    
+    model = await run_in_threadpool(wake_word_models.acquire)
+    if model is None:
+        raise HTTPException(status_code=503, detail="All wake word models are busy", headers={"Retry-After": "1"})
+    
+    # Fresh stream state for this clip; every frame is scored
+    stream = WakeWordStream(lambda: model, vad_gate=False, track_costs=False)
     try:
-        # Convert audio data to numpy array
-        audio_data = np.array(request.audio_data, dtype=np.int16)
-        
-        # Process with wake word detector
-        predictions = wake_word.model.predict(audio_data)
-        score = predictions["hey_jarvis"]
+        # openWakeWord expects int16 samples
+        score = await run_in_threadpool(stream.process, to_int16(audio_data))
         
         return {
             "success": True,
-            "detected": score > wake_word.confidence_threshold,
-            "confidence": float(score)
+            "detected": score is not None,
+            "confidence": stream.peak_score
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        wake_word_models.release(model)
+
+@app.websocket("/ws/wake_word")
+async def wake_word_session(websocket: WebSocket):
+    """Stream PCM frames in and receive detection events as they happen.
+    
+    Query parameters:
+        sample_rate: Must match SAMPLE_RATE
+        dtype: Wire dtype of binary frames, "int16" (default) or "float32"
+    
+    Binary messages are raw little-endian PCM of any length. The text message
+    {"type": "reset"} clears the session's detector state. On detection the
+    server sends {"type": "detection", "score", "position"}, where position is
+    the number of samples received when the wake word fired, and resets the
+    session so the next detection starts from fresh audio.
+    """
+    await websocket.accept()
+    sample_rate = int(websocket.query_params.get("sample_rate", SAMPLE_RATE))
+    dtype = websocket.query_params.get("dtype", "int16")
+    if sample_rate != SAMPLE_RATE or dtype not in WIRE_DTYPES:
+        await websocket.close(code=1003, reason=f"Expected {SAMPLE_RATE} Hz int16 or float32 PCM")
+        return
+    
+    # Idle sessions only run VAD; a model is borrowed while the gate is open
+    stream = WakeWordStream(wake_word_models.acquire, wake_word_models.release, track_costs=False)
+    position = 0
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            
+            if message.get("bytes") is not None:
+                try:
+                    chunk = to_int16(decode_pcm(message["bytes"], dtype))
+                except ValueError as e:
+                    await websocket.send_json({"type": "error", "detail": f"Invalid audio frame: {e}"})
+                    continue
+                position += len(chunk)
+                score = await run_in_threadpool(stream.process, chunk)
+                if score is not None:
+                    stream.reset()
+                    await websocket.send_json({
+                        "type": "detection",
+                        "score": score,
+                        "position": position
+                    })
+            elif message.get("text"):
+                try:
+                    control = json.loads(message["text"])
+                except ValueError:
+                    await websocket.send_json({"type": "error", "detail": "Invalid control message"})
+                    continue
+                if control.get("type") == "reset":
+                    stream.reset()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        stream.reset()
+
+@app.websocket("/ws/transcribe")
+async def transcribe_session(websocket: WebSocket):
+    """Stream PCM frames in and receive partial and final transcripts.
+    
+    Query parameters:
+        sample_rate: 8000, 16000, 32000 or 48000 (default: SAMPLE_RATE)
+        dtype: Wire dtype of binary frames, "int16" (default) or "float32"
+        silence_ms: Non-speech that ends an utterance (default: 800)
+        max_seconds: Longest utterance before it is cut off (default: 30)
+    
+    Binary messages are raw little-endian PCM of any length. The server
+    endpoints the stream with VAD, decodes each utterance incrementally and
+    sends {"type": "partial", "text"} while it is spoken and
+    {"type": "final", "text", "language", "duration", "final_decode_time"}
+    once it ends. Decodes are admitted like /transcribe requests: partials
+    are skipped while the STT queue is full, and an utterance whose final
+    decode is refused is dropped with {"type": "error", "status": 429}. The text message {"type": "end"} finalizes the current
+    utterance immediately, e.g. when the client stops capturing.
+    """
+    await websocket.accept()
+    params = websocket.query_params
+    try:
+        sample_rate = int(params.get("sample_rate", SAMPLE_RATE))
+        silence_duration = float(params.get("silence_ms", 800)) / 1000
+        max_duration = float(params.get("max_seconds", 30))
+        dtype = params.get("dtype", "int16")
+        if dtype not in WIRE_DTYPES:
+            raise ValueError(f"Unsupported dtype {dtype}")
+        if sample_rate not in (8000, 16000, 32000, 48000):
+            raise ValueError(f"Unsupported sample rate {sample_rate}")
+    except ValueError as e:
+        await websocket.close(code=1003, reason=str(e))
+        return
+    
+    loop = asyncio.get_running_loop()
+    outbox: asyncio.Queue = asyncio.Queue()
+    
+    def on_partial(text: str) -> None:
+        loop.call_soon_threadsafe(outbox.put_nowait, {"type": "partial", "text": text})
+    
+    async def send_events():
+        while True:
+            await websocket.send_json(await outbox.get())
+    
+    async def finalize():
+        try:
+            result = await run_in_threadpool(stream.finish)
+        except HTTPException as e:
+            # STT queue full: drop the utterance and let the client retry
+            stream.close()
+            await outbox.put({"type": "error", "status": e.status_code, "detail": e.detail})
+            return
+        await outbox.put({
+            "type": "final",
+            "text": result["text"],
+            "language": result["language"],
+            "duration": result["duration"],
+            "final_decode_time": result.get("final_decode_time", 0.0)
+        })
+    
+    # Decoding runs on the shared STT workers; the session itself only holds
+    # VAD state and the current utterance's audio
+    stream = UtteranceStream(
+        PooledSTT(stt_pool, loop),
+        sample_rate=sample_rate,
+        step_seconds=STREAMING_STEP_SECONDS,
+        silence_duration=silence_duration,
+        max_duration=max_duration,
+        on_partial=on_partial
+    )
+    sender = asyncio.ensure_future(send_events())
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            
+            if message.get("bytes") is not None:
+                try:
+                    chunk = to_int16(decode_pcm(message["bytes"], dtype))
+                except ValueError as e:
+                    await outbox.put({"type": "error", "detail": f"Invalid audio frame: {e}"})
+                    continue
+                if stream.add_audio(chunk):
+                    await finalize()
+            elif message.get("text"):
+                try:
+                    control = json.loads(message["text"])
+                except ValueError:
+                    await outbox.put({"type": "error", "detail": "Invalid control message"})
+                    continue
+                if control.get("type") == "end":
+                    await finalize()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        sender.cancel()
+        await run_in_threadpool(stream.close)
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8001) 
\ No newline at end of file
+    uvicorn.run(app, host="0.0.0.0", port=8001)
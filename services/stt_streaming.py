@@ -0,0 +1,162 @@
+import asyncio
+import numpy as np
+import webrtcvad
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+from services.worker_pool import WorkerPool
+from utils.framing import Reframer, vad_frame_size
+from utils.streaming_stt import StreamingTranscriber
+
+class PooledSTT:
+    def __init__(self, pool: WorkerPool, loop: asyncio.AbstractEventLoop):
+        """
+        WhisperSTT-compatible transcribe() that runs on a worker pool.
+
+        StreamingTranscriber decodes from its own thread, so calls are handed
+        to the event loop that owns the pool and waited on from that thread.
+        Each decode takes an admission slot like a /transcribe request, so
+        streaming sessions count against the same queue limit; a refused
+        decode raises the pool's 429 HTTPException.
+
+        Args:
+            pool: STT worker pool
+            loop: Event loop the pool is used from
+        """
+        self.pool = pool
+        self.loop = loop
+
+    def transcribe(self,
+                   audio: np.ndarray,
+                   sample_rate: int,
+                   initial_prompt: Optional[str] = None,
+                   kind: str = "final") -> Dict[str, Any]:
+        future = asyncio.run_coroutine_threadsafe(
+            self._admitted_transcribe(audio, sample_rate, initial_prompt, kind),
+            self.loop
+        )
+        return future.result()
+
+    async def _admitted_transcribe(self, *args: Any) -> Dict[str, Any]:
+        with self.pool.admit():
+            return await self.pool.run("transcribe", *args)
+
+class UtteranceStream:
+    def __init__(self,
+                 stt: Any,
+                 sample_rate: int,
+                 step_seconds: float = 1.0,
+                 silence_duration: float = 0.8,
+                 max_duration: float = 30.0,
+                 preroll_seconds: float = 0.3,
+                 vad_mode: int = 3,
+                 on_partial: Optional[Callable[[str], None]] = None):
+        """
+        Endpoint a live audio stream into utterances and transcribe them incrementally.
+
+        Audio before the first speech frame only fills a short pre-roll. Once
+        speech starts, frames go to a StreamingTranscriber until silence_duration
+        of non-speech or max_duration of audio, at which point the utterance is
+        complete and finish() produces the final transcript.
+
+        Args:
+            stt: Object with WhisperSTT's transcribe(audio, sample_rate, initial_prompt)
+            sample_rate: Sample rate of the incoming audio (8, 16, 32 or 48 kHz)
+            step_seconds: New audio required before the next partial decode
+            silence_duration: Non-speech that ends an utterance, in seconds
+            max_duration: Longest utterance before it is cut off, in seconds
+            preroll_seconds: Audio kept from before the first speech frame
+            vad_mode: VAD aggressiveness mode, 0-3
+            on_partial: Called from the decoding thread with each partial hypothesis
+        """
+        self.stt = stt
+        self.sample_rate = sample_rate
+        self.step_seconds = step_seconds
+        self.on_partial = on_partial
+
+        self.vad = webrtcvad.Vad(vad_mode)
+        self.framer = Reframer(vad_frame_size(sample_rate, 30))
+        frame_size = self.framer.frame_size
+        self.preroll = deque(maxlen=max(1, int(preroll_seconds * sample_rate) // frame_size))
+        self.silence_samples = int(silence_duration * sample_rate)
+        self.max_samples = int(max_duration * sample_rate)
+
+        self.transcriber: Optional[StreamingTranscriber] = None
+        self._utterance_samples = 0
+        self._silence_counter = 0
+
+    @property
+    def in_speech(self) -> bool:
+        """Whether an utterance has started and not yet been finished."""
+        return self.transcriber is not None
+
+    def add_audio(self, chunk: np.ndarray) -> bool:
+        """
+        Feed int16 mono audio of any length.
+
+        Returns:
+            True once the current utterance has ended; call finish() next.
+            Audio after the endpoint in the same chunk is dropped.
+        """
+        for frame in self.framer.push(chunk):
+            is_speech = self.vad.is_speech(frame.tobytes(), self.sample_rate)
+
+            if self.transcriber is None:
+                self.preroll.append(frame)
+                if not is_speech:
+                    continue
+                self.transcriber = StreamingTranscriber(
+                    self.stt,
+                    sample_rate=self.sample_rate,
+                    step_seconds=self.step_seconds,
+                    on_partial=self.on_partial
+                )
+                self.transcriber.start()
+                frames = list(self.preroll)
+                self.preroll.clear()
+            else:
+                frames = [frame]
+
+            for speech_frame in frames:
+                self.transcriber.add_audio(speech_frame)
+                self._utterance_samples += len(speech_frame)
+
+            if is_speech:
+                self._silence_counter = 0
+            else:
+                self._silence_counter += len(frame)
+            if (self._silence_counter >= self.silence_samples
+                    or self._utterance_samples >= self.max_samples):
+                return True
+        return False
+
+    def finish(self) -> Dict[str, Any]:
+        """
+        Decode the rest of the current utterance and get ready for the next one.
+
+        Blocks until the final decode is done.
+
+        Returns:
+            StreamingTranscriber.finish() result plus duration (seconds of
+            utterance audio); text is empty if no speech was heard
+        """
+        if self.transcriber is None:
+            result = {"text": "", "language": None, "segments": [], "duration": 0.0}
+        else:
+            result = self.transcriber.finish()
+            result["duration"] = self._utterance_samples / self.sample_rate
+        self._reset()
+        return result
+
+    def close(self) -> None:
+        """Abandon the current utterance without decoding it."""
+        if self.transcriber is not None:
+            self.transcriber.stop()
+        self._reset()
+
+    def _reset(self) -> None:
+        self.transcriber = None
+        self.framer.reset()
+        self.preroll.clear()
+        self._utterance_samples = 0
+        self._silence_counter = 0
@@ -1,46 +1,109 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Header, Request
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from pydantic import BaseModel
 import uvicorn
-from pathlib import Path
-import tempfile
 import numpy as np
-import sounddevice as sd
-import wave
+from typing import Optional
 
-from utils.tts import CoquiTTS
-from config.settings import TTS_MODEL, TTS_SPEAKER
+from utils.tts import split_sentences
+from services.metrics_endpoint import install_metrics
+from services.worker_pool import WorkerPool, run_with_deadline
+from services.model_factories import create_tts
+from services.audio_transport import pcm_response
+from utils.pcm import PCM_MEDIA_TYPE, encode_pcm, pcm_headers, to_int16, wants_pcm
+from config.settings import TTS_WORKERS, TTS_MAX_QUEUE, REQUEST_TIMEOUT_SECONDS
 
 app = FastAPI()
-tts = CoquiTTS(model_name=TTS_MODEL, speaker_id=TTS_SPEAKER)
+install_metrics(app)
+
+# TTS runs in worker processes so the event loop stays responsive
+tts_pool = WorkerPool(create_tts, workers=TTS_WORKERS, max_queue=TTS_MAX_QUEUE, name="tts")
 
 class TTSRequest(BaseModel):
     text: str
 
+@app.on_event("startup")
+async def start_workers():
+    await tts_pool.start()
+
+@app.on_event("shutdown")
+def stop_workers():
+    tts_pool.shutdown()
+
+@app.get("/health")
+async def health():
+    return {"status": "ok"}
+
 @app.post("/synthesize")
-async def synthesize(request: TTSRequest):
+async def synthesize(body: TTSRequest, request: Request, accept: Optional[str] = Header(None)):
+    with tts_pool.admit():
+        try:
+            # Generate speech in memory on a worker
+            audio_data, sample_rate = await run_with_deadline(
+                tts_pool.run("synthesize_to_array", body.text),
+                request,
+                REQUEST_TIMEOUT_SECONDS
+            )
+            audio_data = to_int16(audio_data)
+            
+            # Raw PCM for clients that ask for it, JSON otherwise
+            if wants_pcm(accept):
+                return pcm_response(audio_data, sample_rate)
+            
+            return {
+                "success": True,
+                "audio_data": audio_data.tolist(),
+                "sample_rate": sample_rate
+            }
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/synthesize_stream")
+async def synthesize_stream(body: TTSRequest, request: Request):
+    """Stream int16 PCM sentence by sentence as each piece is synthesized."""
+    pieces = split_sentences(body.text)
+    if not pieces:
+        raise HTTPException(status_code=400, detail="Nothing to synthesize")
+    
+    # The slot is held for the whole stream. generate() releases it when it
+    # finishes; the background task covers a response cancelled before
+    # generate() ever ran (a client disconnecting early)
+    release = tts_pool.reserve()
     try:
-        # Create temp file for audio
-        temp_dir = tempfile.mkdtemp()
-        temp_path = Path(temp_dir) / "output.wav"
-        
-        # Generate speech
-        tts.synthesize(request.text, str(temp_path))
-        
-        # Read the generated audio
-        with wave.open(str(temp_path), 'rb') as wf:
-            audio_data = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
-            sample_rate = wf.getframerate()
-        
-        # Clean up
-        temp_path.unlink()
-        
-        return {
-            "success": True,
-            "audio_data": audio_data.tolist(),
-            "sample_rate": sample_rate
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        # The first piece is synthesized up front so its sample rate can go in the headers
+        first_audio, sample_rate = await run_with_deadline(
+            tts_pool.run("synthesize_to_array", pieces[0]),
+            request,
+            REQUEST_TIMEOUT_SECONDS
+        )
+    except BaseException:
+        release()
+        raise
+    
+    async def generate():
+        try:
+            yield encode_pcm(to_int16(first_audio))
+            for piece in pieces[1:]:
+                try:
+                    audio_data, _ = await run_with_deadline(
+                        tts_pool.run("synthesize_to_array", piece),
+                        request,
+                        REQUEST_TIMEOUT_SECONDS
+                    )
+                except HTTPException:
+                    # Client gone or deadline passed: stop synthesizing the rest
+                    return
+                yield encode_pcm(to_int16(audio_data))
+        finally:
+            release()
+    
+    headers = pcm_headers(sample_rate)
+    headers.pop("Content-Type")
+    return StreamingResponse(generate(), media_type=PCM_MEDIA_TYPE, headers=headers,
+                             background=BackgroundTask(release))
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
+    uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,203 @@
+import asyncio
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Optional
+
+from fastapi import HTTPException, Request
+
+from utils.metrics import metrics
+
+# Model replica owned by the current worker process
+_replica = None
+
+def _init_worker(factory: Callable[[], Any]) -> None:
+    """Load this worker's model replica and forward its metrics to the parent."""
+    global _replica
+    metrics.record_events()
+    _replica = factory()
+
+def _call_replica(method: str, *args) -> tuple:
+    """Run a method on this worker's replica; returns (result, drained metric events)."""
+    result = getattr(_replica, method)(*args)
+    return result, metrics.drain_events()
+
+def _ping() -> bool:
+    """No-op task used to force a worker to start and load its replica."""
+    return _replica is not None
+
+class WorkerPool:
+    def __init__(self,
+                 factory: Callable[[], Any],
+                 workers: int = 1,
+                 max_queue: int = 16,
+                 name: str = "worker"):
+        """
+        Pool of worker processes, each holding its own model replica.
+        
+        Inference runs outside the service process, so the event loop keeps
+        answering health checks and metrics while models are busy. Admission
+        is bounded: at most workers + max_queue requests are in flight, and
+        callers beyond that are turned away with 429 and a Retry-After hint.
+        
+        Args:
+            factory: Picklable module-level function that builds a replica
+            workers: Number of worker processes (replicas)
+            max_queue: Requests allowed to wait for a free worker
+            name: Metric label for this pool
+        """
+        self.workers = workers
+        self.max_queue = max_queue
+        self.name = name
+        # Spawn rather than fork so workers don't inherit the parent's torch threads
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(factory,)
+        )
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._admitted = 0
+        self._mean_latency = 1.0
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.workers)
+        return self._slots
+
+    async def start(self) -> None:
+        """Start every worker and wait until each has loaded its replica."""
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*[
+            loop.run_in_executor(self.executor, _ping) for _ in range(self.workers)
+        ])
+
+    def shutdown(self) -> None:
+        """Stop the workers, dropping calls that have not started."""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def retry_after(self) -> int:
+        """Seconds a rejected client should wait, from queue depth and recent latency."""
+        return max(1, math.ceil(self._admitted / self.workers * self._mean_latency))
+
+    def reserve(self) -> Callable[[], None]:
+        """
+        Reserve an admission slot that outlives a with block, e.g. for a
+        streamed response or a WebSocket session.
+        
+        Returns:
+            Function releasing the slot; safe to call more than once
+            
+        Raises:
+            HTTPException: 429 with Retry-After when the queue is full
+        """
+        if self._admitted >= self.workers + self.max_queue:
+            metrics.increment("rejected_requests", pool=self.name)
+            raise HTTPException(
+                status_code=429,
+                detail=f"{self.name} queue is full",
+                headers={"Retry-After": str(self.retry_after())}
+            )
+        self._admitted += 1
+        metrics.observe("admitted_requests", self._admitted, pool=self.name)
+        released = False
+        
+        def release() -> None:
+            nonlocal released
+            if not released:
+                released = True
+                self._admitted -= 1
+        
+        return release
+
+    @contextmanager
+    def admit(self):
+        """
+        Reserve an admission slot for one request.
+        
+        Raises:
+            HTTPException: 429 with Retry-After when the queue is full
+        """
+        release = self.reserve()
+        try:
+            yield
+        finally:
+            release()
+
+    async def run(self, method: str, *args) -> Any:
+        """
+        Run a replica method on a free worker.
+        
+        Waiting for a worker is cancellable, so work whose caller went away
+        never reaches a worker. Once dispatched, the worker's slot is only
+        released when it actually finishes.
+        
+        Raises:
+            HTTPException: 503 with Retry-After if the pool is broken
+        """
+        slots = self._get_slots()
+        await slots.acquire()
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        try:
+            future = loop.run_in_executor(self.executor, _call_replica, method, *args)
+        except BrokenProcessPool:
+            slots.release()
+            raise HTTPException(
+                status_code=503,
+                detail=f"{self.name} workers are unavailable",
+                headers={"Retry-After": str(self.retry_after())}
+            )
+        future.add_done_callback(lambda _: slots.release())
+
+        try:
+            result, events = await asyncio.shield(future)
+        except BrokenProcessPool:
+            raise HTTPException(
+                status_code=503,
+                detail=f"{self.name} workers are unavailable",
+                headers={"Retry-After": str(self.retry_after())}
+            )
+        elapsed = loop.time() - start
+        self._mean_latency = 0.9 * self._mean_latency + 0.1 * elapsed
+        metrics.replay(events)
+        metrics.observe("worker_latency", elapsed, pool=self.name)
+        return result
+
+async def _wait_for_disconnect(request: Request) -> None:
+    """Return once the client has disconnected (the request body must already be read)."""
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            return
+
+async def run_with_deadline(work: Awaitable[Any], request: Request, timeout: float) -> Any:
+    """
+    Await work unless the client disconnects or the deadline passes first.
+    
+    Either way the work is cancelled, which drops it from any queue it is
+    still waiting in.
+    
+    Raises:
+        HTTPException: 504 on deadline, 499 if the client went away
+    """
+    work_task = asyncio.ensure_future(work)
+    disconnect_task = asyncio.ensure_future(_wait_for_disconnect(request))
+    try:
+        done, _ = await asyncio.wait(
+            {work_task, disconnect_task},
+            timeout=timeout,
+            return_when=asyncio.FIRST_COMPLETED
+        )
+        if work_task in done:
+            return work_task.result()
+        work_task.cancel()
+        if disconnect_task in done:
+            metrics.increment("cancelled_requests", reason="disconnect")
+            raise HTTPException(status_code=499, detail="Client closed request")
+        metrics.increment("cancelled_requests", reason="deadline")
+        raise HTTPException(status_code=504, detail="Request deadline exceeded")
+    finally:
+        disconnect_task.cancel()
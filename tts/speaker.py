@@ -1,14 +1,14 @@
 from pathlib import Path
 from typing import Optional, Union
-from TTS.api import TTS
 
-from config.settings import TTS_MODEL
+from utils.tts import create_tts_backend
+from config.settings import TTS_MODEL, TTS_SPEAKER
 
 class Speaker:
-    def __init__(self, model_name: str = TTS_MODEL):
-        """Initialize TTS model."""
+    def __init__(self, model_name: str = TTS_MODEL, speaker_id: Optional[str] = TTS_SPEAKER):
+        """Initialize TTS model (a Coqui model name or a Piper .onnx voice)."""
         print(f"Loading TTS model: {model_name}")
-        self.tts = TTS(model_name=model_name)
+        self.tts = create_tts_backend(model_name=model_name, speaker_id=speaker_id)
         print("TTS model loaded.")
 
     def speak(self, text: str, output_path: Optional[Union[str, Path]] = None) -> Optional[Path]:
@@ -27,15 +27,16 @@ class Speaker:
 
         if output_path:
             output_path = Path(output_path)
-            self.tts.tts_to_file(text=text, file_path=str(output_path))
+            self.tts.synthesize(text, output_path)
             return output_path
         else:
             # For future: could return audio array for direct playback
             temp_path = Path("temp_tts_output.wav")
-            self.tts.tts_to_file(text=text, file_path=str(temp_path))
+            self.tts.synthesize(text, temp_path)
             return temp_path
 
     @staticmethod
     def list_available_models() -> list:
-        """List all available TTS models."""
+        """List all available Coqui TTS models."""
+        from TTS.api import TTS
         return TTS.list_models() 
\ No newline at end of file
@@ -0,0 +1,363 @@
+import threading
+import time
+import wave
+import numpy as np
+from abc import ABC, abstractmethod
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+class CallbackStop(Exception):
+    """Raise from an input stream callback to stop the stream (like sounddevice.CallbackStop)."""
+
+class AudioDevice(ABC):
+    """
+    Source of microphone audio and sink for speaker audio.
+
+    Streams follow sounddevice's interface: input callbacks receive
+    (indata, frames, time_info, status) with indata shaped (frames, channels),
+    and streams support start(), stop(), close() and use as context managers.
+    """
+    # Wall-clock speed-up of the device's audio clock (1.0 = real time)
+    speed = 1.0
+
+    @abstractmethod
+    def find_input_device(self, name: Optional[str]) -> Optional[int]:
+        """Return the input device ID for name (None for the default), or None if not found."""
+
+    @abstractmethod
+    def input_stream(self,
+                     samplerate: int,
+                     callback: Callable,
+                     channels: int = 1,
+                     dtype=np.float32,
+                     blocksize: int = 0,
+                     device: Optional[int] = None):
+        """Create an unstarted input stream that calls callback with each captured block."""
+
+    @abstractmethod
+    def output_stream(self,
+                      samplerate: int,
+                      channels: int = 1,
+                      dtype=np.float32,
+                      device: Optional[int] = None):
+        """Create an unstarted output stream whose write() blocks like a device buffer."""
+
+    def play(self, audio: np.ndarray, samplerate: int) -> None:
+        """Play audio and block until it has finished."""
+        audio = np.asarray(audio)
+        if audio.ndim == 1:
+            audio = audio.reshape(-1, 1)
+        stream = self.output_stream(samplerate, channels=audio.shape[1], dtype=audio.dtype)
+        stream.start()
+        try:
+            stream.write(audio)
+        finally:
+            stream.stop()
+            stream.close()
+
+    def record(self, frames: int, samplerate: int, channels: int = 1, dtype=np.int16) -> np.ndarray:
+        """Record a fixed number of frames and block until they have been captured."""
+        blocks = []
+        n_recorded = 0
+        done = threading.Event()
+
+        def callback(indata, n_frames, time_info, status):
+            nonlocal n_recorded
+            blocks.append(indata[:frames - n_recorded].copy())
+            n_recorded += len(blocks[-1])
+            if n_recorded >= frames:
+                done.set()
+                raise CallbackStop
+
+        with self.input_stream(samplerate, callback, channels=channels, dtype=dtype):
+            done.wait()
+        return np.concatenate(blocks)
+
+    def sleep(self, seconds: float) -> None:
+        """Sleep for seconds of device time."""
+        time.sleep(seconds / self.speed)
+
+class SoundDevice(AudioDevice):
+    def __init__(self):
+        """Real microphone and speakers through sounddevice (PortAudio)."""
+        # Imported here so replay and headless runs don't need PortAudio
+        import sounddevice as sd
+        self.sd = sd
+
+    def find_input_device(self, name: Optional[str]) -> Optional[int]:
+        if name is None:
+            return self.sd.default.device[0]  # Return default input device
+        for i, device in enumerate(self.sd.query_devices()):
+            if device['name'] == name and device['max_input_channels'] > 0:
+                return i
+        return None
+
+    def input_stream(self, samplerate, callback, channels=1, dtype=np.float32, blocksize=0, device=None):
+        def wrapped(indata, frames, time_info, status):
+            try:
+                callback(indata, frames, time_info, status)
+            except CallbackStop:
+                raise self.sd.CallbackStop
+
+        return self.sd.InputStream(
+            samplerate=samplerate,
+            channels=channels,
+            dtype=dtype,
+            blocksize=blocksize,
+            device=device,
+            callback=wrapped
+        )
+
+    def output_stream(self, samplerate, channels=1, dtype=np.float32, device=None):
+        return self.sd.OutputStream(samplerate=samplerate, channels=channels, dtype=dtype, device=device)
+
+    def play(self, audio: np.ndarray, samplerate: int) -> None:
+        self.sd.play(audio, samplerate)
+        self.sd.wait()
+
+    def record(self, frames: int, samplerate: int, channels: int = 1, dtype=np.int16) -> np.ndarray:
+        audio = self.sd.rec(frames, samplerate=samplerate, channels=channels, dtype=dtype)
+        self.sd.wait()
+        return audio
+
+    def sleep(self, seconds: float) -> None:
+        self.sd.sleep(int(seconds * 1000))
+
+def _to_dtype(block: np.ndarray, dtype) -> np.ndarray:
+    """Convert float32 samples in [-1, 1] to the stream dtype."""
+    dtype = np.dtype(dtype)
+    if dtype == np.int16:
+        return (np.clip(block, -1.0, 1.0) * 32767).astype(np.int16)
+    return block.astype(dtype, copy=False)
+
+def _to_float32(block: np.ndarray) -> np.ndarray:
+    block = np.asarray(block)
+    if block.dtype == np.int16:
+        return block.astype(np.float32) / 32768.0
+    return block.astype(np.float32, copy=False)
+
+class _ReplayInputStream:
+    def __init__(self, device: "ReplayDevice", samplerate, callback, channels, dtype, blocksize):
+        self.device = device
+        self.samplerate = samplerate
+        self.callback = callback
+        self.channels = channels
+        self.dtype = dtype
+        self.blocksize = blocksize or samplerate // 100
+        self._running = False
+        self._thread = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        # Like a real microphone, a stream hears the source from the moment it opens
+        position = self.device.clock()
+        block_seconds = self.blocksize / self.samplerate
+        while self._running:
+            delay = self.device.wall_time_of(position + block_seconds) - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            if not self._running:
+                break
+            block = self.device.read_source(position, self.blocksize, self.samplerate)
+            position += block_seconds
+            indata = np.repeat(_to_dtype(block, self.dtype).reshape(-1, 1), self.channels, axis=1)
+            time_info = SimpleNamespace(inputBufferAdcTime=0.0, currentTime=0.0)
+            try:
+                self.callback(indata, self.blocksize, time_info, None)
+            except CallbackStop:
+                break
+            except Exception as e:
+                print(f"Error in replay input callback: {e}")
+                break
+        self._running = False
+
+    def stop(self) -> None:
+        self._running = False
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+
+    def close(self) -> None:
+        self.stop()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class _CaptureOutputStream:
+    def __init__(self, device: "ReplayDevice", samplerate, channels, dtype):
+        self.device = device
+        self.samplerate = samplerate
+        self.channels = channels
+        self.dtype = dtype
+        self._blocks: List[np.ndarray] = []
+        self._started_at = None
+
+    def start(self) -> None:
+        pass
+
+    def write(self, data: np.ndarray) -> None:
+        data = np.asarray(data)
+        if self._started_at is None:
+            self._started_at = time.monotonic()
+        self._blocks.append(_to_float32(data).reshape(len(data), -1)[:, 0].copy())
+        # Block for the audio's duration, as writing into a device buffer would
+        time.sleep(len(data) / self.samplerate / self.device.speed)
+
+    def stop(self) -> None:
+        if self._started_at is None:
+            return
+        self.device.record_playback(np.concatenate(self._blocks), self.samplerate, self._started_at)
+        self._blocks = []
+        self._started_at = None
+
+    def close(self) -> None:
+        self.stop()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class ReplayDevice(AudioDevice):
+    def __init__(self,
+                 sources: Sequence[Union[str, Path, Tuple[np.ndarray, int]]] = (),
+                 speed: float = 1.0,
+                 sample_rate: int = 16000,
+                 loop: bool = False):
+        """
+        Virtual microphone that replays recordings and speaker that captures playback.
+
+        The sources are concatenated into one timeline that plays on a wall
+        clock starting when the first input stream opens, at speed times real
+        time. Every input stream hears the timeline from the moment it opens,
+        so audio is missed while no stream is open, exactly as with a real
+        microphone; after the end, streams receive silence. Everything written
+        to output streams is kept in playback with monotonic timestamps.
+
+        Args:
+            sources: WAV paths or (samples, sample_rate) tuples, played in order
+            speed: Clock speed-up; 1.0 replays in real time
+            sample_rate: Rate the timeline is stored at
+            loop: Restart the timeline instead of going silent at the end
+        """
+        if speed <= 0:
+            raise ValueError("Replay speed must be positive")
+        self.speed = speed
+        self.sample_rate = sample_rate
+        self.loop = loop
+
+        pieces = [self._load(source) for source in sources]
+        self.timeline = np.concatenate(pieces) if pieces else np.zeros(0, dtype=np.float32)
+        self.started_at: Optional[float] = None
+        self.exhausted = threading.Event()
+        self.playback: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def _load(self, source: Union[str, Path, Tuple[np.ndarray, int]]) -> np.ndarray:
+        if isinstance(source, (str, Path)):
+            with wave.open(str(source), "rb") as wf:
+                if wf.getsampwidth() != 2:
+                    raise ValueError(f"{source} is not 16-bit PCM")
+                frames = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+                audio = frames.reshape(-1, wf.getnchannels())[:, 0]
+                sample_rate = wf.getframerate()
+        else:
+            audio, sample_rate = source
+            audio = np.asarray(audio).reshape(len(audio), -1)[:, 0]
+        return self._resample(_to_float32(audio), sample_rate, self.sample_rate)
+
+    @staticmethod
+    def _resample(audio: np.ndarray, from_rate: int, to_rate: int) -> np.ndarray:
+        if from_rate == to_rate or len(audio) == 0:
+            return audio
+        n_out = int(round(len(audio) * to_rate / from_rate))
+        positions = np.linspace(0, len(audio) - 1, n_out)
+        return np.interp(positions, np.arange(len(audio)), audio).astype(np.float32)
+
+    @property
+    def duration(self) -> float:
+        """Length of the replayed timeline in seconds."""
+        return len(self.timeline) / self.sample_rate
+
+    def clock(self) -> float:
+        """Current timeline position in seconds; starts the clock on first use."""
+        with self._lock:
+            if self.started_at is None:
+                self.started_at = time.monotonic()
+        return (time.monotonic() - self.started_at) * self.speed
+
+    def wall_time_of(self, seconds: float) -> float:
+        """time.monotonic() at which the timeline reaches seconds."""
+        if self.started_at is None:
+            self.clock()
+        return self.started_at + seconds / self.speed
+
+    def read_source(self, start_seconds: float, frames: int, samplerate: int) -> np.ndarray:
+        """Return frames of float32 timeline audio starting at start_seconds, resampled to samplerate."""
+        start = int(round(start_seconds * self.sample_rate))
+        n = int(round(frames * self.sample_rate / samplerate))
+        total = len(self.timeline)
+        if self.loop and total:
+            indices = (np.arange(start, start + n)) % total
+            block = self.timeline[indices]
+        else:
+            block = self.timeline[start:start + n]
+            if len(block) < n:
+                self.exhausted.set()
+                block = np.concatenate([block, np.zeros(n - len(block), dtype=np.float32)])
+        block = self._resample(block, self.sample_rate, samplerate)
+        return block[:frames] if len(block) >= frames else np.pad(block, (0, frames - len(block)))
+
+    def record_playback(self, audio: np.ndarray, samplerate: int, started_at: float) -> None:
+        """Keep a finished piece of playback with its timing."""
+        with self._lock:
+            self.playback.append({
+                "audio": audio,
+                "sample_rate": samplerate,
+                "started_at": started_at,
+                "finished_at": time.monotonic(),
+                "timeline_seconds": (started_at - self.started_at) * self.speed
+                if self.started_at is not None else None
+            })
+
+    def find_input_device(self, name: Optional[str]) -> Optional[int]:
+        # A single virtual device answers to any name
+        return 0
+
+    def input_stream(self, samplerate, callback, channels=1, dtype=np.float32, blocksize=0, device=None):
+        return _ReplayInputStream(self, samplerate, callback, channels, dtype, blocksize)
+
+    def output_stream(self, samplerate, channels=1, dtype=np.float32, device=None):
+        return _CaptureOutputStream(self, samplerate, channels, dtype)
+
+def create_audio_device(spec: Optional[str] = None, speed: float = 1.0) -> AudioDevice:
+    """
+    Build the audio device named by spec.
+
+    Args:
+        spec: "sounddevice" (or None) for real hardware, or
+            "replay:<wav>[,<wav>...]" to replay recordings
+        speed: Clock speed-up for replay devices
+
+    Returns:
+        Audio device
+    """
+    if spec is None or spec == "sounddevice":
+        return SoundDevice()
+    if spec.startswith("replay:"):
+        paths = [path for path in spec[len("replay:"):].split(",") if path]
+        return ReplayDevice(paths, speed=speed)
+    raise ValueError(f"Unknown audio device {spec!r}; expected 'sounddevice' or 'replay:<wav>[,<wav>...]'")
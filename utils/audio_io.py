@@ -1,20 +1,131 @@
 import numpy as np
-import sounddevice as sd
 import wave
 from pathlib import Path
-from typing import Optional, Union
+from typing import Optional, Union, Iterable, Tuple, Dict, Any, Callable
 import webrtcvad
 import struct
+import threading
+import queue
+import time
 from config import get_settings
+from utils.audio_device import AudioDevice, SoundDevice, CallbackStop
+from utils.capture import CaptureService
+from utils.endpointer import Endpointer, SPEECH_START, SPEECH_PAUSE, SPEECH_RESUME, SPEECH_END
+from utils.framing import Int16Converter, vad_frame_size
+from utils.metrics import metrics
+
+# Recording buffers hold max_duration plus this much, for stream blocks
+# that arrive around the deadline
+RECORD_MARGIN_SECONDS = 0.5
+
+class _RecordingBuffer:
+    def __init__(self,
+                 capacity: int,
+                 endpointer: Endpointer,
+                 on_audio: Optional[Callable[[np.ndarray], None]] = None,
+                 on_pause: Optional[Callable[[np.ndarray], None]] = None,
+                 on_resume: Optional[Callable[[], None]] = None):
+        """
+        Preallocated int16 buffer an endpointed recording is written into.
+        
+        Audio is written straight into the buffer and the endpointer runs on
+        views of it, so recording allocates nothing per block. Pre-roll at the
+        start is always kept; audio heard before speech starts is dropped by
+        moving the onset frames down once, so the recording stays contiguous
+        and audio() returns a view without copying.
+        
+        Args:
+            capacity: Samples the buffer can hold
+            endpointer: Endpointer fed each complete frame
+            on_audio: Optional callback receiving views of the recorded audio
+                as it is accepted
+            on_pause: Optional callback receiving the recording so far (a view
+                that stays valid) when the endpointer reports a pause
+            on_resume: Optional callback for speech continuing after a pause
+        """
+        self.samples = np.empty(capacity, dtype=np.int16)
+        self.endpointer = endpointer
+        self.on_audio = on_audio
+        self.on_pause = on_pause
+        self.on_resume = on_resume
+        self.keep = 0
+        self.write_pos = 0
+        self.processed = 0
+        self.end: Optional[int] = None
+        
+    @property
+    def endpointed(self) -> bool:
+        return self.end is not None
+        
+    def space(self, n: int) -> np.ndarray:
+        """View of up to n free samples at the write position."""
+        return self.samples[self.write_pos:self.write_pos + n]
+        
+    def add_preroll(self, n: int) -> None:
+        """Keep the n samples just written as pre-roll without endpointing them."""
+        self.write_pos += n
+        self.keep = self.processed = self.write_pos
+        if self.on_audio is not None:
+            self.on_audio(self.samples[:self.keep])
+        
+    def commit(self, n: int) -> bool:
+        """
+        Account for n samples written at the write position and endpoint every complete frame.
+        
+        Returns:
+            True once the endpoint has fired
+        """
+        self.write_pos += n
+        frame_size = self.endpointer.frame_size
+        while self.end is None and self.processed + frame_size <= self.write_pos:
+            frame = self.samples[self.processed:self.processed + frame_size]
+            self.processed += frame_size
+            event = self.endpointer.process(frame)
+            if event == SPEECH_END:
+                self.end = self.processed - frame_size
+            elif event == SPEECH_START:
+                self._drop_leading_silence()
+                self._emit(self.samples[self.keep:self.processed])
+            elif self.endpointer.triggered:
+                self._emit(frame)
+                if event == SPEECH_PAUSE and self.on_pause is not None:
+                    self.on_pause(self.samples[:self.processed])
+                elif event == SPEECH_RESUME and self.on_resume is not None:
+                    self.on_resume()
+        return self.end is not None
+        
+    def _drop_leading_silence(self) -> None:
+        # Move the onset frames (and any unprocessed samples) down to the pre-roll
+        onset = self.processed - self.endpointer.onset_samples
+        shift = onset - self.keep
+        if shift > 0:
+            self.samples[self.keep:self.write_pos - shift] = self.samples[onset:self.write_pos]
+            self.write_pos -= shift
+            self.processed -= shift
+        
+    def _emit(self, audio: np.ndarray) -> None:
+        if self.on_audio is not None:
+            self.on_audio(audio)
+        
+    def audio(self) -> np.ndarray:
+        """The recording: pre-roll plus the utterance up to the endpoint, as a view."""
+        if self.end is not None:
+            return self.samples[:self.end]
+        if self.endpointer.triggered:
+            return self.samples[:self.processed]
+        return self.samples[:self.keep]
 
 class AudioIO:
-    def __init__(self, device_name: Optional[str] = None):
+    def __init__(self, device_name: Optional[str] = None, audio_device: Optional[AudioDevice] = None):
         """
         Initialize the AudioIO class.
         
         Args:
             device_name: Name of the audio device to use. If None, uses default device.
+            audio_device: Audio backend (default: sounddevice); a ReplayDevice
+                runs everything from recordings without audio hardware
         """
+        self.audio_device = audio_device or SoundDevice()
         self.settings = get_settings()
         self.sample_rate = self.settings['SAMPLE_RATE']
         self.channels = self.settings['CHANNELS']
@@ -31,80 +142,162 @@ class AudioIO:
         # Initialize VAD
         self.vad = webrtcvad.Vad(3)  # Aggressiveness mode 3 (most aggressive)
         
+        # Endpoint details of the last recording (see record_audio)
+        self.last_endpoint: Optional[Dict[str, Any]] = None
+        self._converter = Int16Converter(vad_frame_size(self.sample_rate, 30))
+        
     def _get_device_id(self, device_name: Optional[str]) -> Optional[int]:
         """Get the device ID for the given device name."""
-        devices = sd.query_devices()
-        if device_name is None:
-            return sd.default.device[0]  # Return default input device
-        
-        for i, device in enumerate(devices):
-            if device['name'] == device_name and device['max_input_channels'] > 0:
-                return i
-        return None
+        return self.audio_device.find_input_device(device_name)
         
     def record_audio(self, 
                     max_duration: float = 10.0,
-                    silence_duration: float = 0.8) -> np.ndarray:
+                    silence_duration: float = 0.8,
+                    on_audio: Optional[Callable[[np.ndarray], None]] = None,
+                    capture: Optional[CaptureService] = None,
+                    start_position: Optional[int] = None,
+                    endpointer: Optional[Endpointer] = None,
+                    on_pause: Optional[Callable[[np.ndarray], None]] = None,
+                    on_resume: Optional[Callable[[], None]] = None) -> np.ndarray:
         """
-        Record audio with voice activity detection.
+        Record audio until the endpointer detects the end of speech.
+        
+        Returns as soon as the endpoint fires (or after max_duration). The
+        delay between the end of speech and the return is reported in
+        self.last_endpoint and the endpoint_delay metric.
         
         Args:
             max_duration: Maximum recording duration in seconds
-            silence_duration: Duration of silence to detect end of speech
+            silence_duration: Longest silence that ends speech when no
+                endpointer is given
+            on_audio: Optional callback receiving each recorded frame as it is
+                captured (e.g. StreamingTranscriber.add_audio)
+            capture: Shared capture service to read from instead of opening a
+                new input stream
+            start_position: Capture ring position to start from. Audio between
+                this position and the call is kept as pre-roll.
+            endpointer: Endpointer deciding where speech starts and ends
+                (e.g. one fed with partial transcripts); it is reset first
+            on_pause: Optional callback receiving the recording so far when
+                speech pauses, before the endpoint is confirmed (e.g.
+                Speculator.on_pause)
+            on_resume: Optional callback for speech continuing after a pause
             
         Returns:
-            numpy.ndarray: Recorded audio data
+            numpy.ndarray: Recorded int16 audio, a view of a buffer preallocated
+            for max_duration
         """
         print(f"Recording audio (max {max_duration}s)...")
         
-        # Calculate number of frames
-        max_frames = int(max_duration * self.sample_rate)
-        silence_frames = int(silence_duration * self.sample_rate)
+        if endpointer is None:
+            endpointer = Endpointer(
+                sample_rate=capture.sample_rate if capture is not None else self.sample_rate,
+                silence_duration=silence_duration
+            )
+        endpointer.reset()
         
-        # Initialize recording buffer
-        audio_buffer = []
-        silence_counter = 0
-        is_speaking = False
+        if capture is not None:
+            return self._record_from_capture(
+                capture, start_position, max_duration, endpointer, on_audio, on_pause, on_resume
+            )
         
-        def callback(indata, frames, time, status):
-            nonlocal silence_counter, is_speaking
-            
+        # Sized for everything the stream can deliver before max_duration
+        recording = _RecordingBuffer(int((max_duration + RECORD_MARGIN_SECONDS) * self.sample_rate),
+                                     endpointer, on_audio, on_pause, on_resume)
+        done = threading.Event()
+        # (samples received, time.monotonic() of the last one) for mapping positions to times
+        clock = [0, time.monotonic()]
+        
+        def callback(indata, frames, time_info, status):
             if status:
                 print(f"Audio input status: {status}")
             
-            # Convert to 16-bit PCM for VAD
-            pcm_data = (indata * 32767).astype(np.int16).tobytes()
-            
-            # Check for voice activity
-            is_voice = self.vad.is_speech(pcm_data, self.sample_rate)
+            now = time.monotonic()
+            if time_info.inputBufferAdcTime > 0:
+                end_time = now - (time_info.currentTime - time_info.inputBufferAdcTime) + frames / self.sample_rate
+            else:
+                end_time = now
+            clock[0] += frames
+            clock[1] = end_time
             
-            if is_voice:
-                silence_counter = 0
-                is_speaking = True
-                audio_buffer.append(indata.copy())
-            elif is_speaking:
-                silence_counter += frames
-                if silence_counter >= silence_frames:
-                    raise sd.CallbackStop
-                audio_buffer.append(indata.copy())
+            # Convert to 16-bit PCM straight into the recording buffer
+            space = recording.space(frames)
+            self._converter.convert(indata[:len(space), 0], out=space)
+            if recording.commit(len(space)) or len(space) < frames:
+                done.set()
+                raise CallbackStop
         
-        try:
-            with sd.InputStream(samplerate=self.sample_rate,
-                              channels=self.channels,
-                              device=self.device_id,
-                              callback=callback,
-                              blocksize=self.chunk_size):
-                sd.sleep(int(max_duration * 1000))
-        except sd.CallbackStop:
-            pass
-        
-        if not audio_buffer:
+        with self.audio_device.input_stream(samplerate=self.sample_rate,
+                                            callback=callback,
+                                            channels=self.channels,
+                                            blocksize=endpointer.frame_size,
+                                            device=self.device_id):
+            done.wait(max_duration / self.audio_device.speed)
+        
+        speech_end_time = None
+        if endpointer.speech_end_sample is not None:
+            speech_end_time = clock[1] - (clock[0] - endpointer.speech_end_sample) / self.sample_rate
+        return self._finish_recording(recording, speech_end_time)
+    
+    def _finish_recording(self, recording: "_RecordingBuffer", speech_end_time: Optional[float]) -> np.ndarray:
+        """Report the endpoint and return the recorded audio."""
+        returned_at = time.monotonic()
+        audio_data = recording.audio()
+        if not len(audio_data):
             raise RuntimeError("No audio recorded")
         
-        # Concatenate audio chunks
-        audio_data = np.concatenate(audio_buffer)
-        print(f"Recording complete. Duration: {len(audio_data) / self.sample_rate:.2f}s")
+        endpointer = recording.endpointer
+        delay = returned_at - speech_end_time if speech_end_time is not None else None
+        self.last_endpoint = {
+            "reason": "silence" if recording.endpointed else "max_duration",
+            "speech_duration": (endpointer.speech_end_sample - endpointer.speech_start_sample) / endpointer.sample_rate
+                if endpointer.speech_end_sample is not None else 0.0,
+            "silence_timeout": endpointer.silence_timeout_samples() / endpointer.sample_rate,
+            "speech_end_delay": delay
+        }
+        if delay is not None:
+            metrics.observe("endpoint_delay", delay)
+        
+        print(f"Recording complete. Duration: {len(audio_data) / endpointer.sample_rate:.2f}s"
+              + (f", end of speech to return {delay * 1000:.0f} ms" if delay is not None else ""))
         return audio_data
+    
+    def _record_from_capture(self,
+                             capture: CaptureService,
+                             start_position: Optional[int],
+                             max_duration: float,
+                             endpointer: Endpointer,
+                             on_audio: Optional[Callable[[np.ndarray], None]],
+                             on_pause: Optional[Callable[[np.ndarray], None]],
+                             on_resume: Optional[Callable[[], None]]) -> np.ndarray:
+        """Record an endpointed command from the shared capture ring buffer."""
+        frame_size = endpointer.frame_size
+        
+        reader = capture.reader(start_position)
+        preroll = max(0, capture.ring.position - reader.position)
+        deadline = time.monotonic() + max_duration
+        recording = _RecordingBuffer(preroll + int((max_duration + RECORD_MARGIN_SECONDS) * capture.sample_rate),
+                                     endpointer, on_audio, on_pause, on_resume)
+        
+        # Pre-roll captured before the call is always kept
+        if preroll and reader.read_into(recording.space(preroll), timeout=0):
+            recording.add_preroll(preroll)
+        first_live_position = reader.position
+        
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            space = recording.space(frame_size)
+            if len(space) < frame_size or not reader.read_into(space, timeout=remaining):
+                break
+            if recording.commit(frame_size):
+                break
+        
+        speech_end_time = None
+        if endpointer.speech_end_sample is not None:
+            speech_end_time = capture.ring.time_of(first_live_position + endpointer.speech_end_sample)
+        return self._finish_recording(recording, speech_end_time)
         
     def play_audio(self, audio_data: np.ndarray, sample_rate: Optional[int] = None):
         """
@@ -118,9 +311,81 @@ class AudioIO:
             sample_rate = self.sample_rate
             
         print("Playing audio...")
-        sd.play(audio_data, sample_rate)
-        sd.wait()
+        self.audio_device.play(audio_data, sample_rate)
+        print("Playback complete")
+
+    def play_stream(self, chunks: Iterable[Tuple[np.ndarray, int]]) -> Dict[str, Any]:
+        """
+        Play audio chunks as they are produced.
+        
+        The chunk iterator (typically a TTS generator) runs in a background
+        thread, so the first chunk starts playing while later ones are still
+        being synthesized.
+        
+        Args:
+            chunks: Iterable of (audio samples, sample rate) tuples
+            
+        Returns:
+            Dict with timing information:
+            - time_to_first_audio: Seconds from call to first sample written
+            - total_time: Seconds from call until playback finished
+            - chunks: Number of chunks played
+        """
+        start_time = time.perf_counter()
+        chunk_queue = queue.Queue()
+        done = object()
+
+        def produce():
+            try:
+                for chunk in chunks:
+                    chunk_queue.put(chunk)
+            except Exception as e:
+                chunk_queue.put(e)
+            finally:
+                chunk_queue.put(done)
+
+        producer = threading.Thread(target=produce, daemon=True)
+        producer.start()
+
+        stream = None
+        time_to_first_audio = None
+        n_chunks = 0
+        try:
+            while True:
+                item = chunk_queue.get()
+                if item is done:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+
+                audio_data, sample_rate = item
+                audio_data = np.asarray(audio_data)
+                if audio_data.dtype == np.int16:
+                    audio_data = audio_data.astype(np.float32) / 32768.0
+                audio_data = audio_data.astype(np.float32, copy=False).reshape(-1, 1)
+
+                if stream is None:
+                    print("Playing audio...")
+                    stream = self.audio_device.output_stream(sample_rate, channels=1, dtype=np.float32)
+                    stream.start()
+                    time_to_first_audio = time.perf_counter() - start_time
+
+                # Blocks until the chunk fits in the output buffer
+                stream.write(audio_data)
+                n_chunks += 1
+        finally:
+            if stream is not None:
+                # Drains the remaining buffered audio before closing
+                stream.stop()
+                stream.close()
+            producer.join()
+
         print("Playback complete")
+        return {
+            "time_to_first_audio": time_to_first_audio,
+            "total_time": time.perf_counter() - start_time,
+            "chunks": n_chunks
+        }
         
     def save_audio(self, audio_data: np.ndarray, file_path: Union[str, Path]):
         """
@@ -0,0 +1,254 @@
+import threading
+import time
+import numpy as np
+from typing import Optional
+
+from utils.audio_device import AudioDevice, SoundDevice
+from utils.framing import Int16Converter
+
+class AudioRingBuffer:
+    def __init__(self, capacity: int, sample_rate: int, dtype=np.int16):
+        """
+        Fixed-size ring buffer of mono samples addressed by absolute position.
+        
+        Positions count every sample ever written, so readers can refer to a
+        point in the stream (e.g. a wake word detection) and read around it as
+        long as it has not been overwritten yet.
+        
+        Args:
+            capacity: Number of samples retained
+            sample_rate: Sample rate of the stream
+            dtype: Sample dtype
+        """
+        self.capacity = capacity
+        self.sample_rate = sample_rate
+        self._buffer = np.zeros(capacity, dtype=dtype)
+        self._position = 0
+        self._position_time = None
+        self._closed = False
+        self._cond = threading.Condition()
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self._buffer.dtype
+
+    @property
+    def position(self) -> int:
+        """Absolute position one past the newest sample."""
+        return self._position
+
+    @property
+    def oldest_position(self) -> int:
+        """Absolute position of the oldest sample still retained."""
+        return max(0, self._position - self.capacity)
+
+    def write(self, samples: np.ndarray, end_time: Optional[float] = None) -> None:
+        """
+        Append samples, overwriting the oldest ones when full.
+        
+        Args:
+            samples: Mono samples (converted to the buffer dtype on copy)
+            end_time: time.monotonic() at which the last sample was captured
+        """
+        samples = samples.reshape(-1)
+        n = len(samples)
+        # Copy under the lock: a reader that just checked oldest_position
+        # must not have its slots overwritten mid-copy
+        with self._cond:
+            if n > self.capacity:
+                samples = samples[-self.capacity:]
+                self._position += n - self.capacity
+                n = self.capacity
+
+            start = self._position % self.capacity
+            first = min(n, self.capacity - start)
+            self._buffer[start:start + first] = samples[:first]
+            if first < n:
+                self._buffer[:n - first] = samples[first:]
+
+            self._position += n
+            self._position_time = end_time if end_time is not None else time.monotonic()
+            self._cond.notify_all()
+
+    def read(self, start: int, end: int) -> np.ndarray:
+        """
+        Copy samples in [start, end) out of the buffer.
+        
+        Raises:
+            ValueError: If part of the range has been overwritten or not written yet
+        """
+        out = np.empty(max(0, end - start), dtype=self._buffer.dtype)
+        self.read_into(start, out)
+        return out
+
+    def read_into(self, start: int, out: np.ndarray) -> None:
+        """
+        Copy the len(out) samples starting at start into out.
+        
+        Raises:
+            ValueError: If part of the range has been overwritten or not written yet
+        """
+        end = start + len(out)
+        with self._cond:
+            if start < self.oldest_position or end > self._position:
+                raise ValueError(
+                    f"Range [{start}, {end}) not available in ring buffer "
+                    f"[{self.oldest_position}, {self._position})"
+                )
+            i = start % self.capacity
+            first = min(end - start, self.capacity - i)
+            out[:first] = self._buffer[i:i + first]
+            if first < len(out):
+                out[first:] = self._buffer[:len(out) - first]
+
+    def wait_for(self, position: int, timeout: Optional[float] = None) -> bool:
+        """
+        Block until the buffer holds samples up to position.
+        
+        Returns:
+            True if the position was reached, False on timeout or close
+        """
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: self._position >= position or self._closed, timeout
+            ) and self._position >= position
+
+    def time_of(self, position: int) -> float:
+        """Estimate the time.monotonic() at which the sample at position was captured."""
+        if self._position_time is None:
+            return time.monotonic()
+        return self._position_time - (self._position - position) / self.sample_rate
+
+    def close(self) -> None:
+        """Wake all waiting readers; no more data will arrive."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def reopen(self) -> None:
+        """Allow readers to block again after close()."""
+        with self._cond:
+            self._closed = False
+
+class RingReader:
+    def __init__(self, ring: AudioRingBuffer, start: Optional[int] = None):
+        """
+        Independent read cursor over an AudioRingBuffer.
+        
+        Args:
+            ring: Buffer to read from
+            start: Absolute position to start at (default: the current end)
+        """
+        self.ring = ring
+        self.position = ring.position if start is None else max(start, ring.oldest_position)
+
+    def read(self, n_samples: int, timeout: Optional[float] = None) -> Optional[np.ndarray]:
+        """
+        Block until n_samples are available past the cursor and return them.
+        
+        If the reader fell behind and its data was overwritten, it skips
+        forward to the oldest retained sample.
+        
+        Returns:
+            numpy.ndarray of n_samples, or None on timeout or close
+        """
+        out = np.empty(n_samples, dtype=self.ring.dtype)
+        return out if self.read_into(out, timeout) else None
+
+    def read_into(self, out: np.ndarray, timeout: Optional[float] = None) -> bool:
+        """
+        Like read(), but fill out (len(out) samples) instead of allocating.
+        
+        Returns:
+            True if out was filled, False on timeout or close
+        """
+        if self.position < self.ring.oldest_position:
+            print(f"Capture reader overrun, skipping {self.ring.oldest_position - self.position} samples")
+            self.position = self.ring.oldest_position
+        if not self.ring.wait_for(self.position + len(out), timeout):
+            return False
+        self.ring.read_into(self.position, out)
+        self.position += len(out)
+        return True
+
+class CaptureService:
+    def __init__(self,
+                 sample_rate: int = 16000,
+                 device: Optional[int] = None,
+                 blocksize: int = 480,
+                 buffer_seconds: float = 30.0,
+                 audio_device: Optional[AudioDevice] = None):
+        """
+        One persistent input stream shared by every audio consumer.
+        
+        Captured audio is converted to int16 and written to a ring buffer;
+        wake word detection, endpointing and command recording each read it
+        through their own RingReader, so the stream is never reopened between
+        turns and audio from just before a detection is still available.
+        
+        Args:
+            sample_rate: Capture sample rate
+            device: Input device ID (None for system default)
+            blocksize: Frames per capture callback
+            buffer_seconds: Audio history retained in the ring buffer
+            audio_device: Device to capture from (default: sounddevice)
+        """
+        self.audio_device = audio_device or SoundDevice()
+        self.sample_rate = sample_rate
+        self.device = device
+        self.blocksize = blocksize
+        self.ring = AudioRingBuffer(int(buffer_seconds * sample_rate), sample_rate)
+        self._converter = Int16Converter(blocksize)
+        self._stream = None
+
+    def _callback(self, indata, frames, time_info, status):
+        if status:
+            print(f"Capture status: {status}")
+        # Map the ADC time of the block's last sample onto time.monotonic()
+        now = time.monotonic()
+        if time_info.inputBufferAdcTime > 0:
+            end_time = now - (time_info.currentTime - time_info.inputBufferAdcTime) + frames / self.sample_rate
+        else:
+            end_time = now
+        # Converted into a reused scratch buffer; write() copies it into the ring
+        self.ring.write(self._converter.convert(indata[:, 0]), end_time)
+
+    def start(self) -> None:
+        """Open the input stream if it is not already running."""
+        if self._stream is not None:
+            return
+        self.ring.reopen()
+        self._stream = self.audio_device.input_stream(
+            samplerate=self.sample_rate,
+            callback=self._callback,
+            channels=1,
+            dtype=np.float32,
+            blocksize=self.blocksize,
+            device=self.device
+        )
+        self._stream.start()
+        print("Audio capture started")
+
+    def stop(self) -> None:
+        """Close the input stream and release waiting readers."""
+        if self._stream is None:
+            return
+        self._stream.stop()
+        self._stream.close()
+        self._stream = None
+        self.ring.close()
+        print("Audio capture stopped")
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the input stream is open."""
+        return self._stream is not None
+
+    def reader(self, start: Optional[int] = None) -> RingReader:
+        """
+        Create a read cursor over the captured stream.
+        
+        Args:
+            start: Absolute start position (default: now)
+        """
+        return RingReader(self.ring, start)
@@ -0,0 +1,214 @@
+import math
+import numpy as np
+import webrtcvad
+from collections import deque
+from typing import Optional
+
+from utils.framing import vad_frame_size
+
+# Events returned by Endpointer.process()
+SPEECH_START = "start"
+SPEECH_PAUSE = "pause"
+SPEECH_RESUME = "resume"
+SPEECH_END = "end"
+
+# Transcript endings that sound like a finished utterance
+_COMPLETE_ENDINGS = (".", "?", "!")
+
+class Endpointer:
+    def __init__(self,
+                 sample_rate: int = 16000,
+                 frame_ms: int = 30,
+                 vad_mode: int = 3,
+                 silence_duration: float = 0.8,
+                 min_silence_duration: float = 0.3,
+                 energy_margin_db: float = 10.0,
+                 onset_window: int = 5,
+                 onset_frames: int = 3,
+                 hangover_window: int = 3,
+                 hangover_frames: int = 2,
+                 min_speech_duration: float = 0.5,
+                 pause_duration: float = 0.1):
+        """
+        Decide when an utterance starts and ends from fixed-size int16 frames.
+
+        Each frame is classified as speech when webrtcvad and an energy check
+        against an adaptive noise floor agree, which rejects the VAD's false
+        positives on quiet background noise. The decision is smoothed: speech starts once onset_frames of
+        the last onset_window frames are speech, and once started a frame only
+        counts as speech if hangover_frames of the last hangover_window are,
+        so single clicks neither start an utterance nor reset the end timer.
+
+        The utterance ends after a silence timeout that adapts between
+        min_silence_duration and silence_duration: it is shortest when the
+        running transcript ends like a complete sentence, shorter when the
+        speech energy trailed off, and full-length for very short utterances.
+
+        Args:
+            sample_rate: Audio sample rate (8, 16, 32 or 48 kHz)
+            frame_ms: Frame duration, one of 10, 20 or 30 ms
+            vad_mode: VAD aggressiveness mode, 0-3
+            silence_duration: Longest silence timeout, in seconds
+            min_silence_duration: Shortest silence timeout, in seconds
+            energy_margin_db: How far above the noise floor speech must be
+            onset_window: Frames considered when detecting speech start
+            onset_frames: Speech frames within onset_window that start an utterance
+            hangover_window: Frames considered when deciding whether speech continues
+            hangover_frames: Speech frames within hangover_window that count as speech
+            min_speech_duration: Utterances shorter than this always get the
+                full silence timeout
+            pause_duration: Silence after which a SPEECH_PAUSE event is
+                reported (short enough to be the start of the silence timeout,
+                long enough to skip gaps between words)
+        """
+        self.sample_rate = sample_rate
+        self.frame_size = vad_frame_size(sample_rate, frame_ms)
+        self.vad = webrtcvad.Vad(vad_mode)
+        self.max_silence_samples = int(silence_duration * sample_rate)
+        self.min_silence_samples = int(min_silence_duration * sample_rate)
+        self.energy_margin_db = energy_margin_db
+        self.onset_frames = onset_frames
+        self.onset_window = onset_window
+        self.hangover_frames = hangover_frames
+        self.min_speech_samples = int(min_speech_duration * sample_rate)
+        self.pause_samples = int(pause_duration * sample_rate)
+        self._onset = deque(maxlen=onset_window)
+        self._hangover = deque(maxlen=hangover_window)
+        self._tail_db = deque(maxlen=5)
+        self._scratch = np.empty(self.frame_size, dtype=np.float32)
+        self.noise_floor_db = -60.0
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget the current utterance; the noise floor estimate is kept."""
+        self._onset.clear()
+        self._hangover.clear()
+        self._tail_db.clear()
+        self.triggered = False
+        self.ended = False
+        self.is_speech = False
+        self.samples_processed = 0
+        self.speech_start_sample: Optional[int] = None
+        self.speech_end_sample: Optional[int] = None
+        self.silence_samples = 0
+        self.paused = False
+        self._speech_db_sum = 0.0
+        self._speech_db_count = 0
+        self._transcript_complete = False
+        self._hint_samples = 0
+
+    def hint_transcript(self, text: str, covered_samples: int) -> None:
+        """
+        Tell the endpointer what has been recognized so far.
+
+        Whisper punctuates almost every partial, even one cut mid-sentence,
+        so a final ".", "?" or "!" alone proves little. A transcript only
+        shortens the silence timeout when it ends like a finished sentence
+        and was decoded from audio reaching the end of the speech heard so
+        far; a partial that stops earlier may have been cut mid-sentence.
+        Hints older than the last one (decodes finishing out of order) are
+        ignored, and the hint is forgotten as soon as more speech arrives.
+
+        Args:
+            text: Transcript of the audio decoded so far
+            covered_samples: Position, in samples processed by this
+                endpointer, of the end of the decoded audio
+        """
+        if covered_samples < self._hint_samples:
+            return
+        self._hint_samples = covered_samples
+        self._transcript_complete = (
+            text.strip().endswith(_COMPLETE_ENDINGS)
+            and self.speech_end_sample is not None
+            and covered_samples >= self.speech_end_sample
+        )
+
+    @property
+    def onset_samples(self) -> int:
+        """Samples before the start event that belong to the utterance."""
+        return len(self._onset) * self.frame_size
+
+    def silence_timeout_samples(self) -> int:
+        """Silence needed to end the utterance, given what has been heard so far."""
+        speech_samples = (self.speech_end_sample or 0) - (self.speech_start_sample or 0)
+        if speech_samples < self.min_speech_samples:
+            return self.max_silence_samples
+        if self._transcript_complete:
+            return self.min_silence_samples
+        if self._speech_db_count and self._tail_db:
+            speech_mean = self._speech_db_sum / self._speech_db_count
+            if sum(self._tail_db) / len(self._tail_db) < speech_mean - 6.0:
+                # Trailing-off energy sounds like the end of a phrase
+                return (self.min_silence_samples + self.max_silence_samples) // 2
+        return self.max_silence_samples
+
+    def _frame_db(self, frame: np.ndarray) -> float:
+        # Float copy into a reused scratch buffer; dot() avoids a squared copy
+        samples = self._scratch[:len(frame)]
+        np.copyto(samples, frame)
+        rms = math.sqrt(float(np.dot(samples, samples)) / len(samples))
+        return 20.0 * math.log10(rms / 32768.0 + 1e-10)
+
+    def _classify(self, frame: np.ndarray, db: float) -> bool:
+        """Hybrid energy/VAD speech decision for one frame."""
+        above_floor = db - self.noise_floor_db
+        vad_speech = self.vad.is_speech(frame.tobytes(), self.sample_rate)
+        speech = vad_speech and above_floor > self.energy_margin_db
+        if not speech:
+            # Track the noise floor: drop quickly, rise slowly
+            rate = 0.3 if db < self.noise_floor_db else 0.02
+            self.noise_floor_db += rate * (db - self.noise_floor_db)
+        return speech
+
+    def process(self, frame: np.ndarray) -> Optional[str]:
+        """
+        Feed one frame of frame_size int16 samples.
+
+        Returns:
+            SPEECH_START when the utterance starts (the onset_samples before
+            this frame's end belong to it), SPEECH_PAUSE when a pause in the
+            utterance has lasted pause_duration, SPEECH_RESUME when speech
+            continues after such a pause, SPEECH_END when the endpoint fires,
+            otherwise None
+        """
+        if self.ended:
+            return None
+        db = self._frame_db(frame)
+        raw_speech = self._classify(frame, db)
+        self.samples_processed += len(frame)
+
+        event = None
+        if not self.triggered:
+            self._onset.append(raw_speech)
+            if sum(self._onset) < self.onset_frames:
+                return None
+            self.triggered = True
+            self.speech_start_sample = self.samples_processed - self.onset_samples
+            self._hangover.extend([True] * self._hangover.maxlen)
+            event = SPEECH_START
+
+        self._hangover.append(raw_speech)
+        self.is_speech = sum(self._hangover) >= self.hangover_frames
+        if self.is_speech:
+            if raw_speech:
+                self.speech_end_sample = self.samples_processed
+                self._speech_db_sum += db
+                self._speech_db_count += 1
+                self._tail_db.append(db)
+            if self.silence_samples:
+                # Speech resumed after a pause; an earlier transcript no longer covers it
+                self._transcript_complete = False
+            self.silence_samples = 0
+            if self.paused:
+                self.paused = False
+                return SPEECH_RESUME
+            return event
+
+        self.silence_samples += len(frame)
+        if self.silence_samples >= self.silence_timeout_samples():
+            self.ended = True
+            return SPEECH_END
+        if not self.paused and self.silence_samples >= self.pause_samples:
+            self.paused = True
+            return SPEECH_PAUSE
+        return None
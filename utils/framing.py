@@ -0,0 +1,149 @@
+import queue
+import numpy as np
+from typing import List, Optional
+
+# Frame durations webrtcvad accepts
+VAD_FRAME_DURATIONS_MS = (10, 20, 30)
+
+# openWakeWord's streaming feature extractor consumes 80 ms frames at 16 kHz
+WAKE_WORD_FRAME_SIZE = 1280
+
+def vad_frame_size(sample_rate: int, frame_duration_ms: int) -> int:
+    """
+    Number of samples in a webrtcvad frame.
+    
+    Args:
+        sample_rate: Audio sample rate
+        frame_duration_ms: Frame duration, one of 10, 20 or 30 ms
+        
+    Returns:
+        Samples per frame
+    """
+    if frame_duration_ms not in VAD_FRAME_DURATIONS_MS:
+        raise ValueError(f"webrtcvad frames must be 10, 20 or 30 ms, got {frame_duration_ms} ms")
+    return sample_rate * frame_duration_ms // 1000
+
+class Reframer:
+    def __init__(self, frame_size: int, dtype=np.int16):
+        """
+        Re-block a stream of arbitrarily sized chunks into fixed-size frames.
+        
+        Samples that do not fill a whole frame are carried over to the next
+        push, so consecutive frames are always contiguous in the stream.
+        
+        Args:
+            frame_size: Samples per output frame
+            dtype: Sample dtype of the output frames
+        """
+        self.frame_size = frame_size
+        self.dtype = np.dtype(dtype)
+        self._pending = np.zeros(frame_size, dtype=self.dtype)
+        self._n_pending = 0
+
+    def push(self, samples: np.ndarray) -> List[np.ndarray]:
+        """
+        Add samples and return every frame that is now complete.
+        
+        Args:
+            samples: Mono samples, shape (n,) or (n, 1)
+            
+        Returns:
+            List of frames of exactly frame_size samples, in stream order
+        """
+        samples = np.asarray(samples).reshape(-1)
+        frames = []
+        pos = 0
+
+        # Complete the partially filled frame first
+        if self._n_pending:
+            take = min(self.frame_size - self._n_pending, len(samples))
+            self._pending[self._n_pending:self._n_pending + take] = samples[:take]
+            self._n_pending += take
+            pos = take
+            if self._n_pending < self.frame_size:
+                return frames
+            frames.append(self._pending.copy())
+            self._n_pending = 0
+
+        # Whole frames straight out of the input
+        n_whole = (len(samples) - pos) // self.frame_size
+        for _ in range(n_whole):
+            frames.append(samples[pos:pos + self.frame_size].astype(self.dtype, copy=True))
+            pos += self.frame_size
+
+        # Carry the remainder over
+        remainder = len(samples) - pos
+        if remainder:
+            self._pending[:remainder] = samples[pos:]
+            self._n_pending = remainder
+        return frames
+
+    def reset(self) -> None:
+        """Drop any partially filled frame."""
+        self._n_pending = 0
+
+class Int16Converter:
+    def __init__(self, size: int = 0):
+        """
+        Convert float samples in [-1, 1] to int16 without allocating per call.
+        
+        The float scratch buffer is kept between calls and only grows when a
+        larger block arrives, so audio callbacks do no steady-state allocation.
+        
+        Args:
+            size: Initial scratch size in samples
+        """
+        self._scratch = np.empty(size, dtype=np.float32)
+        self._out = np.empty(size, dtype=np.int16)
+
+    def convert(self, samples: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Clip, scale and convert samples to int16.
+        
+        Args:
+            samples: Mono float samples, shape (n,)
+            out: int16 array of at least n samples to write into (default: an
+                internal buffer that is overwritten by the next call)
+            
+        Returns:
+            int16 view of the first n samples of out
+        """
+        n = len(samples)
+        if len(self._scratch) < n:
+            self._scratch = np.empty(n, dtype=np.float32)
+        if out is None:
+            if len(self._out) < n:
+                self._out = np.empty(n, dtype=np.int16)
+            out = self._out
+        scratch = self._scratch[:n]
+        np.clip(samples, -1.0, 1.0, out=scratch)
+        np.multiply(scratch, 32767, out=scratch)
+        out = out[:n]
+        np.copyto(out, scratch, casting="unsafe")
+        return out
+
+class BufferPool:
+    def __init__(self, count: int, size: int, dtype=np.int16):
+        """
+        Fixed set of preallocated buffers handed from a producer to a consumer thread.
+        
+        Args:
+            count: Number of buffers; bounds how far the consumer can fall behind
+            size: Samples per buffer
+            dtype: Sample dtype
+        """
+        self.size = size
+        self._free = queue.SimpleQueue()
+        for _ in range(count):
+            self._free.put(np.empty(size, dtype=dtype))
+
+    def acquire(self) -> Optional[np.ndarray]:
+        """Take a free buffer, or None if all are in use (never blocks)."""
+        try:
+            return self._free.get_nowait()
+        except queue.Empty:
+            return None
+
+    def release(self, buffer: np.ndarray) -> None:
+        """Return a buffer taken with acquire()."""
+        self._free.put(buffer)
@@ -0,0 +1,194 @@
+import json
+import threading
+import time
+import numpy as np
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, Optional, Union, List, Tuple
+
+class Histogram:
+    def __init__(self, max_samples: int = 10000):
+        """
+        Latency/throughput distribution over the most recent observations.
+        
+        Count, sum, min and max cover every observation; percentiles are
+        computed over the last max_samples values.
+        
+        Args:
+            max_samples: Observations retained for percentile estimates
+        """
+        self._values = deque(maxlen=max_samples)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+
+    def observe(self, value: float) -> None:
+        """Record one observation."""
+        with self._lock:
+            self._values.append(value)
+            self.count += 1
+            self.total += value
+            self.min = min(self.min, value)
+            self.max = max(self.max, value)
+
+    def summary(self) -> Dict[str, float]:
+        """Count, mean, min, max and p50/p95/p99 of the observations."""
+        with self._lock:
+            if not self.count:
+                return {"count": 0}
+            values = np.fromiter(self._values, dtype=np.float64)
+            p50, p95, p99 = np.percentile(values, [50, 95, 99])
+            return {
+                "count": self.count,
+                "mean": self.total / self.count,
+                "min": self.min,
+                "max": self.max,
+                "p50": float(p50),
+                "p95": float(p95),
+                "p99": float(p99)
+            }
+
+class MetricsRegistry:
+    def __init__(self, max_samples: int = 10000):
+        """
+        Named histograms and counters, optionally split by labels.
+        
+        Args:
+            max_samples: Observations retained per histogram
+        """
+        self.max_samples = max_samples
+        self._histograms: Dict[str, Histogram] = {}
+        self._counters: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        
+        # Raw observations kept for forwarding to another process (see drain_events)
+        self._events: Optional[List[Tuple[str, str, float, Dict[str, Any]]]] = None
+
+    def record_events(self, enabled: bool = True) -> None:
+        """
+        Also keep every observation so it can be forwarded with drain_events().
+        
+        Used by worker processes, whose registries are not visible to the
+        service that serves /metrics.
+        """
+        with self._lock:
+            self._events = [] if enabled else None
+
+    def drain_events(self) -> List[Tuple[str, str, float, Dict[str, Any]]]:
+        """Return and clear the observations recorded since the last drain."""
+        with self._lock:
+            if self._events is None:
+                return []
+            events, self._events = self._events, []
+            return events
+
+    def replay(self, events: List[Tuple[str, str, float, Dict[str, Any]]]) -> None:
+        """Apply observations drained from another registry."""
+        for kind, name, value, labels in events:
+            if kind == "observe":
+                self.observe(name, value, **labels)
+            else:
+                self.increment(name, value, **labels)
+
+    @staticmethod
+    def _key(name: str, labels: Dict[str, Any]) -> str:
+        if not labels:
+            return name
+        label_str = ",".join(f"{k}={labels[k]}" for k in sorted(labels))
+        return f"{name}{{{label_str}}}"
+
+    def histogram(self, name: str, **labels) -> Histogram:
+        """Get or create the histogram for name and labels."""
+        key = self._key(name, labels)
+        with self._lock:
+            if key not in self._histograms:
+                self._histograms[key] = Histogram(self.max_samples)
+            return self._histograms[key]
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        """Record a value in the histogram for name and labels."""
+        self.histogram(name, **labels).observe(value)
+        if self._events is not None:
+            with self._lock:
+                if self._events is not None:
+                    self._events.append(("observe", name, value, labels))
+
+    def increment(self, name: str, value: float = 1, **labels) -> None:
+        """Add to a counter."""
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+            if self._events is not None:
+                self._events.append(("increment", name, value, labels))
+
+    @contextmanager
+    def span(self, name: str, **labels):
+        """
+        Time a block and record its duration in seconds under name.
+        
+        Example:
+            with metrics.span("stage", stage="stt"):
+                ...
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def record_throughput(self, name: str, audio_seconds: float, wall_seconds: float, **labels) -> None:
+        """
+        Record processing speed of an audio engine.
+        
+        Observes {name}_speed (audio-seconds per wall-second, higher is faster)
+        and {name}_rtf (real-time factor, wall-seconds per audio-second).
+        """
+        if audio_seconds <= 0 or wall_seconds <= 0:
+            return
+        self.observe(f"{name}_speed", audio_seconds / wall_seconds, **labels)
+        self.observe(f"{name}_rtf", wall_seconds / audio_seconds, **labels)
+        self.increment(f"{name}_audio_seconds", audio_seconds, **labels)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """All histogram summaries and counter values."""
+        with self._lock:
+            histograms = dict(self._histograms)
+            counters = dict(self._counters)
+        return {
+            "histograms": {key: h.summary() for key, h in sorted(histograms.items())},
+            "counters": dict(sorted(counters.items()))
+        }
+
+    def format(self) -> str:
+        """Render the snapshot as a text table."""
+        snapshot = self.snapshot()
+        lines = [f"{'metric':<48} {'count':>7} {'p50':>9} {'p95':>9} {'p99':>9}"]
+        for key, summary in snapshot["histograms"].items():
+            if not summary["count"]:
+                continue
+            lines.append(
+                f"{key:<48} {summary['count']:>7} {summary['p50']:>9.4f} "
+                f"{summary['p95']:>9.4f} {summary['p99']:>9.4f}"
+            )
+        for key, value in snapshot["counters"].items():
+            lines.append(f"{key:<48} {value:>7g}")
+        return "\n".join(lines)
+
+    def dump(self, path: Union[str, Path]) -> None:
+        """Write the snapshot as JSON."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.snapshot(), f, indent=2)
+
+    def reset(self) -> None:
+        """Drop all recorded metrics."""
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+# Process-wide registry shared by engines, services and the assistant
+metrics = MetricsRegistry()
@@ -0,0 +1,105 @@
+import numpy as np
+from typing import Dict, Optional, Tuple
+
+# Raw little-endian PCM; sample rate and dtype travel in headers
+PCM_MEDIA_TYPE = "application/octet-stream"
+JSON_MEDIA_TYPE = "application/json"
+SAMPLE_RATE_HEADER = "X-Sample-Rate"
+DTYPE_HEADER = "X-Audio-Dtype"
+
+# Wire dtypes are always little-endian regardless of host byte order
+WIRE_DTYPES = {
+    "int16": np.dtype("<i2"),
+    "float32": np.dtype("<f4"),
+}
+
+def encode_pcm(audio_data: np.ndarray, dtype: str = "int16") -> bytes:
+    """
+    Serialize audio samples to raw little-endian PCM bytes.
+    
+    Float samples in [-1, 1] sent as int16 are scaled with to_int16(), and
+    int16 samples sent as float32 are scaled to [-1, 1].
+    
+    Args:
+        audio_data: Mono audio samples, shape (n,) or (n, 1)
+        dtype: Wire dtype, "int16" or "float32"
+        
+    Returns:
+        PCM payload
+    """
+    if dtype not in WIRE_DTYPES:
+        raise ValueError(f"Unsupported PCM dtype: {dtype}")
+    audio_data = np.asarray(audio_data).reshape(-1)
+    if dtype == "int16" and audio_data.dtype.kind == "f":
+        audio_data = to_int16(audio_data)
+    elif audio_data.dtype == np.int16:
+        audio_data = audio_data.astype(np.float32) / 32768.0
+    return audio_data.astype(WIRE_DTYPES[dtype], copy=False).tobytes()
+
+def decode_pcm(payload: bytes, dtype: str = "int16") -> np.ndarray:
+    """
+    Deserialize raw little-endian PCM bytes without copying on little-endian hosts.
+    
+    Args:
+        payload: PCM payload
+        dtype: Wire dtype, "int16" or "float32"
+        
+    Returns:
+        numpy.ndarray of native int16 or float32 samples
+    """
+    if dtype not in WIRE_DTYPES:
+        raise ValueError(f"Unsupported PCM dtype: {dtype}")
+    wire_dtype = WIRE_DTYPES[dtype]
+    if len(payload) % wire_dtype.itemsize:
+        raise ValueError(f"PCM payload length {len(payload)} is not a multiple of {wire_dtype.itemsize}")
+    audio_data = np.frombuffer(payload, dtype=wire_dtype)
+    return audio_data.astype(wire_dtype.newbyteorder("="), copy=False)
+
+def pcm_headers(sample_rate: int, dtype: str = "int16") -> Dict[str, str]:
+    """Build the headers that describe a PCM payload."""
+    return {
+        "Content-Type": PCM_MEDIA_TYPE,
+        SAMPLE_RATE_HEADER: str(sample_rate),
+        DTYPE_HEADER: dtype,
+    }
+
+def parse_pcm_headers(headers, default_sample_rate: Optional[int] = None) -> Tuple[int, str]:
+    """
+    Read sample rate and dtype from PCM headers.
+    
+    Returns:
+        Tuple of (sample_rate, dtype)
+    """
+    sample_rate = headers.get(SAMPLE_RATE_HEADER)
+    if sample_rate is None:
+        if default_sample_rate is None:
+            raise ValueError(f"Missing {SAMPLE_RATE_HEADER} header")
+        sample_rate = default_sample_rate
+    dtype = headers.get(DTYPE_HEADER, "int16").lower()
+    if dtype not in WIRE_DTYPES:
+        raise ValueError(f"Unsupported PCM dtype: {dtype}")
+    return int(sample_rate), dtype
+
+def wants_pcm(accept: Optional[str]) -> bool:
+    """
+    Decide whether a client asked for PCM rather than JSON.
+    
+    The first of the two media types listed in the Accept header wins;
+    JSON remains the default for clients that do not ask.
+    """
+    if not accept:
+        return False
+    for media_range in accept.split(","):
+        media_type = media_range.split(";")[0].strip().lower()
+        if media_type == PCM_MEDIA_TYPE:
+            return True
+        if media_type == JSON_MEDIA_TYPE:
+            return False
+    return False
+
+def to_int16(audio_data: np.ndarray) -> np.ndarray:
+    """Convert float samples in [-1, 1] to int16; int16 input is returned as-is."""
+    audio_data = np.asarray(audio_data)
+    if audio_data.dtype == np.int16:
+        return audio_data
+    return (np.clip(audio_data, -1.0, 1.0) * 32767).astype(np.int16)
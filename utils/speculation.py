@@ -0,0 +1,84 @@
+import threading
+import time
+import numpy as np
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from utils.metrics import metrics
+
+class Speculator:
+    def __init__(self, work: Callable[[np.ndarray], Any]):
+        """
+        Run work on the audio heard so far whenever speech pauses.
+
+        on_pause() starts work (e.g. transcription) in a background thread
+        while the endpointer is still waiting out its silence timeout, and
+        on_resume() cancels it because the audio it saw is incomplete. A job
+        that already started cannot be interrupted, so it runs to completion
+        and its result is discarded. At the endpoint, commit() returns the
+        result of the speculation started at the final pause, which has had
+        the whole silence timeout to run.
+
+        Args:
+            work: Called with the audio up to the pause; its return value is
+                what commit() returns
+        """
+        self.work = work
+        # One worker: speculations run in order and never compete for the model
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="speculation")
+        self._lock = threading.Lock()
+        self._future: Optional[Future] = None
+        self._started_at = 0.0
+        self.stats: Dict[str, int] = {"started": 0, "cancelled": 0, "committed": 0, "failed": 0}
+
+    def on_pause(self, audio: np.ndarray) -> None:
+        """Start speculative work on audio (the recording up to the pause)."""
+        with self._lock:
+            if self._future is not None:
+                self._future.cancel()
+                self.stats["cancelled"] += 1
+            self._started_at = time.perf_counter()
+            self._future = self._executor.submit(self.work, audio)
+            self.stats["started"] += 1
+
+    def on_resume(self) -> None:
+        """Speech continued: cancel the pending speculation."""
+        with self._lock:
+            if self._future is None:
+                return
+            self._future.cancel()
+            self._future = None
+            self.stats["cancelled"] += 1
+
+    def commit(self) -> Optional[Any]:
+        """
+        Take the result of the speculation that is still valid at the endpoint.
+
+        Blocks until it finishes if it is still running.
+
+        Returns:
+            The work's result, or None if nothing was speculated or it failed
+        """
+        with self._lock:
+            future, self._future = self._future, None
+            started_at = self._started_at
+        if future is None:
+            return None
+
+        wait_start = time.perf_counter()
+        try:
+            result = future.result()
+        except Exception as e:
+            print(f"Speculative work failed: {e}")
+            self.stats["failed"] += 1
+            return None
+        # Time still spent after the endpoint; the rest was hidden behind the silence timeout
+        metrics.observe("speculation_wait", time.perf_counter() - wait_start)
+        metrics.observe("speculation_lead", wait_start - started_at)
+        self.stats["committed"] += 1
+        return result
+
+    def close(self) -> None:
+        """Drop any pending speculation and stop the worker."""
+        self.on_resume()
+        self._executor.shutdown(wait=False)
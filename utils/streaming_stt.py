@@ -0,0 +1,222 @@
+import bisect
+import threading
+import time
+import numpy as np
+from typing import Dict, Any, Optional, Callable, List, Tuple
+
+from utils.stt import STTBackend, MODEL_SAMPLE_RATE
+from config.settings import SAMPLE_RATE
+
+class StreamingTranscriber:
+    def __init__(self,
+                 stt: STTBackend,
+                 sample_rate: int = SAMPLE_RATE,
+                 step_seconds: float = 1.0,
+                 window_seconds: float = 15.0,
+                 commit_margin_seconds: float = 1.0,
+                 on_partial: Optional[Callable[[str], None]] = None):
+        """
+        Incrementally transcribe a growing audio buffer.
+        
+        A background thread re-decodes the uncommitted tail of the buffer every
+        step_seconds of new audio. Leading segments that end well before the
+        tail and were decoded identically twice in a row are committed, so when
+        the utterance ends only the remaining tail has to be decoded again.
+        
+        Args:
+            stt: Loaded STT backend
+            sample_rate: Sample rate of the audio passed to add_audio
+            step_seconds: New audio required before the next partial decode
+            window_seconds: Maximum uncommitted audio decoded per pass
+            commit_margin_seconds: Segments ending within this distance of the
+                buffer end are never committed
+            on_partial: Called with the current hypothesis after each decode;
+                partial_position then holds the caller's position (see
+                add_audio) of the end of the audio it covers
+        """
+        self.stt = stt
+        self.sample_rate = sample_rate
+        # The internal buffer is kept at the model rate (audio is resampled on append)
+        self.step_samples = int(step_seconds * MODEL_SAMPLE_RATE)
+        self.window_samples = int(window_seconds * MODEL_SAMPLE_RATE)
+        self.commit_margin = commit_margin_seconds
+        self.on_partial = on_partial
+
+        self._chunks: List[np.ndarray] = []
+        self._n_samples = 0
+        # (buffered samples, caller's position) after each add_audio that gave one
+        self._positions: List[Tuple[int, int]] = []
+        self._lock = threading.Lock()
+        # Held for every decode so speculative decodes never overlap partial ones
+        self._decode_lock = threading.Lock()
+        self._new_audio = threading.Event()
+        self._running = False
+        self._thread = None
+
+        self._committed_samples = 0
+        self._committed_segments: List[Dict[str, Any]] = []
+        self._previous_segments: List[Dict[str, Any]] = []
+        self._language = None
+        self.partial_text = ""
+        self.partial_position: Optional[int] = None
+
+    def start(self) -> None:
+        """Start decoding partial hypotheses in the background."""
+        if self._thread is not None:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def add_audio(self, chunk: np.ndarray, position: Optional[int] = None) -> None:
+        """
+        Append captured audio (int16 or float32, mono) to the buffer.
+        
+        Args:
+            chunk: Audio samples
+            position: Caller's position of the end of the chunk (e.g. the
+                endpointer's processed sample count), reported back with
+                each partial that covers it
+        """
+        chunk = STTBackend.prepare_audio(chunk, self.sample_rate)
+        with self._lock:
+            self._chunks.append(chunk)
+            self._n_samples += len(chunk)
+            if position is not None:
+                self._positions.append((self._n_samples, position))
+        self._new_audio.set()
+
+    def _position_at(self, n_samples: int) -> Optional[int]:
+        """Caller's position of the last chunk ending at or before buffer sample n_samples."""
+        with self._lock:
+            i = bisect.bisect_right(self._positions, (n_samples, float("inf")))
+            return self._positions[i - 1][1] if i else None
+
+    def _snapshot(self, start: int) -> np.ndarray:
+        """Return the buffered audio from sample start onwards."""
+        with self._lock:
+            if len(self._chunks) > 1:
+                self._chunks = [np.concatenate(self._chunks)]
+            audio = self._chunks[0] if self._chunks else np.zeros(0, dtype=np.float32)
+        return audio[start:]
+
+    def _committed_text(self) -> str:
+        return " ".join(seg["text"].strip() for seg in self._committed_segments).strip()
+
+    def _run(self) -> None:
+        decoded_samples = 0
+        while self._running:
+            self._new_audio.wait(timeout=0.1)
+            self._new_audio.clear()
+            if not self._running:
+                break
+            if self._n_samples - decoded_samples < self.step_samples:
+                continue
+
+            decoded_samples = self._n_samples
+            try:
+                with self._decode_lock:
+                    self._decode_partial()
+            except Exception as e:
+                print(f"Error in streaming transcription: {e}")
+
+    def _decode_partial(self) -> None:
+        """Decode the uncommitted tail and commit segments that have stabilised."""
+        start = self._committed_samples
+        audio = self._snapshot(start)[:self.window_samples]
+        if len(audio) == 0:
+            return
+
+        result = self.stt.transcribe(audio, MODEL_SAMPLE_RATE, initial_prompt=self._committed_text() or None,
+                                     kind="partial")
+        self._language = result["language"]
+        segments = result["segments"]
+        window_end = len(audio) / MODEL_SAMPLE_RATE
+
+        # Commit leading segments that are stable across two decodes and far
+        # enough from the end of the window not to change with more audio
+        n_commit = 0
+        for i, seg in enumerate(segments[:-1]):
+            if seg["end"] > window_end - self.commit_margin:
+                break
+            if i >= len(self._previous_segments) or self._previous_segments[i]["text"] != seg["text"]:
+                break
+            n_commit = i + 1
+
+        # If the window is full, force progress so the tail stays bounded
+        if n_commit == 0 and len(audio) >= self.window_samples and len(segments) > 1:
+            n_commit = len(segments) - 1
+
+        offset = start / MODEL_SAMPLE_RATE
+        for seg in segments[:n_commit]:
+            self._committed_segments.append(self._shift_segment(seg, offset))
+        if n_commit:
+            self._committed_samples = start + int(segments[n_commit - 1]["end"] * MODEL_SAMPLE_RATE)
+        self._previous_segments = segments[n_commit:]
+
+        tail_text = " ".join(seg["text"].strip() for seg in segments[n_commit:])
+        self.partial_text = f"{self._committed_text()} {tail_text}".strip()
+        self.partial_position = self._position_at(start + len(audio))
+        if self.on_partial is not None:
+            self.on_partial(self.partial_text)
+
+    @staticmethod
+    def _shift_segment(segment: Dict[str, Any], offset: float) -> Dict[str, Any]:
+        segment = dict(segment)
+        segment["start"] += offset
+        segment["end"] += offset
+        return segment
+
+    def stop(self) -> None:
+        """Stop background decoding without producing a final transcript."""
+        self._running = False
+        self._new_audio.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def transcribe_buffered(self) -> Dict[str, Any]:
+        """
+        Decode everything buffered so far without stopping.
+        
+        Used for a speculative final transcript while the end of the
+        utterance is not yet confirmed; runs between partial decodes.
+        
+        Returns:
+            Same as finish()
+        """
+        with self._decode_lock:
+            return self._decode_final(kind="speculative")
+
+    def finish(self) -> Dict[str, Any]:
+        """
+        Stop background decoding and decode the remaining tail.
+        
+        Returns:
+            Dict with keys text, language and segments, like STTBackend.transcribe,
+            plus tail_seconds (audio re-decoded after the end of speech) and
+            final_decode_time (seconds spent on that decode)
+        """
+        self.stop()
+        with self._decode_lock:
+            return self._decode_final()
+
+    def _decode_final(self, kind: str = "final") -> Dict[str, Any]:
+        """Decode the uncommitted tail and join it with the committed segments."""
+        start_time = time.perf_counter()
+        tail = self._snapshot(self._committed_samples)
+        segments = list(self._committed_segments)
+        if len(tail) > 0:
+            result = self.stt.transcribe(tail, MODEL_SAMPLE_RATE, initial_prompt=self._committed_text() or None,
+                                         kind=kind)
+            self._language = result["language"]
+            offset = self._committed_samples / MODEL_SAMPLE_RATE
+            segments.extend(self._shift_segment(seg, offset) for seg in result["segments"])
+
+        return {
+            "text": " ".join(seg["text"].strip() for seg in segments).strip(),
+            "language": self._language,
+            "segments": segments,
+            "tail_seconds": len(tail) / MODEL_SAMPLE_RATE,
+            "final_decode_time": time.perf_counter() - start_time
+        }
@@ -1,18 +1,143 @@
-import whisper
+import time
+import numpy as np
+from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Union, List, Sequence
 
-from config.settings import WHISPER_MODEL, WHISPER_LANGUAGE, WHISPER_TASK
+from utils.metrics import metrics
+from config.settings import (
+    WHISPER_MODEL,
+    WHISPER_LANGUAGE,
+    WHISPER_TASK,
+    SAMPLE_RATE,
+    STT_BACKEND,
+    STT_COMPUTE_TYPE,
+    STT_CPU_THREADS
+)
+
+# Whisper models operate on 16 kHz mono audio
+MODEL_SAMPLE_RATE = 16000
+
+# Longest clip Whisper's encoder sees in one window
+MODEL_WINDOW_SECONDS = 30
+
+class STTBackend(ABC):
+    """
+    Interface shared by all speech-to-text engines.
+    
+    Every backend returns the same result dict from transcribe(): text,
+    language and segments, where each segment has at least id, start, end
+    and text.
+    """
+    model_name: str
+    language: str
+    task: str
+    # Set during warmup() so its cold-start inference stays out of the metrics
+    _warming_up = False
+
+    def warmup(self) -> None:
+        """Run a dummy inference so the first real request doesn't pay cold-start costs."""
+        self._warming_up = True
+        try:
+            self.transcribe(np.zeros(MODEL_SAMPLE_RATE, dtype=np.float32), MODEL_SAMPLE_RATE)
+        finally:
+            self._warming_up = False
+
+    @staticmethod
+    def prepare_audio(audio: np.ndarray, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+        """
+        Convert a PCM buffer into the mono float32 16 kHz array Whisper expects.
+        
+        Args:
+            audio: int16 or float32 samples, shape (n,) or (n, channels)
+            sample_rate: Sample rate of the input buffer
+            
+        Returns:
+            Contiguous float32 array in [-1, 1] at Whisper's sample rate
+        """
+        audio = np.asarray(audio)
+        if audio.ndim > 1:
+            audio = audio[:, 0] if audio.shape[1] == 1 else audio.mean(axis=1)
+
+        if audio.dtype == np.int16:
+            audio = audio.astype(np.float32) / 32768.0
+        elif audio.dtype != np.float32:
+            audio = audio.astype(np.float32)
+
+        target_rate = MODEL_SAMPLE_RATE
+        if sample_rate != target_rate and len(audio) > 0:
+            # Linear resampling is enough for speech recognition input
+            n_out = int(round(len(audio) * target_rate / sample_rate))
+            positions = np.linspace(0, len(audio) - 1, n_out)
+            audio = np.interp(positions, np.arange(len(audio)), audio).astype(np.float32)
+
+        return np.ascontiguousarray(audio)
+
+    @abstractmethod
+    def transcribe(self,
+                   audio: Union[str, np.ndarray],
+                   sample_rate: int = SAMPLE_RATE,
+                   initial_prompt: Optional[str] = None,
+                   kind: str = "final") -> Dict[str, Any]:
+        """
+        Transcribe audio to text.
+        
+        Args:
+            audio: Path to an audio file, or an in-memory int16/float32 buffer
+            sample_rate: Sample rate of an in-memory buffer (ignored for paths)
+            initial_prompt: Optional preceding text used as decoding context
+            kind: "final", or "partial"/"speculative" for decodes of audio that
+                will be decoded again; labels stt_latency, and only final
+                decodes count towards throughput
+            
+        Returns:
+            Dict with keys text, language and segments
+        """
+
+    def transcribe_batch(self,
+                         audios: Sequence[np.ndarray],
+                         sample_rates: Optional[Sequence[int]] = None) -> List[Dict[str, Any]]:
+        """
+        Transcribe several in-memory clips.
+        
+        The default runs them one by one; backends that can batch override it.
+        
+        Args:
+            audios: int16/float32 buffers
+            sample_rates: Sample rate per buffer (default: SAMPLE_RATE for all)
+            
+        Returns:
+            One result dict per input, in order
+        """
+        if sample_rates is None:
+            sample_rates = [SAMPLE_RATE] * len(audios)
+        return [self.transcribe(audio, sr) for audio, sr in zip(audios, sample_rates)]
+
+    def _record_metrics(self, wall_seconds: float, audio_seconds: Optional[float], kind: str = "final") -> None:
+        if self._warming_up:
+            return
+        metrics.observe("stt_latency", wall_seconds, model=self.model_name, kind=kind)
+        # Re-decoded audio would be counted more than once
+        if audio_seconds is not None and kind == "final":
+            metrics.record_throughput("stt", audio_seconds, wall_seconds, model=self.model_name)
+
+class WhisperSTT(STTBackend):
+    # transcribe()'s defaults: batched results past these are decoded again through it
+    COMPRESSION_RATIO_THRESHOLD = 2.4
+    LOGPROB_THRESHOLD = -1.0
 
-class WhisperSTT:
     def __init__(self, 
                  model_name: str = WHISPER_MODEL,
                  language: str = WHISPER_LANGUAGE,
                  task: str = WHISPER_TASK):
-        """Initialize Whisper STT with specified model and settings."""
+        """Initialize openai-whisper STT (fp32 on CPU) with specified model and settings."""
+        # Imported here so the faster-whisper backend doesn't need whisper or torch
+        import whisper
+
         try:
             print(f"Loading Whisper model: {model_name}")
             self.model = whisper.load_model(model_name)
+            self.model_name = model_name
             self.language = language
             self.task = task
             print("Whisper model loaded successfully!")
@@ -20,21 +145,50 @@ class WhisperSTT:
             print(f"Error loading Whisper model: {e}")
             raise
 
-    def transcribe(self, audio_path: str) -> Dict[str, Any]:
-        """Transcribe audio file to text."""
+    def transcribe(self,
+                   audio: Union[str, np.ndarray],
+                   sample_rate: int = SAMPLE_RATE,
+                   initial_prompt: Optional[str] = None,
+                   kind: str = "final") -> Dict[str, Any]:
+        """
+        Transcribe audio to text.
+        
+        Args:
+            audio: Path to an audio file, or an in-memory int16/float32 buffer.
+                Buffers are passed straight to the model without touching disk
+                or spawning ffmpeg.
+            sample_rate: Sample rate of an in-memory buffer (ignored for paths)
+            initial_prompt: Optional preceding text used as decoding context
+            kind: "final", or "partial"/"speculative" for decodes of audio that
+                will be decoded again; labels stt_latency, and only final
+                decodes count towards throughput
+            
+        Returns:
+            Dict with keys text, language and segments
+        """
         try:
-            # Verify audio file exists
-            if not Path(audio_path).exists():
-                raise FileNotFoundError(f"Audio file not found: {audio_path}")
+            start_time = time.perf_counter()
+            audio_seconds = None
+            if isinstance(audio, (str, Path)):
+                # Verify audio file exists
+                if not Path(audio).exists():
+                    raise FileNotFoundError(f"Audio file not found: {audio}")
+                audio_input = str(audio)
+            else:
+                audio_input = self.prepare_audio(audio, sample_rate)
+                audio_seconds = len(audio_input) / MODEL_SAMPLE_RATE
 
             # Transcribe with Whisper
             result = self.model.transcribe(
-                audio_path,
+                audio_input,
                 language=self.language,
                 task=self.task,
+                initial_prompt=initial_prompt,
                 fp16=False  # Force CPU mode
             )
 
+            self._record_metrics(time.perf_counter() - start_time, audio_seconds, kind)
+
             return {
                 "text": result["text"].strip(),
                 "language": result["language"],
@@ -43,4 +197,228 @@ class WhisperSTT:
 
         except Exception as e:
             print(f"Error in transcription: {e}")
-            raise 
\ No newline at end of file
+            raise
+
+    def transcribe_batch(self,
+                         audios: Sequence[np.ndarray],
+                         sample_rates: Optional[Sequence[int]] = None) -> List[Dict[str, Any]]:
+        """
+        Transcribe several in-memory clips with one batched encoder/decoder pass.
+        
+        Clips up to 30 s are padded to Whisper's window, stacked into one mel
+        batch and decoded together at temperature 0. Longer clips, batches of
+        one, and batched results that fail transcribe()'s compression-ratio or
+        average log-probability checks go through transcribe(), which has
+        the temperature fallback, no-speech detection and segment timestamps.
+        
+        Args:
+            audios: int16/float32 buffers
+            sample_rates: Sample rate per buffer (default: SAMPLE_RATE for all)
+            
+        Returns:
+            One result dict per input, in order, with keys text, language and
+            segments (a single segment spanning the clip for batched items)
+        """
+        if sample_rates is None:
+            sample_rates = [SAMPLE_RATE] * len(audios)
+        prepared = [self.prepare_audio(a, sr) for a, sr in zip(audios, sample_rates)]
+        results: List[Optional[Dict[str, Any]]] = [None] * len(prepared)
+
+        batch_indices = [
+            i for i, audio in enumerate(prepared)
+            if len(audio) <= MODEL_WINDOW_SECONDS * MODEL_SAMPLE_RATE
+        ]
+        if len(batch_indices) < 2:
+            # Nothing to share a pass with
+            batch_indices = []
+        for i in range(len(prepared)):
+            if i not in batch_indices:
+                results[i] = self.transcribe(prepared[i], MODEL_SAMPLE_RATE)
+
+        if batch_indices:
+            import torch
+            import whisper
+
+            try:
+                start_time = time.perf_counter()
+                mel = torch.stack([
+                    whisper.log_mel_spectrogram(
+                        whisper.pad_or_trim(torch.from_numpy(prepared[i])),
+                        n_mels=self.model.dims.n_mels
+                    )
+                    for i in batch_indices
+                ]).to(self.model.device)
+                options = whisper.DecodingOptions(
+                    language=self.language,
+                    task=self.task,
+                    without_timestamps=True,
+                    fp16=False  # Force CPU mode
+                )
+                decoded = whisper.decode(self.model, mel, options)
+
+                wall_seconds = time.perf_counter() - start_time
+                audio_seconds = sum(len(prepared[i]) for i in batch_indices) / MODEL_SAMPLE_RATE
+                metrics.observe("stt_batch_size", len(batch_indices), model=self.model_name)
+                metrics.observe("stt_latency", wall_seconds, model=self.model_name, kind="final")
+                metrics.record_throughput("stt", audio_seconds, wall_seconds, model=self.model_name)
+
+                for i, result in zip(batch_indices, decoded):
+                    if (result.compression_ratio > self.COMPRESSION_RATIO_THRESHOLD
+                            or result.avg_logprob < self.LOGPROB_THRESHOLD):
+                        # Likely repetition, silence or a poor greedy decode
+                        metrics.increment("stt_batch_fallbacks", model=self.model_name)
+                        results[i] = self.transcribe(prepared[i], MODEL_SAMPLE_RATE)
+                        continue
+                    text = result.text.strip()
+                    results[i] = {
+                        "text": text,
+                        "language": result.language,
+                        "segments": [{
+                            "id": 0,
+                            "start": 0.0,
+                            "end": len(prepared[i]) / MODEL_SAMPLE_RATE,
+                            "text": text,
+                            "avg_logprob": result.avg_logprob,
+                            "no_speech_prob": result.no_speech_prob
+                        }]
+                    }
+            except Exception as e:
+                print(f"Error in batched transcription: {e}")
+                raise
+
+        return results
+
+class FasterWhisperSTT(STTBackend):
+    def __init__(self,
+                 model_name: str = WHISPER_MODEL,
+                 language: str = WHISPER_LANGUAGE,
+                 task: str = WHISPER_TASK,
+                 compute_type: str = STT_COMPUTE_TYPE,
+                 cpu_threads: int = STT_CPU_THREADS):
+        """
+        Initialize a CTranslate2 (faster-whisper) STT engine.
+        
+        Weights are quantized at load time, int8 by default, which runs
+        several times faster than fp32 openai-whisper on CPU with a small
+        accuracy cost.
+        
+        Args:
+            model_name: Whisper model size or path to a converted CTranslate2 model
+            language: Language code for transcription
+            task: "transcribe" or "translate"
+            compute_type: CTranslate2 compute type, e.g. "int8", "int8_float32", "float32"
+            cpu_threads: Intra-op threads (0 lets CTranslate2 decide)
+        """
+        try:
+            # Optional dependency, only needed when this backend is selected
+            from faster_whisper import WhisperModel
+        except ImportError as e:
+            raise ImportError("The faster-whisper backend requires `pip install faster-whisper`") from e
+
+        try:
+            print(f"Loading faster-whisper model: {model_name} ({compute_type})")
+            self.model = WhisperModel(
+                model_name,
+                device="cpu",
+                compute_type=compute_type,
+                cpu_threads=cpu_threads
+            )
+            self.model_name = model_name
+            self.language = language
+            self.task = task
+            self.compute_type = compute_type
+            print("faster-whisper model loaded successfully!")
+        except Exception as e:
+            print(f"Error loading faster-whisper model: {e}")
+            raise
+
+    def transcribe(self,
+                   audio: Union[str, np.ndarray],
+                   sample_rate: int = SAMPLE_RATE,
+                   initial_prompt: Optional[str] = None,
+                   kind: str = "final") -> Dict[str, Any]:
+        """
+        Transcribe audio to text.
+        
+        Args:
+            audio: Path to an audio file, or an in-memory int16/float32 buffer
+            sample_rate: Sample rate of an in-memory buffer (ignored for paths)
+            initial_prompt: Optional preceding text used as decoding context
+            kind: "final", or "partial"/"speculative" for decodes of audio that
+                will be decoded again; labels stt_latency, and only final
+                decodes count towards throughput
+            
+        Returns:
+            Dict with keys text, language and segments, shaped like WhisperSTT's
+        """
+        try:
+            start_time = time.perf_counter()
+            audio_seconds = None
+            if isinstance(audio, (str, Path)):
+                if not Path(audio).exists():
+                    raise FileNotFoundError(f"Audio file not found: {audio}")
+                audio_input = str(audio)
+            else:
+                audio_input = self.prepare_audio(audio, sample_rate)
+                audio_seconds = len(audio_input) / MODEL_SAMPLE_RATE
+
+            # Segments are generated lazily; decoding happens while iterating
+            segments_iter, info = self.model.transcribe(
+                audio_input,
+                language=self.language,
+                task=self.task,
+                initial_prompt=initial_prompt
+            )
+            segments = [
+                {
+                    "id": i,
+                    "seek": seg.seek,
+                    "start": seg.start,
+                    "end": seg.end,
+                    "text": seg.text,
+                    "tokens": list(seg.tokens),
+                    "temperature": seg.temperature,
+                    "avg_logprob": seg.avg_logprob,
+                    "compression_ratio": seg.compression_ratio,
+                    "no_speech_prob": seg.no_speech_prob
+                }
+                for i, seg in enumerate(segments_iter)
+            ]
+
+            self._record_metrics(time.perf_counter() - start_time, audio_seconds, kind)
+
+            return {
+                "text": "".join(seg["text"] for seg in segments).strip(),
+                "language": info.language,
+                "segments": segments
+            }
+
+        except Exception as e:
+            print(f"Error in transcription: {e}")
+            raise
+
+# STT_BACKEND values and the engines they select
+STT_BACKENDS = {
+    "whisper": WhisperSTT,
+    "faster-whisper": FasterWhisperSTT
+}
+
+def create_stt_backend(backend: str = STT_BACKEND,
+                       model_name: str = WHISPER_MODEL,
+                       language: str = WHISPER_LANGUAGE,
+                       task: str = WHISPER_TASK) -> STTBackend:
+    """
+    Build the STT engine named by backend.
+    
+    Args:
+        backend: One of STT_BACKENDS ("whisper", "faster-whisper")
+        model_name: Whisper model size
+        language: Language code for transcription
+        task: "transcribe" or "translate"
+        
+    Returns:
+        Loaded STT backend
+    """
+    if backend not in STT_BACKENDS:
+        raise ValueError(f"Unknown STT backend {backend!r}; expected one of {sorted(STT_BACKENDS)}")
+    return STT_BACKENDS[backend](model_name=model_name, language=language, task=task)
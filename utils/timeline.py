@@ -0,0 +1,57 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, List
+
+class StartupTimeline:
+    def __init__(self):
+        """Record when each component's startup phases ran, relative to creation."""
+        self.t0 = time.perf_counter()
+        self.events: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, component: str, phase: str):
+        """
+        Time a startup phase.
+        
+        Args:
+            component: Component name (e.g. "stt")
+            phase: Phase name (e.g. "load", "warmup")
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            with self._lock:
+                self.events.append({
+                    "component": component,
+                    "phase": phase,
+                    "start": start - self.t0,
+                    "end": end - self.t0,
+                    "duration": end - start,
+                    "thread": threading.current_thread().name
+                })
+
+    def report(self) -> List[Dict[str, Any]]:
+        """Recorded phases ordered by start time."""
+        with self._lock:
+            return sorted(self.events, key=lambda e: e["start"])
+
+    def format(self, width: int = 40) -> str:
+        """Render the timeline as a text table with a bar per phase."""
+        events = self.report()
+        if not events:
+            return "No startup phases recorded"
+        total = max(e["end"] for e in events) or 1.0
+        lines = [f"{'component':<12} {'phase':<10} {'start':>7} {'dur':>7}  timeline"]
+        for e in events:
+            offset = int(e["start"] / total * width)
+            length = max(1, int(e["duration"] / total * width))
+            bar = " " * offset + "#" * length
+            lines.append(
+                f"{e['component']:<12} {e['phase']:<10} {e['start']:>6.2f}s {e['duration']:>6.2f}s  |{bar:<{width}}|"
+            )
+        lines.append(f"Total: {total:.2f}s")
+        return "\n".join(lines)
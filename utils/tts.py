@@ -1,29 +1,268 @@
-from TTS.api import TTS
+import re
+import json
+import time
+import wave
+import numpy as np
+from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Iterator, List, Tuple, Union
 
-from config.settings import TTS_MODEL, TTS_SPEAKER
+from utils.metrics import metrics
+from config.settings import TTS_MODEL, TTS_SPEAKER, TTS_CPU_THREADS
 
-class CoquiTTS:
+# Sentence ends, then clause breaks for sentences that are still too long
+_SENTENCE_RE = re.compile(r'(?<=[.!?])\s+')
+_CLAUSE_RE = re.compile(r'(?<=[,;:])\s+')
+
+def split_sentences(text: str, max_chars: int = 120) -> List[str]:
+    """
+    Split text into sentence (or clause) sized pieces for incremental synthesis.
+    
+    Args:
+        text: Text to split
+        max_chars: Sentences longer than this are split further at clause breaks
+        
+    Returns:
+        List of non-empty text pieces in order
+    """
+    pieces = []
+    for sentence in _SENTENCE_RE.split(text.strip()):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        if len(sentence) <= max_chars:
+            pieces.append(sentence)
+            continue
+
+        # Merge clauses back together up to max_chars so chunks don't get too short
+        current = ""
+        for clause in _CLAUSE_RE.split(sentence):
+            if current and len(current) + len(clause) + 1 > max_chars:
+                pieces.append(current)
+                current = clause
+            else:
+                current = f"{current} {clause}" if current else clause
+        if current:
+            pieces.append(current)
+    return pieces
+
+class TTSBackend(ABC):
+    """
+    Interface shared by all text-to-speech engines.
+    
+    Backends implement _generate() and sample_rate; synthesis to arrays,
+    files and sentence streams, warm-up and metrics are shared.
+    """
+    model_name: str
+    speaker_id: Optional[str]
+
+    @property
+    @abstractmethod
+    def sample_rate(self) -> int:
+        """Sample rate of the synthesized audio."""
+
+    @abstractmethod
+    def _generate(self, text: str) -> np.ndarray:
+        """Synthesize text to float32 samples in [-1, 1]."""
+
+    def warmup(self) -> None:
+        """Run a dummy synthesis so the first real request doesn't pay cold-start costs."""
+        # Calls _generate() directly so the cold-start time stays out of the latency metrics
+        self._generate("Hello.")
+
+    def synthesize(self, text: str, output_path: Union[str, Path]) -> None:
+        """Convert text to speech and save to a 16-bit WAV file."""
+        wav, sample_rate = self.synthesize_to_array(text)
+        with wave.open(str(output_path), "wb") as wf:
+            wf.setnchannels(1)
+            wf.setsampwidth(2)
+            wf.setframerate(sample_rate)
+            wf.writeframes((np.clip(wav, -1.0, 1.0) * 32767).astype(np.int16).tobytes())
+
+    def synthesize_to_array(self, text: str) -> Tuple[np.ndarray, int]:
+        """
+        Convert text to speech in memory.
+        
+        Args:
+            text: Text to synthesize
+            
+        Returns:
+            Tuple of (float32 audio samples, sample rate)
+        """
+        try:
+            start_time = time.perf_counter()
+            wav = np.asarray(self._generate(text), dtype=np.float32)
+            wall_seconds = time.perf_counter() - start_time
+            metrics.observe("tts_latency", wall_seconds, model=self.model_name)
+            metrics.observe("tts_chars_per_second", len(text) / wall_seconds, model=self.model_name)
+            metrics.record_throughput("tts", len(wav) / self.sample_rate, wall_seconds, model=self.model_name)
+            return wav, self.sample_rate
+        except Exception as e:
+            print(f"Error in TTS synthesis: {e}")
+            raise
+
+    def synthesize_stream(self, text: str, max_chars: int = 120) -> Iterator[Tuple[np.ndarray, int]]:
+        """
+        Synthesize text sentence by sentence, yielding audio as each piece is ready.
+        
+        Args:
+            text: Text to synthesize
+            max_chars: Maximum characters per synthesized piece
+            
+        Yields:
+            Tuples of (float32 audio samples, sample rate)
+        """
+        for piece in split_sentences(text, max_chars=max_chars):
+            yield self.synthesize_to_array(piece)
+
+class CoquiTTS(TTSBackend):
     def __init__(self, model_name: str = TTS_MODEL, speaker_id: str = TTS_SPEAKER):
         """Initialize Coqui TTS with specified model."""
+        # Imported here so the lightweight backends don't pull in torch
+        from TTS.api import TTS
+
         try:
             print(f"Initializing TTS with model: {model_name}")
             self.tts = TTS(model_name=model_name)
+            self.model_name = model_name
             self.speaker_id = speaker_id
             print("TTS initialized successfully!")
         except Exception as e:
             print(f"Error initializing TTS: {e}")
             raise
 
-    def synthesize(self, text: str, output_path: str) -> None:
+    @property
+    def sample_rate(self) -> int:
+        """Sample rate of the synthesized audio."""
+        return self.tts.synthesizer.output_sample_rate
+
+    def synthesize(self, text: str, output_path: Union[str, Path]) -> None:
         """Convert text to speech and save to file."""
         try:
             self.tts.tts_to_file(
                 text=text,
-                file_path=output_path,
+                file_path=str(output_path),
                 speaker=self.speaker_id
             )
         except Exception as e:
             print(f"Error in TTS synthesis: {e}")
-            raise 
\ No newline at end of file
+            raise
+
+    def _generate(self, text: str) -> np.ndarray:
+        return np.asarray(self.tts.tts(text=text, speaker=self.speaker_id), dtype=np.float32)
+
+class PiperTTS(TTSBackend):
+    def __init__(self,
+                 model_name: str,
+                 speaker_id: Optional[str] = TTS_SPEAKER,
+                 cpu_threads: int = TTS_CPU_THREADS):
+        """
+        Initialize a Piper voice running on ONNX Runtime (CPU).
+        
+        Piper voices are small VITS models exported to ONNX, so synthesis
+        needs neither torch nor the Coqui stack. The voice's JSON config
+        (<model>.onnx.json) must sit next to the model file.
+        
+        Args:
+            model_name: Path to a Piper .onnx voice
+            speaker_id: Speaker name or numeric ID for multi-speaker voices;
+                ignored for single-speaker voices or unknown names
+            cpu_threads: ONNX Runtime intra-op threads (0 lets it decide)
+        """
+        try:
+            # Optional dependencies, only needed when a Piper voice is selected
+            import onnxruntime
+            from piper_phonemize import phonemize_espeak
+        except ImportError as e:
+            raise ImportError("Piper voices require `pip install onnxruntime piper-phonemize`") from e
+
+        try:
+            print(f"Loading Piper voice: {model_name}")
+            model_path = Path(model_name)
+            with open(f"{model_path}.json", encoding="utf-8") as f:
+                self.config = json.load(f)
+
+            options = onnxruntime.SessionOptions()
+            options.intra_op_num_threads = cpu_threads
+            self.session = onnxruntime.InferenceSession(
+                str(model_path),
+                sess_options=options,
+                providers=["CPUExecutionProvider"]
+            )
+            self._phonemize = phonemize_espeak
+            self.model_name = model_name
+            self.speaker_id = speaker_id
+            self._sid = self._resolve_speaker(speaker_id)
+            print("Piper voice loaded successfully!")
+        except Exception as e:
+            print(f"Error loading Piper voice: {e}")
+            raise
+
+    def _resolve_speaker(self, speaker_id: Optional[str]) -> Optional[int]:
+        """Map a speaker name or ID onto the voice's numeric speaker ID."""
+        if self.config.get("num_speakers", 1) <= 1:
+            return None
+        speaker_map = self.config.get("speaker_id_map", {})
+        if speaker_id in speaker_map:
+            return speaker_map[speaker_id]
+        if speaker_id is not None and str(speaker_id).isdigit():
+            return int(speaker_id)
+        return 0
+
+    @property
+    def sample_rate(self) -> int:
+        """Sample rate of the synthesized audio."""
+        return self.config["audio"]["sample_rate"]
+
+    def _phoneme_ids(self, phonemes: List[str]) -> List[int]:
+        """Encode phonemes as Piper IDs: BOS, each phoneme followed by PAD, EOS."""
+        id_map = self.config["phoneme_id_map"]
+        ids = [*id_map["^"], *id_map["_"]]
+        for phoneme in phonemes:
+            if phoneme in id_map:
+                ids.extend(id_map[phoneme])
+                ids.extend(id_map["_"])
+        ids.extend(id_map["$"])
+        return ids
+
+    def _generate(self, text: str) -> np.ndarray:
+        inference = self.config.get("inference", {})
+        scales = np.array([
+            inference.get("noise_scale", 0.667),
+            inference.get("length_scale", 1.0),
+            inference.get("noise_w", 0.8)
+        ], dtype=np.float32)
+
+        pieces = []
+        for phonemes in self._phonemize(text, self.config["espeak"]["voice"]):
+            ids = np.array([self._phoneme_ids(phonemes)], dtype=np.int64)
+            inputs = {
+                "input": ids,
+                "input_lengths": np.array([ids.shape[1]], dtype=np.int64),
+                "scales": scales
+            }
+            if self._sid is not None:
+                inputs["sid"] = np.array([self._sid], dtype=np.int64)
+            pieces.append(self.session.run(None, inputs)[0].reshape(-1))
+
+        if not pieces:
+            return np.zeros(0, dtype=np.float32)
+        return np.clip(np.concatenate(pieces), -1.0, 1.0).astype(np.float32)
+
+def create_tts_backend(model_name: str = TTS_MODEL, speaker_id: Optional[str] = TTS_SPEAKER) -> TTSBackend:
+    """
+    Build the TTS engine for model_name.
+    
+    Paths to .onnx files load a Piper voice on ONNX Runtime; anything else
+    is treated as a Coqui model name.
+    
+    Args:
+        model_name: Coqui model name (e.g. "tts_models/en/vctk/vits") or Piper .onnx path
+        speaker_id: Speaker for multi-speaker models
+        
+    Returns:
+        Loaded TTS backend
+    """
+    if str(model_name).endswith(".onnx"):
+        return PiperTTS(model_name=model_name, speaker_id=speaker_id)
+    return CoquiTTS(model_name=model_name, speaker_id=speaker_id)
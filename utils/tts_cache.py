@@ -0,0 +1,191 @@
+import hashlib
+import os
+import threading
+import numpy as np
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Tuple, Iterator, Iterable, Dict, Any, Union
+
+from utils.tts import TTSBackend, split_sentences
+from utils.metrics import metrics
+
+class TTSCache:
+    def __init__(self,
+                 cache_dir: Optional[Union[str, Path]] = None,
+                 max_memory_bytes: int = 64 * 1024 * 1024):
+        """
+        Two-tier cache of synthesized audio keyed by (text, model, speaker).
+        
+        Args:
+            cache_dir: Directory for the on-disk tier (None disables it)
+            max_memory_bytes: Byte budget of the in-memory LRU tier
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_memory_bytes = max_memory_bytes
+
+        self._memory: "OrderedDict[str, Tuple[np.ndarray, int]]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits_memory = 0
+        self.hits_disk = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(text: str, model: str, speaker: Optional[str]) -> str:
+        """Stable cache key for a synthesis request."""
+        raw = "\x00".join([model or "", speaker or "", text.strip()])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _disk_path(self, key: str) -> Optional[Path]:
+        if self.cache_dir is None:
+            return None
+        return self.cache_dir / f"{key}.npz"
+
+    def _remember(self, key: str, audio: np.ndarray, sample_rate: int) -> None:
+        """Insert into the memory tier and evict least recently used entries over budget."""
+        if audio.nbytes > self.max_memory_bytes:
+            return
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return
+            self._memory[key] = (audio, sample_rate)
+            self._memory_bytes += audio.nbytes
+            while self._memory_bytes > self.max_memory_bytes:
+                _, (evicted, _) = self._memory.popitem(last=False)
+                self._memory_bytes -= evicted.nbytes
+
+    def get(self, text: str, model: str, speaker: Optional[str]) -> Optional[Tuple[np.ndarray, int]]:
+        """
+        Look up synthesized audio.
+        
+        Returns:
+            Tuple of (float32 audio, sample rate), or None on a miss
+        """
+        key = self.make_key(text, model, speaker)
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.hits_memory += 1
+                metrics.increment("tts_cache", tier="memory")
+                return entry
+
+        path = self._disk_path(key)
+        if path is not None and path.exists():
+            try:
+                with np.load(path) as data:
+                    audio = data["audio"]
+                    audio.setflags(write=False)
+                    sample_rate = int(data["sample_rate"])
+            except Exception as e:
+                print(f"Discarding unreadable TTS cache entry {path}: {e}")
+                path.unlink(missing_ok=True)
+            else:
+                self._remember(key, audio, sample_rate)
+                self.hits_disk += 1
+                metrics.increment("tts_cache", tier="disk")
+                return audio, sample_rate
+
+        self.misses += 1
+        metrics.increment("tts_cache", tier="miss")
+        return None
+
+    def put(self, text: str, model: str, speaker: Optional[str], audio: np.ndarray, sample_rate: int) -> None:
+        """Store synthesized audio in both tiers."""
+        key = self.make_key(text, model, speaker)
+        audio = np.asarray(audio, dtype=np.float32)
+        audio.setflags(write=False)
+        self._remember(key, audio, sample_rate)
+
+        path = self._disk_path(key)
+        if path is not None and not path.exists():
+            # Write to a temp file and rename so readers never see partial entries
+            tmp_path = path.with_name(f"{path.stem}.{os.getpid()}.{threading.get_ident()}.tmp.npz")
+            np.savez(tmp_path, audio=audio, sample_rate=np.int32(sample_rate))
+            os.replace(tmp_path, path)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and memory tier usage."""
+        return {
+            "hits_memory": self.hits_memory,
+            "hits_disk": self.hits_disk,
+            "misses": self.misses,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_bytes
+        }
+
+class CachedTTS:
+    def __init__(self, engine: TTSBackend, cache: TTSCache):
+        """
+        Wrap a TTS engine so sentence pieces are served from a TTSCache.
+        
+        Exposes the same synthesis API as the wrapped engine. Caching is done
+        per sentence piece, so repeated sentences hit the cache even inside
+        otherwise dynamic responses.
+        
+        Args:
+            engine: TTS backend (Coqui, Piper, ...)
+            cache: Cache to read from and populate
+        """
+        self.engine = engine
+        self.cache = cache
+
+    @property
+    def model_name(self) -> str:
+        return self.engine.model_name
+
+    @property
+    def speaker_id(self) -> Optional[str]:
+        return self.engine.speaker_id
+
+    @property
+    def sample_rate(self) -> int:
+        return self.engine.sample_rate
+
+    def warmup(self) -> None:
+        """Warm up the wrapped engine (bypasses the cache)."""
+        self.engine.warmup()
+
+    def synthesize(self, text: str, output_path: str) -> None:
+        """Convert text to speech and save to file (not cached)."""
+        self.engine.synthesize(text, output_path)
+
+    def _synthesize_piece(self, piece: str) -> Tuple[np.ndarray, int]:
+        cached = self.cache.get(piece, self.model_name, self.speaker_id)
+        if cached is not None:
+            return cached
+        audio, sample_rate = self.engine.synthesize_to_array(piece)
+        self.cache.put(piece, self.model_name, self.speaker_id, audio, sample_rate)
+        return audio, sample_rate
+
+    def synthesize_to_array(self, text: str) -> Tuple[np.ndarray, int]:
+        """Convert text to speech in memory, using cached pieces where possible."""
+        chunks = list(self.synthesize_stream(text))
+        if not chunks:
+            return np.zeros(0, dtype=np.float32), self.sample_rate
+        return np.concatenate([audio for audio, _ in chunks]), chunks[0][1]
+
+    def synthesize_stream(self, text: str, max_chars: int = 120) -> Iterator[Tuple[np.ndarray, int]]:
+        """Yield audio per sentence piece; cached pieces are yielded without synthesis."""
+        for piece in split_sentences(text, max_chars=max_chars):
+            yield self._synthesize_piece(piece)
+
+    def precompute(self, texts: Iterable[str]) -> int:
+        """
+        Render texts into the cache ahead of time.
+        
+        Args:
+            texts: Static responses to pre-render
+            
+        Returns:
+            Number of pieces that had to be synthesized
+        """
+        misses_before = self.cache.misses
+        for text in texts:
+            for piece in split_sentences(text):
+                self._synthesize_piece(piece)
+        return self.cache.misses - misses_before
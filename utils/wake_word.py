@@ -1,64 +1,404 @@
 import openwakeword
 import numpy as np
-import sounddevice as sd
 import webrtcvad
-from typing import Optional, Tuple, List
+from typing import Optional, Tuple, List, Callable, Dict, Any
+from collections import deque
+import asyncio
 import threading
 import queue
 import time
 import wave
 import io
 
+from utils.framing import Reframer, vad_frame_size, WAKE_WORD_FRAME_SIZE, Int16Converter, BufferPool
+from utils.audio_device import AudioDevice, SoundDevice
+from utils.capture import CaptureService
+from utils.metrics import metrics
+
+# openWakeWord model used for the "hey jarvis" wake phrase
+WAKE_WORD_MODEL = "hey_jarvis"
+
+def load_wake_word_model() -> openwakeword.Model:
+    """Load a fresh openWakeWord model instance for the wake phrase."""
+    return openwakeword.Model(wakeword_models=[WAKE_WORD_MODEL])
+
+class WakeWordModelPool:
+    def __init__(self, max_models: int = 4):
+        """Share a few openWakeWord models among many mostly idle streams.
+        
+        Streams only hold a model while their VAD gate is open, so the number
+        of models bounds concurrent speech, not concurrent connections.
+        
+        Args:
+            max_models: Maximum number of model instances to create
+        """
+        self.max_models = max_models
+        self._free: List[openwakeword.Model] = []
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> Optional[openwakeword.Model]:
+        """Take a model, creating one if under the limit; None if all are busy."""
+        with self._lock:
+            if self._free:
+                return self._free.pop()
+            if self._created >= self.max_models:
+                return None
+            self._created += 1
+        return load_wake_word_model()
+
+    def release(self, model: openwakeword.Model) -> None:
+        """Return a model to the pool."""
+        with self._lock:
+            self._free.append(model)
+
+class WakeWordStream:
+    def __init__(self,
+                 acquire_model: Callable[[], Optional[openwakeword.Model]],
+                 release_model: Optional[Callable[[openwakeword.Model], None]] = None,
+                 sample_rate: int = 16000,
+                 vad_frame_ms: int = 30,
+                 vad_mode: int = 3,
+                 confidence_threshold: float = 0.5,
+                 vad_gate: bool = True,
+                 vad_hangover_ms: int = 1500,
+                 preroll_ms: int = 1280,
+                 track_costs: bool = True):
+        """Per-stream framing, VAD gating and model state for wake word detection.
+        
+        The stream is re-blocked into VAD frames of vad_frame_ms and,
+        independently, into contiguous 1280-sample frames for the wake word
+        model. VAD only decides whether model frames are evaluated; when the
+        gate opens after silence, a model is acquired, reset and primed with
+        the buffered pre-roll frames so its streaming features stay contiguous.
+        The model is released again when the gate closes.
+        
+        Args:
+            acquire_model: Returns a model to use, or None if none is available
+            release_model: Called with the model when the gate closes
+            sample_rate: Audio sample rate
+            vad_frame_ms: VAD frame duration, one of 10, 20 or 30 ms
+            vad_mode: VAD aggressiveness mode, 0-3
+            confidence_threshold: Confidence threshold for wake word detection
+            vad_gate: Skip model frames while VAD hears no speech
+            vad_hangover_ms: How long the gate stays open after the last speech frame
+            preroll_ms: Audio replayed into the model when the gate opens
+            track_costs: Keep per-frame cost samples for get_frame_cost_report()
+        """
+        self.acquire_model = acquire_model
+        self.release_model = release_model
+        self.sample_rate = sample_rate
+        self.confidence_threshold = confidence_threshold
+        
+        self.vad = webrtcvad.Vad(vad_mode)
+        self.vad_gate = vad_gate
+        self.vad_hangover_samples = int(sample_rate * vad_hangover_ms / 1000)
+        
+        # Re-block the stream into the frame sizes each consumer needs
+        self.vad_framer = Reframer(vad_frame_size(sample_rate, vad_frame_ms))
+        self.model_framer = Reframer(WAKE_WORD_FRAME_SIZE)
+        self.preroll = deque(maxlen=max(1, preroll_ms * sample_rate // 1000 // WAKE_WORD_FRAME_SIZE))
+        self.model: Optional[openwakeword.Model] = None
+        self.peak_score = 0.0
+        self._samples_seen = 0
+        self._last_speech_sample = None
+        
+        # Per-frame cost measurements: (wall seconds, thread CPU seconds)
+        self.frame_costs = {
+            "vad": deque(maxlen=10000),
+            "model": deque(maxlen=10000)
+        } if track_costs else None
+        self.cpu_seconds_total = 0.0
+        self.audio_seconds_total = 0.0
+        self.model_frames_total = 0
+        self.model_frames_skipped = 0
+
+    def _timed(self, consumer: str, fn: Callable, *args):
+        """Run fn and record its wall and CPU cost under consumer."""
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        result = fn(*args)
+        cpu = time.thread_time() - cpu_start
+        if self.frame_costs is not None:
+            self.frame_costs[consumer].append((time.perf_counter() - wall_start, cpu))
+        self.cpu_seconds_total += cpu
+        return result
+
+    def _release(self) -> None:
+        if self.model is not None and self.release_model is not None:
+            self.release_model(self.model)
+        self.model = None
+
+    def reset(self) -> None:
+        """Reset framing and gating state and give back any held model."""
+        self.vad_framer.reset()
+        self.model_framer.reset()
+        self.preroll.clear()
+        self.peak_score = 0.0
+        self._samples_seen = 0
+        self._last_speech_sample = None
+        self._release()
+
+    def process(self, audio_chunk: np.ndarray) -> Optional[float]:
+        """Feed a chunk of int16 audio of any size through VAD and the wake word model.
+        
+        Args:
+            audio_chunk: int16 mono samples
+            
+        Returns:
+            Model score if the wake word was detected in this chunk, else None
+        """
+        audio_chunk = np.asarray(audio_chunk, dtype=np.int16).reshape(-1)
+        self.audio_seconds_total += len(audio_chunk) / self.sample_rate
+        
+        # VAD on correctly sized frames
+        for frame in self.vad_framer.push(audio_chunk):
+            self._samples_seen += len(frame)
+            is_speech = self._timed("vad", self.vad.is_speech, frame.tobytes(), self.sample_rate)
+            if is_speech:
+                self._last_speech_sample = self._samples_seen
+        
+        # Wake word model on contiguous 80 ms frames
+        for frame in self.model_framer.push(audio_chunk):
+            self.model_frames_total += 1
+            gate_open = (
+                not self.vad_gate
+                or (self._last_speech_sample is not None
+                    and self._samples_seen - self._last_speech_sample <= self.vad_hangover_samples)
+            )
+            
+            frames = [frame]
+            if gate_open and self.model is None:
+                self.model = self.acquire_model()
+                if self.model is not None:
+                    # Restart the model's streaming buffers on contiguous audio
+                    self.model.reset()
+                    frames = list(self.preroll) + frames
+                    self.preroll.clear()
+            
+            if not gate_open or self.model is None:
+                # Keep recent frames so the model can be primed when speech starts
+                self._release()
+                self.preroll.append(frame)
+                self.model_frames_skipped += 1
+                continue
+            
+            for model_frame in frames:
+                predictions = self._timed("model", self.model.predict, model_frame)
+                score = predictions[WAKE_WORD_MODEL]
+                self.peak_score = max(self.peak_score, float(score))
+                if score > self.confidence_threshold:
+                    return float(score)
+        
+        return None
+
+    def get_frame_cost_report(self) -> Dict[str, Any]:
+        """Report the per-frame cost of each consumer in the wake word pipeline.
+        
+        Returns:
+            Dict keyed by consumer ("vad", "model") with frame count and mean/p95
+            wall and CPU milliseconds per frame, plus the fraction of model
+            frames skipped by the VAD gate and CPU milliseconds per second of audio
+        """
+        report: Dict[str, Any] = {}
+        for consumer, costs in (self.frame_costs or {}).items():
+            if not costs:
+                report[consumer] = {"frames": 0}
+                continue
+            wall = np.array([c[0] for c in costs]) * 1000
+            cpu = np.array([c[1] for c in costs]) * 1000
+            report[consumer] = {
+                "frames": len(costs),
+                "wall_ms_mean": float(wall.mean()),
+                "wall_ms_p95": float(np.percentile(wall, 95)),
+                "cpu_ms_mean": float(cpu.mean()),
+                "cpu_ms_p95": float(np.percentile(cpu, 95))
+            }
+        report["model_frames_skipped"] = (
+            self.model_frames_skipped / self.model_frames_total if self.model_frames_total else 0.0
+        )
+        report["cpu_ms_per_audio_second"] = (
+            self.cpu_seconds_total * 1000 / self.audio_seconds_total
+            if self.audio_seconds_total else 0.0
+        )
+        return report
+
 class WakeWordDetector:
     def __init__(self, 
                  wake_word: str = "jarvis",
                  sample_rate: int = 16000,
                  chunk_duration_ms: int = 30,
                  vad_mode: int = 3,
-                 confidence_threshold: float = 0.5):
+                 confidence_threshold: float = 0.5,
+                 vad_gate: bool = True,
+                 vad_hangover_ms: int = 1500,
+                 preroll_ms: int = 1280,
+                 capture: Optional[CaptureService] = None,
+                 audio_device: Optional[AudioDevice] = None):
         """Initialize wake word detector with voice activity detection.
         
+        Framing, VAD gating and model priming are handled by a WakeWordStream
+        that always uses this detector's own model.
+        
         Args:
             wake_word: Wake word to detect (default: "jarvis")
             sample_rate: Audio sample rate (default: 16000)
-            chunk_duration_ms: Duration of each audio chunk in ms (default: 30)
+            chunk_duration_ms: Duration of each audio chunk and VAD frame in ms,
+                one of 10, 20 or 30 (default: 30)
             vad_mode: VAD aggressiveness mode, 0-3 (default: 3, most aggressive)
             confidence_threshold: Confidence threshold for wake word detection (default: 0.5)
+            vad_gate: Skip model frames while VAD hears no speech (default: True)
+            vad_hangover_ms: How long the gate stays open after the last speech frame (default: 1500)
+            preroll_ms: Audio replayed into the model when the gate opens (default: 1280)
+            capture: Shared capture service to read from. If None, the detector
+                opens its own input stream while listening.
+            audio_device: Device for the detector's own input stream and
+                feedback beep (default: the capture's device, else sounddevice)
         """
         # Initialize wake word model
-        self.model = openwakeword.Model(wakeword_models=["hey_jarvis"])
-        self.wake_word = "hey_jarvis"
+        self.model = load_wake_word_model()
+        self.wake_word = WAKE_WORD_MODEL
         self.confidence_threshold = confidence_threshold
         
         # Audio settings
         self.sample_rate = sample_rate
         self.chunk_duration_ms = chunk_duration_ms
-        self.chunk_size = int(sample_rate * chunk_duration_ms / 1000)
+        self.chunk_size = vad_frame_size(sample_rate, chunk_duration_ms)
         
-        # Initialize VAD
-        self.vad = webrtcvad.Vad(vad_mode)
+        # Framing, VAD gating and model priming
+        self.stream = WakeWordStream(
+            acquire_model=lambda: self.model,
+            sample_rate=sample_rate,
+            vad_frame_ms=chunk_duration_ms,
+            vad_mode=vad_mode,
+            confidence_threshold=confidence_threshold,
+            vad_gate=vad_gate,
+            vad_hangover_ms=vad_hangover_ms,
+            preroll_ms=preroll_ms
+        )
         
-        # Buffers for audio processing
+        # Buffers for audio processing: the stream callback converts into
+        # pooled chunks (about 2 s of backlog) instead of allocating per block
         self.audio_queue = queue.Queue()
+        self.chunk_pool = BufferPool(64, self.chunk_size)
+        self._converter = Int16Converter(self.chunk_size)
         self.is_listening = False
-        self.detected_wake_word = False
+        self.detected = threading.Event()
+        
+        # Detection callbacks and latency measurements
+        self._callbacks: List[Callable[[Dict[str, Any]], None]] = []
+        self._callbacks_lock = threading.Lock()
+        self.last_detection: Optional[Dict[str, Any]] = None
+        self.detection_latencies: List[float] = []
         
         # Thread for continuous processing
+        self.capture = capture
+        if audio_device is None:
+            audio_device = capture.audio_device if capture is not None else SoundDevice()
+        self.audio_device = audio_device
         self.processing_thread = None
         
         # Generate beep sound for feedback
         self.beep_sound = self._generate_beep()
 
+    @property
+    def detected_wake_word(self) -> bool:
+        """Whether the wake word has been detected since listening started."""
+        return self.detected.is_set()
+
     def _generate_beep(self, frequency: int = 800, duration: float = 0.1) -> np.ndarray:
         """Generate a simple beep sound."""
         t = np.linspace(0, duration, int(self.sample_rate * duration), False)
         beep = np.sin(2 * np.pi * frequency * t) * 0.3  # 0.3 is volume
         return beep.astype(np.float32)
 
+    def warmup(self, n_frames: int = 8) -> None:
+        """Run dummy predictions so the first real frames don't pay cold-start costs."""
+        silence = np.zeros(WAKE_WORD_FRAME_SIZE, dtype=np.int16)
+        for _ in range(n_frames):
+            self.model.predict(silence)
+        self.model.reset()
+
     def play_beep(self) -> None:
         """Play the beep sound."""
-        sd.play(self.beep_sound, self.sample_rate)
-        sd.wait()
+        self.audio_device.play(self.beep_sound, self.sample_rate)
+
+    def add_detection_callback(self, callback: Callable[[Dict[str, Any]], None]) -> None:
+        """Register a callback fired from the processing thread on detection.
+        
+        The callback receives a dict with keys:
+            - score: Model confidence
+            - audio_time: time.monotonic() at which the triggering audio was captured
+            - detected_at: time.monotonic() at which the detection fired
+            - latency: detected_at - audio_time in seconds
+            - position: Capture ring position of the triggering audio (None
+              when not reading from a CaptureService)
+        """
+        with self._callbacks_lock:
+            self._callbacks.append(callback)
+
+    def remove_detection_callback(self, callback: Callable[[Dict[str, Any]], None]) -> None:
+        """Unregister a previously added detection callback."""
+        with self._callbacks_lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def _on_detection(self, score: float, audio_time: float, position: Optional[int] = None) -> None:
+        """Signal a detection to waiters and callbacks, then give audible feedback."""
+        detected_at = time.monotonic()
+        detection = {
+            "score": float(score),
+            "audio_time": audio_time,
+            "detected_at": detected_at,
+            "latency": detected_at - audio_time,
+            "position": position
+        }
+        self.last_detection = detection
+        self.detection_latencies.append(detection["latency"])
+        metrics.observe("wake_word_latency", detection["latency"])
+        self.detected.set()
+
+        with self._callbacks_lock:
+            callbacks = list(self._callbacks)
+        for callback in callbacks:
+            try:
+                callback(detection)
+            except Exception as e:
+                print(f"Error in wake word callback: {e}")
+
+        print(f"Yes! I heard you! (confidence: {score:.2f}, latency: {detection['latency'] * 1000:.0f} ms)")
+        self.play_beep()  # Play feedback sound
+
+    def reset_stream(self) -> None:
+        """Reset framing, gating and model state before a new audio stream."""
+        self.stream.reset()
+
+    def process_chunk(self,
+                      audio_chunk: np.ndarray,
+                      audio_time: Optional[float] = None,
+                      position: Optional[int] = None) -> bool:
+        """Feed a chunk of int16 audio of any size through VAD and the wake word model.
+        
+        Args:
+            audio_chunk: int16 mono samples
+            audio_time: time.monotonic() at which the chunk's last sample was
+                captured (defaults to now)
+            position: Capture ring position just past the chunk's last sample
+            
+        Returns:
+            True if the wake word was detected in this chunk
+        """
+        if audio_time is None:
+            audio_time = time.monotonic()
+        score = self.stream.process(audio_chunk)
+        if score is None:
+            return False
+        self._on_detection(score, audio_time, position)
+        return True
+
+    def get_frame_cost_report(self) -> Dict[str, Any]:
+        """Report the per-frame cost of VAD and the wake word model (see WakeWordStream)."""
+        return self.stream.get_frame_cost_report()
 
     def start_listening(self) -> None:
         """Start listening for wake word in background."""
@@ -66,69 +406,98 @@ class WakeWordDetector:
             return
             
         self.is_listening = True
-        self.detected_wake_word = False
+        self.detected.clear()
+        self.reset_stream()
         
-        def audio_callback(indata, frames, time, status):
+        def audio_callback(indata, frames, time_info, status):
             """Callback for audio stream to process chunks."""
             if status:
                 print(f"Audio callback status: {status}")
             if self.is_listening:
+                # Map the ADC time of the chunk's last sample onto time.monotonic()
+                now = time.monotonic()
+                if time_info.inputBufferAdcTime > 0:
+                    capture_delay = time_info.currentTime - time_info.inputBufferAdcTime
+                    audio_time = now - capture_delay + frames / self.sample_rate
+                else:
+                    audio_time = now
+                
+                buffer = self.chunk_pool.acquire()
+                if buffer is None:
+                    print("Wake word processing is falling behind, dropping audio")
+                    return
                 # Convert to int16 for VAD
-                audio_chunk = (indata * 32767).astype(np.int16)
-                self.audio_queue.put(audio_chunk)
+                n = min(frames, len(buffer))
+                self._converter.convert(indata[:n, 0], out=buffer)
+                self.audio_queue.put((buffer, n, audio_time))
 
         def process_audio():
             """Process audio chunks in background thread."""
             try:
-                with sd.InputStream(
+                with self.audio_device.input_stream(
                     samplerate=self.sample_rate,
+                    callback=audio_callback,
                     channels=1,
                     dtype=np.float32,
-                    blocksize=self.chunk_size,
-                    callback=audio_callback
+                    blocksize=self.chunk_size
                 ):
                     print("Waiting to hear my name...")
                     
                     while self.is_listening:
-                        if not self.audio_queue.empty():
-                            audio_chunk = self.audio_queue.get()
-                            
-                            # Check for voice activity
-                            is_speech = self.vad.is_speech(
-                                audio_chunk.tobytes(),
-                                self.sample_rate
-                            )
-                            
-                            if is_speech:
-                                # Process with wake word detector
-                                predictions = self.model.predict(audio_chunk)
-                                score = predictions[self.wake_word]
-                                
-                                if score > self.confidence_threshold:
-                                    print(f"Yes! I heard you! (confidence: {score:.2f})")
-                                    self.play_beep()  # Play feedback sound
-                                    self.detected_wake_word = True
-                                    break
-                            
-                        time.sleep(0.01)  # Prevent busy waiting
+                        # Block until audio arrives; stop_listening() wakes us with None
+                        item = self.audio_queue.get()
+                        if item is None:
+                            break
+                        buffer, n, audio_time = item
+                        try:
+                            detected = self.process_chunk(buffer[:n], audio_time)
+                        finally:
+                            self.chunk_pool.release(buffer)
+                        if detected:
+                            break
                         
             except Exception as e:
                 print(f"Error in audio processing: {e}")
-                self.stop_listening()
+                self.is_listening = False
+
+        def process_capture():
+            """Process audio from the shared capture ring buffer."""
+            reader = self.capture.reader()
+            # Reused for every read; process_chunk() does not keep it
+            audio_chunk = np.empty(self.chunk_size, dtype=np.int16)
+            try:
+                print("Waiting to hear my name...")
+                while self.is_listening:
+                    # Blocking read; the timeout only bounds how long stop_listening() waits
+                    if not reader.read_into(audio_chunk, timeout=0.1):
+                        continue
+                    audio_time = self.capture.ring.time_of(reader.position)
+                    if self.process_chunk(audio_chunk, audio_time, reader.position):
+                        break
+            except Exception as e:
+                print(f"Error in audio processing: {e}")
+                self.is_listening = False
 
-        self.processing_thread = threading.Thread(target=process_audio)
+        if self.capture is not None:
+            self.capture.start()
+        target = process_capture if self.capture is not None else process_audio
+        self.processing_thread = threading.Thread(target=target)
         self.processing_thread.start()
 
     def stop_listening(self) -> None:
         """Stop listening for wake word."""
         self.is_listening = False
         if self.processing_thread is not None:
-            self.processing_thread.join()
+            self.audio_queue.put(None)  # Wake the processing thread
+            if self.processing_thread is not threading.current_thread():
+                self.processing_thread.join()
             self.processing_thread = None
         
         # Clear audio queue
         while not self.audio_queue.empty():
-            self.audio_queue.get()
+            item = self.audio_queue.get()
+            if item is not None:
+                self.chunk_pool.release(item[0])
 
     def wait_for_wake_word(self, timeout: Optional[float] = None) -> bool:
         """Wait for wake word to be detected.
@@ -139,11 +508,47 @@ class WakeWordDetector:
         Returns:
             True if wake word was detected, False if timeout occurred
         """
-        start_time = time.time()
+        return self.detected.wait(timeout)
+
+    async def wait_for_wake_word_async(self, timeout: Optional[float] = None) -> bool:
+        """Await wake word detection without blocking the event loop.
         
-        while not self.detected_wake_word:
-            if timeout is not None and time.time() - start_time > timeout:
-                return False
-            time.sleep(0.1)
+        Args:
+            timeout: Maximum time to wait in seconds (None for no timeout)
             
-        return True 
\ No newline at end of file
+        Returns:
+            True if wake word was detected, False if timeout occurred
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def on_detection(detection: Dict[str, Any]) -> None:
+            loop.call_soon_threadsafe(lambda: future.done() or future.set_result(True))
+
+        self.add_detection_callback(on_detection)
+        try:
+            # A detection may have fired before the callback was registered
+            if self.detected.is_set():
+                return True
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self.remove_detection_callback(on_detection)
+
+    def get_latency_stats(self) -> Dict[str, float]:
+        """Summarize audio-timestamp-to-detection latency over all detections.
+        
+        Returns:
+            Dict with count, mean, p50, p95 and max latency in seconds
+        """
+        if not self.detection_latencies:
+            return {"count": 0}
+        latencies = np.array(self.detection_latencies)
+        return {
+            "count": len(latencies),
+            "mean": float(latencies.mean()),
+            "p50": float(np.percentile(latencies, 50)),
+            "p95": float(np.percentile(latencies, 95)),
+            "max": float(latencies.max())
+        }